@@ -0,0 +1,328 @@
+"""
+Append-only answer event log and the scoring views derived from it.
+
+Every submitted answer is appended to `answer_events` (the mutable `user_answers`
+row is still updated for the quiz pages). An AnswerEventConsumer replays the log
+once, then only reads events it hasn't seen, keeping these views in memory:
+
+    current answer per (user, question)
+    score per user, and per user within each quiz
+    last answer date and number of questions answered ("attempts") per user
+    (overall and per quiz)
+    score, last answer date and attempts per user per day, so a time-windowed board
+    sums a few daily buckets
+    answers, correct answers and players per day
+
+A re-answer moves the user's point: the previous answer for that question is
+taken back out of the views before the new one is added, so the scores always
+match what `user_answers` holds.
+"""
+import time
+import threading
+import streamlit as st
+from lib.supabase_client import get_client
+
+# Events read per request while catching up with the log
+EVENT_PAGE_SIZE = 1000
+# Ids below the highest one seen that are read again on every poll: concurrent inserts
+# can commit out of id order, so a lower id may become visible after a higher one
+EVENT_REREAD_WINDOW = 200
+# get_answer_stream() polls at most this often; reads right after a write ask for max_age=0
+STREAM_POLL_SECONDS = 1.0
+# Errors meaning the answer_events table doesn't exist (PostgREST / Postgres)
+MISSING_TABLE_ERRORS = ("PGRST205", "42P01")
+# Ids per request when resolving questions to quizzes
+ID_CHUNK_SIZE = 200
+
+
+def record_answer_event(user_id: str, question_id: str, choice_id: str, is_correct: bool, answered_at: str):
+    """Append one answer to the answer_events log."""
+    supabase = get_client()
+    supabase.table("answer_events").insert({
+        "user_id": user_id,
+        "question_id": question_id,
+        "choice_id": choice_id,
+        "is_correct": is_correct,
+        "answered_at": answered_at
+    }).execute()
+
+
+def is_missing_table_error(error: Exception):
+    """Whether an error says the answer_events table hasn't been created."""
+    error_msg = str(error)
+    return any(code in error_msg for code in MISSING_TABLE_ERRORS) or "does not exist" in error_msg.lower()
+
+
+def _add(counts: dict, key, amount: int):
+    """Add to a count, dropping it once it reaches zero."""
+    value = counts.get(key, 0) + amount
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+class AnswerEventConsumer:
+    """Incrementally maintained scoring views over the answer_events log."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.last_event_id = 0
+        self.polled_at = None
+        # Ids within EVENT_REREAD_WINDOW of last_event_id that have been applied
+        self._seen_ids = set()
+        self._question_quiz = {}
+        self._current = {}
+        self._scores = {}
+        self._last_answer = {}
+        self._attempts = {}
+        self._quiz_scores = {}
+        self._quiz_last_answer = {}
+        self._quiz_attempts = {}
+        self._daily_scores = {}
+        self._daily_last_answer = {}
+        self._daily_attempts = {}
+        self._activity = {}
+
+    def poll(self, supabase=None):
+        """
+        Apply every event not applied yet.
+
+        Reads from EVENT_REREAD_WINDOW ids below the highest id seen, skipping the ids
+        already applied, so an event that committed after a higher id isn't missed.
+
+        Args:
+            supabase: Client to read the log with (defaults to get_client(); pass one when
+                polling off the script thread)
+
+        Returns:
+            Number of events applied
+        """
+        supabase = supabase or get_client()
+        applied = 0
+        with self._lock:
+            after = max(self.last_event_id - EVENT_REREAD_WINDOW, 0)
+            while True:
+                events = (
+                    supabase.table("answer_events").select("*")
+                    .gt("id", after)
+                    .order("id", desc=False)
+                    .limit(EVENT_PAGE_SIZE)
+                    .execute()
+                ).data
+                if not events:
+                    break
+                new_events = [e for e in events if e["id"] not in self._seen_ids]
+                self._resolve_quizzes({e["question_id"] for e in new_events}, supabase)
+                for event in new_events:
+                    self._apply(event)
+                    self._seen_ids.add(event["id"])
+                after = events[-1]["id"]
+                self.last_event_id = max(self.last_event_id, after)
+                applied += len(new_events)
+                # Ids below the window are never read again
+                floor = self.last_event_id - EVENT_REREAD_WINDOW
+                self._seen_ids = {event_id for event_id in self._seen_ids if event_id > floor}
+                if len(events) < EVENT_PAGE_SIZE:
+                    break
+            self.polled_at = time.monotonic()
+        return applied
+
+    def _resolve_quizzes(self, question_ids, supabase):
+        """Map new question ids to their quiz (questions never move between quizzes)."""
+        missing = [q for q in question_ids if q not in self._question_quiz]
+        for start in range(0, len(missing), ID_CHUNK_SIZE):
+            chunk = missing[start:start + ID_CHUNK_SIZE]
+            questions = supabase.table("questions").select("id, section_id").in_("id", chunk).execute().data
+            section_ids = list({q["section_id"] for q in questions if q.get("section_id")})
+            section_quiz = {}
+            if section_ids:
+                sections = supabase.table("sections").select("id, quiz_id").in_("id", section_ids).execute().data
+                section_quiz = {s["id"]: s["quiz_id"] for s in sections}
+            # Deleted questions stay in the overall score but belong to no quiz
+            for question_id in chunk:
+                self._question_quiz[question_id] = None
+            for q in questions:
+                self._question_quiz[q["id"]] = section_quiz.get(q.get("section_id"))
+
+    def _apply(self, event: dict):
+        user_id = event["user_id"]
+        question_id = event["question_id"]
+        quiz_id = self._question_quiz.get(question_id)
+        answered_at = event.get("answered_at") or ""
+        is_correct = bool(event.get("is_correct"))
+
+        previous = self._current.get((user_id, question_id))
+        if previous:
+            # The question stays answered, but on the new answer's day
+            _add(self._daily_attempts.setdefault(previous["answered_at"][:10], {}), user_id, -1)
+            if previous["is_correct"]:
+                self._score(user_id, quiz_id, previous["answered_at"][:10], -1)
+        self._current[(user_id, question_id)] = {
+            "choice_id": event.get("choice_id"),
+            "is_correct": is_correct,
+            "answered_at": answered_at
+        }
+        if is_correct:
+            self._score(user_id, quiz_id, answered_at[:10], 1)
+
+        # Attempts count questions answered, like the user_answers rows a scan counts
+        if answered_at > self._last_answer.get(user_id, ""):
+            self._last_answer[user_id] = answered_at
+        if not previous:
+            _add(self._attempts, user_id, 1)
+        _add(self._daily_attempts.setdefault(answered_at[:10], {}), user_id, 1)
+        # Not lowered when a re-answer leaves the day: the re-answer is later and on a later
+        # day, so it is what every window reaching back to this day reports anyway
+        day_dates = self._daily_last_answer.setdefault(answered_at[:10], {})
+        if answered_at > day_dates.get(user_id, ""):
+            day_dates[user_id] = answered_at
+        if quiz_id:
+            quiz_dates = self._quiz_last_answer.setdefault(quiz_id, {})
+            if answered_at > quiz_dates.get(user_id, ""):
+                quiz_dates[user_id] = answered_at
+            if not previous:
+                _add(self._quiz_attempts.setdefault(quiz_id, {}), user_id, 1)
+
+        day = self._activity.setdefault(answered_at[:10], {"answers": 0, "correct": 0, "players": set()})
+        day["answers"] += 1
+        day["correct"] += int(is_correct)
+        day["players"].add(user_id)
+
+    def _score(self, user_id, quiz_id, day: str, amount: int):
+        _add(self._scores, user_id, amount)
+        # A point belongs to the day of the answer that earned it
+        _add(self._daily_scores.setdefault(day, {}), user_id, amount)
+        if quiz_id:
+            _add(self._quiz_scores.setdefault(quiz_id, {}), user_id, amount)
+
+    def forget_user(self, user_id: str):
+        """Take a deleted user's answers back out of the scoring views (daily activity keeps them)."""
+        with self._lock:
+            for (answer_user_id, question_id) in [key for key in self._current if key[0] == user_id]:
+                answer = self._current.pop((answer_user_id, question_id))
+                if answer["is_correct"]:
+                    self._score(user_id, self._question_quiz.get(question_id), answer["answered_at"][:10], -1)
+            self._last_answer.pop(user_id, None)
+            self._attempts.pop(user_id, None)
+            for views in (
+                *self._quiz_last_answer.values(), *self._quiz_attempts.values(),
+                *self._daily_last_answer.values(), *self._daily_attempts.values(),
+            ):
+                views.pop(user_id, None)
+
+    def current_answer(self, user_id: str, question_id: str):
+        """The user's latest answer to a question (choice_id, is_correct, answered_at), or None."""
+        with self._lock:
+            answer = self._current.get((user_id, question_id))
+            return dict(answer) if answer else None
+
+    def user_score(self, user_id: str):
+        """Number of questions the user currently has right."""
+        with self._lock:
+            return self._scores.get(user_id, 0)
+
+    def user_totals(self, user_id: str):
+        """(score, last answered_at, attempts) for one user."""
+        with self._lock:
+            return self._scores.get(user_id, 0), self._last_answer.get(user_id), self._attempts.get(user_id, 0)
+
+    def user_scores(self, quiz_id: str = None):
+        """user_id -> score for every user with at least one correct answer (within one quiz if given)."""
+        with self._lock:
+            scores = self._quiz_scores.get(quiz_id, {}) if quiz_id else self._scores
+            return dict(scores)
+
+    def last_answer_dates(self, quiz_id: str = None):
+        """user_id -> latest answered_at (within one quiz if given)."""
+        with self._lock:
+            dates = self._quiz_last_answer.get(quiz_id, {}) if quiz_id else self._last_answer
+            return dict(dates)
+
+    def attempts(self, quiz_id: str = None):
+        """user_id -> number of questions answered (within one quiz if given); re-answers don't add to it."""
+        with self._lock:
+            attempts = self._quiz_attempts.get(quiz_id, {}) if quiz_id else self._attempts
+            return dict(attempts)
+
+    def window_totals(self, days):
+        """
+        Score, last answer date and attempts from the current answers given on the given
+        days (YYYY-MM-DD), summed from the daily buckets.
+
+        Returns:
+            (user_id -> score, user_id -> last answered_at, user_id -> attempts)
+        """
+        with self._lock:
+            scores, last_dates, attempts = {}, {}, {}
+            for day in days:
+                for user_id, score in self._daily_scores.get(day, {}).items():
+                    scores[user_id] = scores.get(user_id, 0) + score
+                for user_id, count in self._daily_attempts.get(day, {}).items():
+                    attempts[user_id] = attempts.get(user_id, 0) + count
+                for user_id, answered_at in self._daily_last_answer.get(day, {}).items():
+                    if answered_at > last_dates.get(user_id, ""):
+                        last_dates[user_id] = answered_at
+            return scores, last_dates, attempts
+
+    def daily_activity(self):
+        """Answers, correct answers and distinct players per day, oldest day first."""
+        with self._lock:
+            return [
+                {"day": day, "answers": d["answers"], "correct": d["correct"], "players": len(d["players"])}
+                for day, d in sorted(self._activity.items())
+            ]
+
+
+@st.cache_resource
+def _get_consumer():
+    return AnswerEventConsumer()
+
+
+# Set once an answer is saved without its event: the log (and any replay of it) no longer
+# matches user_answers, so this process scores from user_answers from then on
+_log_incomplete = False
+
+
+def mark_answer_log_incomplete():
+    """Stop serving scores from the answer event log in this process."""
+    global _log_incomplete
+    _log_incomplete = True
+    _get_consumer.clear()
+
+
+def answer_log_complete():
+    return not _log_incomplete
+
+
+def get_answer_consumer():
+    """The process-wide answer event consumer, not polled (callers poll it themselves)."""
+    return _get_consumer()
+
+
+def get_answer_stream(max_age: float = STREAM_POLL_SECONDS):
+    """
+    The process-wide answer event consumer, caught up with the log.
+
+    Args:
+        max_age: Seconds since the last poll after which the log is polled again
+            (0 to read your own just-written answer)
+
+    Returns:
+        AnswerEventConsumer, or None if the answer_events log isn't available or
+        is missing answers (callers then fall back to scanning user_answers)
+    """
+    if _log_incomplete:
+        return None
+    consumer = _get_consumer()
+    try:
+        if consumer.polled_at is None or time.monotonic() - consumer.polled_at >= max_age:
+            consumer.poll()
+        return consumer
+    except Exception:
+        return None
+
+
+def forget_user_answers(user_id: str):
+    """Drop a deleted user's answers from this process's scoring views."""
+    _get_consumer().forget_user(user_id)
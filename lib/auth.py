@@ -1,5 +1,6 @@
 import streamlit as st
 from lib.supabase_client import get_client
+from lib.answer_events import forget_user_answers
 import os
 import secrets
 import string
@@ -460,7 +461,7 @@ def add_user_directly(email: str, full_name: str, role: str = "user"):
 
 def delete_user(user_id: str):
     """Delete a user and all their data (admin only). 
-    Deletes in this order: user_answers, feedback, profile, and auth user.
+    Deletes in this order: user_answers and answer_events, feedback, profile, and auth user.
     Note: To fully delete from auth, add service_role_key to secrets.toml under [supabase]"""
     supabase = get_client()
     try:
@@ -470,6 +471,14 @@ def delete_user(user_id: str):
         except Exception as e:
             st.warning(f"Warning deleting user_answers: {e}")
         
+        # Their answer events too, so the scoring views don't bring them back
+        try:
+            supabase.table("answer_events").delete().eq("user_id", user_id).execute()
+        except Exception:
+            # answer_events is optional
+            pass
+        forget_user_answers(user_id)
+        
         # 2. Delete feedback submissions
         try:
             supabase.table("feedback").delete().eq("user_id", user_id).execute()
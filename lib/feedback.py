@@ -4,6 +4,14 @@ Feedback and submission functions
 import streamlit as st
 from lib.supabase_client import get_client
 from datetime import datetime
+import time
+
+FEEDBACK_STATUSES = ["pending", "reviewed", "implemented", "rejected"]
+
+# Submitter profiles rarely change, so keep a small in-process cache of them
+PROFILE_CACHE_TTL = 300  # seconds
+PROFILE_CACHE_SIZE = 256
+_profile_cache = {}  # user_id -> (fetched_at, profile)
 
 
 def submit_feedback(user_id: str, submission_type: str, title: str, content: str, question_answer: str = None):
@@ -35,48 +43,95 @@ def get_user_feedback(user_id: str):
         return []
 
 
-def get_all_feedback(status: str = None):
-    """Get all feedback (admin only). Optionally filter by status."""
+def _get_profiles(user_ids):
+    """Return {user_id: profile} for the given ids, fetching only ids missing from the cache."""
+    now = time.time()
+    missing = [
+        uid for uid in user_ids
+        if uid not in _profile_cache or now - _profile_cache[uid][0] > PROFILE_CACHE_TTL
+    ]
+    if missing:
+        supabase = get_client()
+        profiles = supabase.table("profiles").select("id, full_name, email").in_("id", missing).execute()
+        found = {p["id"]: p for p in profiles.data or []}
+        for uid in missing:
+            # Cache misses too so deleted users don't trigger a lookup on every rerun
+            _profile_cache[uid] = (now, found.get(uid, {}))
+        
+        # Drop the oldest entries once the cache outgrows its budget
+        if len(_profile_cache) > PROFILE_CACHE_SIZE:
+            oldest = sorted(_profile_cache, key=lambda uid: _profile_cache[uid][0])
+            for uid in oldest[:len(_profile_cache) - PROFILE_CACHE_SIZE]:
+                _profile_cache.pop(uid, None)
+    
+    return {uid: _profile_cache.get(uid, (now, {}))[1] for uid in user_ids}
+
+
+def _filter_feedback(query, status: str = None, submission_type: str = None):
+    """Apply the status / type filters shared by the list and count queries."""
+    if status:
+        query = query.eq("status", status)
+    if submission_type:
+        query = query.eq("submission_type", submission_type)
+    return query
+
+
+def get_all_feedback(status: str = None, submission_type: str = None, limit: int = None, offset: int = 0):
+    """Get feedback (admin only), newest first, with submitter info attached as `submitted_by`.
+    
+    Args:
+        status: Optional status filter
+        submission_type: Optional type filter (feedback, topic, question)
+        limit: Page size; None returns every matching row
+        offset: Number of rows to skip (for pagination)
+    """
     supabase = get_client()
     try:
-        query = supabase.table("feedback").select("*, profiles:user_id(full_name, email)")
+        query = _filter_feedback(supabase.table("feedback").select("*"), status, submission_type)
+        query = query.order("created_at", desc=True)
+        if limit:
+            query = query.range(offset, offset + limit - 1)
+        result = query.execute()
+        feedback_items = result.data or []
         
-        if status:
-            query = query.eq("status", status)
+        # One bulk profile lookup for the whole page instead of one per item
+        user_ids = {f.get("user_id") for f in feedback_items if f.get("user_id")}
+        profile_map = _get_profiles(user_ids) if user_ids else {}
         
-        result = query.order("created_at", desc=True).execute()
-        return result.data
+        for feedback in feedback_items:
+            profile = profile_map.get(feedback.get("user_id"), {})
+            feedback["submitted_by"] = {
+                "full_name": profile.get("full_name", "Unknown"),
+                "email": profile.get("email", "")
+            }
+        
+        return feedback_items
     except Exception as e:
-        # Fallback if nested select doesn't work
-        try:
-            result = supabase.table("feedback").select("*")
-            if status:
-                result = result.eq("status", status)
-            result = result.order("created_at", desc=True).execute()
-            
-            # Manually get user info
-            if result.data:
-                user_ids = list(set([f.get("user_id") for f in result.data if f.get("user_id")]))
-                if user_ids:
-                    profiles = supabase.table("profiles").select("id, full_name, email").in_("id", user_ids).execute()
-                    profile_map = {p["id"]: p for p in profiles.data}
-                    
-                    for feedback in result.data:
-                        user_id = feedback.get("user_id")
-                        profile = profile_map.get(user_id, {})
-                        feedback["submitted_by"] = {
-                            "full_name": profile.get("full_name", "Unknown"),
-                            "email": profile.get("email", "")
-                        }
-            
-            return result.data
-        except Exception as e2:
-            st.error(f"Error fetching feedback: {e2}")
-            return []
-    except:
+        st.error(f"Error fetching feedback: {e}")
         return []
 
 
+def get_feedback_counts(submission_type: str = None):
+    """Count feedback per status (admin only) without fetching the rows.
+    
+    Returns:
+        Dict of {status: count} for every status in FEEDBACK_STATUSES, plus "All".
+    """
+    supabase = get_client()
+    counts = {}
+    try:
+        for status in FEEDBACK_STATUSES:
+            query = _filter_feedback(supabase.table("feedback").select("id", count="exact"), status, submission_type)
+            result = query.limit(1).execute()
+            counts[status] = result.count or 0
+    except Exception as e:
+        st.error(f"Error counting feedback: {e}")
+        counts = {status: 0 for status in FEEDBACK_STATUSES}
+    
+    counts["All"] = sum(counts.values())
+    return counts
+
+
 def update_feedback_status(feedback_id: str, status: str, reviewed_by: str, notes: str = None):
     """Update feedback status (admin only)."""
     supabase = get_client()
@@ -0,0 +1,143 @@
+"""
+In-memory index of groups for the group leaderboards.
+
+Keeps group -> members and, per group, the members' scores as a sorted list, so a
+group board is a slice and a group rank is a binary search instead of a scan of
+every answer. The index is updated in place when a user's score or group changes.
+Lists are kept in lib.ranking order (score, then earliest completion, fewer
+attempts, user_id).
+"""
+import threading
+from bisect import bisect_left, insort
+from lib.ranking import DEFAULT_RANKING, DENSE, NOT_COMPLETED, assign_ranks
+
+DEFAULT_GROUP = "uncategorised"
+
+
+class GroupIndex:
+    """group -> members and per-group score lists kept in rank order."""
+
+    def __init__(self, profiles: list, scores: dict, last_answer_dates: dict = None, attempts: dict = None):
+        """
+        Args:
+            profiles: Profile rows with id, full_name, email and group
+            scores: user_id -> score
+            last_answer_dates: user_id -> last answered_at (completion time tie-breaker)
+            attempts: user_id -> number of answers (tie-breaker)
+        """
+        self._lock = threading.Lock()
+        self._profiles = {p["id"]: p for p in profiles}
+        self._scores = {user_id: score for user_id, score in scores.items() if user_id in self._profiles}
+        self._last_answer = dict(last_answer_dates or {})
+        self._attempts = dict(attempts or {})
+        self._members = {}
+        self._ranked = {}
+        for user_id, profile in self._profiles.items():
+            group = profile.get("group") or DEFAULT_GROUP
+            self._members.setdefault(group, set()).add(user_id)
+            if self._scores.get(user_id, 0) > 0:
+                self._ranked.setdefault(group, []).append(self._key(user_id))
+        for ranked in self._ranked.values():
+            ranked.sort()
+
+    def _key(self, user_id):
+        # Highest score first, then the lib.ranking tie-breakers
+        return (
+            -self._scores[user_id],
+            self._last_answer.get(user_id) or NOT_COMPLETED,
+            self._attempts.get(user_id, 0),
+            user_id,
+        )
+
+    def _group_of(self, user_id):
+        return self._profiles[user_id].get("group") or DEFAULT_GROUP
+
+    def _unrank(self, user_id):
+        if self._scores.get(user_id, 0) > 0:
+            ranked = self._ranked[self._group_of(user_id)]
+            del ranked[bisect_left(ranked, self._key(user_id))]
+
+    def _rank(self, user_id):
+        if self._scores.get(user_id, 0) > 0:
+            insort(self._ranked.setdefault(self._group_of(user_id), []), self._key(user_id))
+
+    def knows(self, user_id: str):
+        with self._lock:
+            return user_id in self._profiles
+
+    def groups(self):
+        """Group names, sorted."""
+        with self._lock:
+            return sorted(group for group, members in self._members.items() if members)
+
+    def members(self, group_name: str):
+        """Profiles of every user in a group."""
+        with self._lock:
+            return [self._profiles[user_id] for user_id in self._members.get(group_name, ())]
+
+    def set_score(self, user_id: str, score: int, last_answer_date: str = None, attempts: int = 0):
+        """Move a user to their new place in their group's list."""
+        with self._lock:
+            if user_id not in self._profiles:
+                return
+            self._unrank(user_id)
+            self._scores[user_id] = score
+            self._last_answer[user_id] = last_answer_date
+            self._attempts[user_id] = attempts
+            self._rank(user_id)
+
+    def set_group(self, user_id: str, group_name: str):
+        """Move a user to another group."""
+        with self._lock:
+            if user_id not in self._profiles:
+                return
+            self._unrank(user_id)
+            self._members[self._group_of(user_id)].discard(user_id)
+            self._profiles[user_id] = {**self._profiles[user_id], "group": group_name}
+            self._members.setdefault(group_name, set()).add(user_id)
+            self._rank(user_id)
+
+    def remove_user(self, user_id: str):
+        with self._lock:
+            if user_id not in self._profiles:
+                return
+            self._unrank(user_id)
+            self._members[self._group_of(user_id)].discard(user_id)
+            del self._profiles[user_id]
+            self._scores.pop(user_id, None)
+            self._last_answer.pop(user_id, None)
+            self._attempts.pop(user_id, None)
+
+    def leaderboard(self, group_name: str, limit: int = 100, ranking: str = DEFAULT_RANKING):
+        """The group's top `limit` members with a score, best first."""
+        with self._lock:
+            top = self._ranked.get(group_name, [])[:limit]
+            ranks = assign_ranks([-key[0] for key in top], ranking)
+            leaderboard = []
+            for (negative_score, _, attempts, user_id), rank in zip(top, ranks):
+                profile = self._profiles[user_id]
+                leaderboard.append({
+                    "user_id": user_id,
+                    "full_name": profile.get("full_name", "Unknown"),
+                    "email": profile.get("email", ""),
+                    "score": -negative_score,
+                    "last_answer_date": self._last_answer.get(user_id) or "",
+                    "attempts": attempts,
+                    "group": group_name,
+                    "rank": int(rank)
+                })
+            return leaderboard
+
+    def rank(self, user_id: str, group_name: str, ranking: str = DEFAULT_RANKING):
+        """A user's rank within a group (ties share a rank), or None if they aren't on its board."""
+        with self._lock:
+            if user_id not in self._profiles or self._group_of(user_id) != group_name:
+                return None
+            if self._scores.get(user_id, 0) <= 0:
+                return None
+            ranked = self._ranked[group_name]
+            # (-score,) sorts before every key with that score: everything before it scored higher
+            higher = bisect_left(ranked, (-self._scores[user_id],))
+            if ranking == DENSE:
+                return len({key[0] for key in ranked[:higher]}) + 1
+            return higher + 1
@@ -0,0 +1,194 @@
+"""
+Live quiz-night leaderboards.
+
+During a live event every player and the host screen watch the same quiz board.
+Instead of each session rebuilding it on every rerun, one LiveLeaderboard per quiz
+runs a background thread that aggregates the board every few seconds (or right after
+an answer is submitted) and pushes only the entries that changed to each subscribed
+session's queue. N viewers cost one aggregation, not N.
+
+This is an in-process pub/sub: sessions served by the same app process share a board.
+"""
+import queue
+import threading
+import time
+from lib.supabase_client import get_client
+from lib.answer_events import get_answer_consumer, answer_log_complete
+from lib.quiz import query_quiz_leaderboard
+
+# Seconds between aggregations while anyone is watching
+LIVE_REFRESH_SECONDS = 2
+# Entries kept on a live board
+LIVE_BOARD_LIMIT = 100
+# A session that hasn't read its queue for this long is unsubscribed
+SUBSCRIBER_IDLE_SECONDS = 60
+# Deltas buffered per session before it is sent a full snapshot instead
+SUBSCRIBER_QUEUE_SIZE = 50
+
+
+class Subscription:
+    """One session's feed of board deltas."""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.last_seen = time.monotonic()
+        self.closed = False
+
+    def push(self, delta: dict, snapshot: dict):
+        """Queue a delta; a viewer that fell too far behind gets the full board instead."""
+        try:
+            self.queue.put_nowait(delta)
+        except queue.Full:
+            self.drain()
+            self.queue.put_nowait(snapshot)
+
+    def drain(self):
+        """Deltas pushed since the last call, oldest first."""
+        self.last_seen = time.monotonic()
+        deltas = []
+        while True:
+            try:
+                deltas.append(self.queue.get_nowait())
+            except queue.Empty:
+                return deltas
+
+
+def apply_deltas(entries: dict, deltas: list):
+    """
+    Apply pushed deltas to a session's copy of the board.
+
+    Args:
+        entries: user_id -> leaderboard entry (as returned by get_quiz_leaderboard)
+        deltas: Output of Subscription.drain()
+
+    Returns:
+        The updated user_id -> entry dict
+    """
+    for delta in deltas:
+        if delta["reset"]:
+            entries = {}
+        entries.update(delta["entries"])
+        for user_id in delta["removed"]:
+            entries.pop(user_id, None)
+    return entries
+
+
+class LiveLeaderboard:
+    """The shared, push-updated leaderboard of one quiz."""
+
+    def __init__(self, quiz_id: str, supabase, stream=None, interval: float = LIVE_REFRESH_SECONDS):
+        """
+        Args:
+            quiz_id: Quiz whose board this is
+            supabase: Client the board's thread queries with (the thread has no script
+                run context, so it can't look one up itself)
+            stream: AnswerEventConsumer to serve the board from, or None to scan user_answers
+        """
+        self.quiz_id = quiz_id
+        self._supabase = supabase
+        self._stream = stream
+        self.interval = interval
+        self.version = 0
+        self.updated_at = None
+        self.aggregations = 0
+        self._entries = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def _aggregate(self):
+        # Runs on the board's thread: no Streamlit calls, and failures raise so nothing is pushed
+        stream = self._stream if answer_log_complete() else None
+        if stream is not None:
+            try:
+                stream.poll(self._supabase)
+            except Exception:
+                # answer_events unavailable: scan user_answers instead
+                stream = None
+        return query_quiz_leaderboard(self._supabase, stream, self.quiz_id, limit=LIVE_BOARD_LIMIT)
+
+    def _snapshot(self):
+        return {"version": self.version, "entries": dict(self._entries), "removed": [], "reset": True}
+
+    def subscribe(self):
+        """Start a session's feed; its first message is the current board."""
+        subscription = Subscription()
+        with self._lock:
+            subscription.push(self._snapshot(), self._snapshot())
+            self._subscribers.append(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"live-quiz-{self.quiz_id}", daemon=True)
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscription.closed = True
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def viewers(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def wake(self):
+        """Aggregate now instead of at the next interval (e.g. after an answer)."""
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                # Failed aggregation pushes nothing: viewers keep the last board and the next interval tries again
+                pass
+            with self._lock:
+                now = time.monotonic()
+                for subscription in [s for s in self._subscribers if now - s.last_seen > SUBSCRIBER_IDLE_SECONDS]:
+                    subscription.closed = True
+                    self._subscribers.remove(subscription)
+                if not self._subscribers:
+                    # Nobody is watching: stop until the next subscribe
+                    self._thread = None
+                    return
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """Aggregate the board once and push what changed to every subscriber (raises, pushing nothing, on failure)."""
+        entries = {entry["user_id"]: entry for entry in self._aggregate()}
+        self.aggregations += 1
+        with self._lock:
+            changed = {user_id: entry for user_id, entry in entries.items() if self._entries.get(user_id) != entry}
+            removed = [user_id for user_id in self._entries if user_id not in entries]
+            self._entries = entries
+            self.updated_at = time.time()
+            if not changed and not removed:
+                return
+            self.version += 1
+            delta = {"version": self.version, "entries": changed, "removed": removed, "reset": False}
+            snapshot = self._snapshot()
+            for subscription in self._subscribers:
+                subscription.push(delta, snapshot)
+
+
+_boards = {}
+_boards_lock = threading.Lock()
+
+
+def get_live_leaderboard(quiz_id: str):
+    """Return the process-wide live board for a quiz, creating it on first use (call from a script run)."""
+    with _boards_lock:
+        if quiz_id not in _boards:
+            _boards[quiz_id] = LiveLeaderboard(quiz_id, get_client(), get_answer_consumer())
+        return _boards[quiz_id]
+
+
+def notify_answer_submitted():
+    """Wake every live board so new answers show up without waiting for the interval."""
+    with _boards_lock:
+        boards = list(_boards.values())
+    for board in boards:
+        board.wake()
@@ -51,6 +51,7 @@ def render_admin_navigation():
     st.sidebar.page_link("pages/05_Quiz_History.py", label="Quiz History", icon="📚")
     st.sidebar.page_link("pages/06_My_Rank.py", label="My Rank", icon="🏆")
     st.sidebar.page_link("pages/07_All_Ranks.py", label="All Ranks", icon="📈")
+    st.sidebar.page_link("pages/10_Live_Quiz_Night.py", label="Live Quiz Night", icon="🎤")
     st.sidebar.page_link("pages/08_Submit_Feedback.py", label="Submit Feedback", icon="💬")
     st.sidebar.page_link("pages/09_Manage_Feedback.py", label="Manage Feedback", icon="📋")
 
@@ -63,5 +64,6 @@ def render_user_navigation():
     st.sidebar.page_link("pages/04_Take_Quiz.py", label="Take Quiz", icon="📝")
     st.sidebar.page_link("pages/05_Quiz_History.py", label="Quiz History", icon="📚")
     st.sidebar.page_link("pages/06_My_Rank.py", label="My Rank", icon="🏆")
+    st.sidebar.page_link("pages/10_Live_Quiz_Night.py", label="Live Quiz Night", icon="🎤")
     st.sidebar.page_link("pages/08_Submit_Feedback.py", label="Submit Feedback", icon="💬")
 
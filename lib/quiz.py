@@ -3,11 +3,12 @@ Quiz helper functions for database operations.
 """
 import streamlit as st
 from lib.supabase_client import get_client
-from datetime import datetime
-
-# Default values
-DEFAULT_HINT = "there is no hint for this question"
-DEFAULT_EXPLANATION = "there is no explanation for this question"
+from datetime import datetime, timedelta
+from lib.answer_events import record_answer_event, get_answer_stream, is_missing_table_error, mark_answer_log_incomplete
+from lib.group_index import GroupIndex
+from lib.ranking import DEFAULT_RANKING, rank_entries, rank_of_score
+# Default values (defined with the import formats, which apply them too)
+from lib.quiz_format import DEFAULT_HINT, DEFAULT_EXPLANATION
 
 
 def get_all_questions():
@@ -112,6 +113,7 @@ def create_section(quiz_id: str, title: str, description: str = "", order_index:
                 "p_order_index": order_index
             }
         ).execute()
+        invalidate_quiz_cache()
         # RPC returns the UUID directly
         if result.data:
             return result.data if not isinstance(result.data, list) else result.data[0]
@@ -125,6 +127,7 @@ def create_section(quiz_id: str, title: str, description: str = "", order_index:
                 "description": description,
                 "order_index": order_index
             }).execute()
+            invalidate_quiz_cache()
             return result.data[0]["id"]
         except Exception as e2:
             st.error(f"Error creating section: {e2}")
@@ -187,6 +190,7 @@ def create_question(section_id: str, question_text: str, choices: list, correct_
             })
         
         supabase.table("choices").insert(choices_data).execute()
+        invalidate_quiz_cache()
         
         return question_id
     except Exception as e:
@@ -240,6 +244,7 @@ def update_question(question_id: str, question_text: str = None, hint: str = Non
         
         if update_data:
             supabase.table("questions").update(update_data).eq("id", question_id).execute()
+            invalidate_quiz_cache()
         return True
     except Exception as e:
         st.error(f"Error updating question: {e}")
@@ -257,53 +262,229 @@ def update_choice(choice_id: str, choice_text: str = None, is_correct: bool = No
         
         if update_data:
             supabase.table("choices").update(update_data).eq("id", choice_id).execute()
+            invalidate_quiz_cache()
         return True
     except Exception as e:
         st.error(f"Error updating choice: {e}")
         return False
 
 def set_correct_answer(question_id: str, correct_choice_id: str):
-    """Set which choice is the correct answer for a question."""
+    """Set which choice is the correct answer for a question.
+    
+    The answer key is rewritten in a single statement, so there is never a moment
+    where the question has no (or two) correct choices.
+    """
     supabase = get_client()
     try:
-        # First, set all choices for this question to incorrect
-        supabase.table("choices").update({"is_correct": False}).eq("question_id", question_id).execute()
-        
-        # Then set the specified choice as correct
-        supabase.table("choices").update({"is_correct": True}).eq("id", correct_choice_id).execute()
-        
+        # Use database function: one UPDATE setting is_correct = (id = choice)
+        supabase.rpc(
+            "set_correct_answer",
+            {"p_question_id": question_id, "p_choice_id": correct_choice_id}
+        ).execute()
+        invalidate_quiz_cache()
+        return True
+    except Exception:
+        pass
+    
+    # Fallback if the function doesn't exist: rewrite every choice in one upsert
+    try:
+        choices = supabase.table("choices").select("id, question_id, choice_text").eq("question_id", question_id).execute()
+        if not any(c["id"] == correct_choice_id for c in choices.data):
+            raise ValueError(f"Choice {correct_choice_id} does not belong to question {question_id}")
+        
+        supabase.table("choices").upsert([
+            {**c, "is_correct": c["id"] == correct_choice_id}
+            for c in choices.data
+        ]).execute()
+        invalidate_quiz_cache()
         return True
     except Exception as e:
         st.error(f"Error setting correct answer: {e}")
         return False
 
+# Question fields a batch edit may change
+QUESTION_EDIT_FIELDS = ("question_text", "hint", "explanation", "is_active", "order_index")
+
+
+def apply_question_edits(section_id: str, edits: list):
+    """Apply question and choice edits for a section in one call.
+    
+    All or nothing with the `apply_question_edits` database function; best effort
+    per question otherwise (see the fallback below).
+    
+    Each edit carries the `version` of the question it was made against. If any
+    question has been changed since (its version moved on), no edit is applied and
+    the conflicting question IDs are returned so the editor can reload them.
+    
+    Args:
+        section_id: ID of the section the questions belong to
+        edits: List of dicts with keys:
+            id: Question ID
+            version: Question version the edit was based on (None skips the check)
+            question_text / hint / explanation / is_active / order_index: New values (optional)
+            choices: Optional {choice_id: new_choice_text}
+            correct_choice_id: Optional ID of the choice to mark correct
+    
+    Returns:
+        Dict with "applied" and "conflicts" lists of question IDs
+    """
+    supabase = get_client()
+    if not edits:
+        return {"applied": [], "conflicts": []}
+    
+    try:
+        # Use database function so the whole batch is one transaction
+        result = supabase.rpc(
+            "apply_question_edits",
+            {"p_section_id": section_id, "p_edits": edits}
+        ).execute()
+        outcome = result.data[0] if isinstance(result.data, list) else result.data
+        if outcome:
+            if outcome.get("applied"):
+                invalidate_quiz_cache()
+            return {"applied": outcome.get("applied", []), "conflicts": outcome.get("conflicts", [])}
+    except Exception:
+        pass
+    
+    # Fallback if the function doesn't exist: a version-guarded update per question.
+    # Versions are checked up front so a stale edit changes nothing; a question edited
+    # between that check and its update matches no row and is reported as a conflict.
+    # Unlike the function this isn't one transaction: questions updated before such a
+    # late conflict keep their edits. Without the `version` column (the migration in
+    # QUIZ_STRUCTURE_GUIDE.md) questions are updated unguarded.
+    try:
+        question_ids = [e["id"] for e in edits]
+        try:
+            current = supabase.table("questions").select("id, version").eq("section_id", section_id).in_("id", question_ids).execute()
+            versions = {q["id"]: q["version"] or 0 for q in current.data}
+        except Exception as e:
+            if not _is_missing_column_error(e):
+                raise
+            current = supabase.table("questions").select("id").eq("section_id", section_id).in_("id", question_ids).execute()
+            versions = {q["id"]: None for q in current.data}
+        
+        conflicts = [
+            edit["id"] for edit in edits
+            if edit["id"] not in versions
+            or (versions[edit["id"]] is not None and edit.get("version") is not None and versions[edit["id"]] != edit["version"])
+        ]
+        if conflicts:
+            return {"applied": [], "conflicts": conflicts}
+        
+        applied = []
+        for edit in edits:
+            question_id = edit["id"]
+            try:
+                if _apply_question_edit(supabase, section_id, edit, versions[question_id]):
+                    applied.append(question_id)
+                else:
+                    conflicts.append(question_id)
+            except Exception:
+                # Partly applied: the editor reloads conflicting questions, showing what was saved
+                conflicts.append(question_id)
+        
+        if applied or conflicts:
+            invalidate_quiz_cache()
+        return {"applied": applied, "conflicts": conflicts}
+    except Exception as e:
+        st.error(f"Error applying question edits: {e}")
+        raise
+
+
+def _is_missing_column_error(error: Exception):
+    """Whether an error says a selected column doesn't exist (e.g. questions.version before its migration)."""
+    error_msg = str(error)
+    return "42703" in error_msg or "does not exist" in error_msg.lower()
+
+
+def _apply_question_edit(supabase, section_id: str, edit: dict, expected_version):
+    """Apply one edit of the apply_question_edits fallback.
+    
+    Claims the question first (bumping its version if it still has `expected_version`),
+    then writes its choices and answer key.
+    
+    Returns:
+        False if the question changed since it was read (nothing written)
+    """
+    question_id = edit["id"]
+    changes = {f: edit[f] for f in QUESTION_EDIT_FIELDS if edit.get(f) is not None}
+    query = supabase.table("questions")
+    if expected_version is None:
+        if changes:
+            query.update(changes).eq("id", question_id).eq("section_id", section_id).execute()
+    else:
+        updated = query.update({**changes, "version": expected_version + 1}).eq("id", question_id).eq("version", expected_version).execute()
+        if not updated.data:
+            return False
+    
+    for choice_id, new_text in (edit.get("choices") or {}).items():
+        if new_text and new_text.strip():
+            supabase.table("choices").update({"choice_text": new_text}).eq("id", choice_id).eq("question_id", question_id).execute()
+    correct_choice_id = edit.get("correct_choice_id")
+    if correct_choice_id:
+        # Mark the new answer before clearing the old one, so there is always a correct choice
+        marked = supabase.table("choices").update({"is_correct": True}).eq("id", correct_choice_id).eq("question_id", question_id).execute()
+        if marked.data:
+            supabase.table("choices").update({"is_correct": False}).eq("question_id", question_id).neq("id", correct_choice_id).execute()
+    return True
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _load_quiz_structure(quiz_id: str):
+    """Load the full quiz tree. Cached until a quiz edit calls invalidate_quiz_cache()."""
+    supabase = get_client()
+    
+    # Get quiz
+    quiz = supabase.table("quizzes").select("*").eq("id", quiz_id).single().execute()
+    
+    # Get sections
+    sections = supabase.table("sections").select("*").eq("quiz_id", quiz_id).order("order_index", desc=False).execute()
+    
+    # Get questions for each section
+    for section in sections.data:
+        questions = supabase.table("questions").select("*, choices(*)").eq("section_id", section["id"]).order("order_index", desc=False).execute()
+        section["questions"] = questions.data
+    
+    return {
+        "quiz": quiz.data,
+        "sections": sections.data
+    }
+
+
+def invalidate_quiz_cache():
+    """Drop cached quiz structures. Call after any write to quizzes, sections, questions or choices."""
+    _load_quiz_structure.clear()
+
+
 def get_quiz_structure(quiz_id: str):
     """Get full quiz structure with sections and questions."""
-    supabase = get_client()
     try:
-        # Get quiz
-        quiz = supabase.table("quizzes").select("*").eq("id", quiz_id).single().execute()
-        
-        # Get sections
-        sections = supabase.table("sections").select("*").eq("quiz_id", quiz_id).order("order_index", desc=False).execute()
-        
-        # Get questions for each section
-        for section in sections.data:
-            questions = supabase.table("questions").select("*, choices(*)").eq("section_id", section["id"]).order("order_index", desc=False).execute()
-            section["questions"] = questions.data
-        
-        return {
-            "quiz": quiz.data,
-            "sections": sections.data
-        }
+        return _load_quiz_structure(quiz_id)
     except Exception as e:
         st.error(f"Error fetching quiz structure: {e}")
         return None
 
 
 def submit_answer(user_id: str, question_id: str, choice_id: str, is_correct: bool):
-    """Submit a user's answer to a question."""
+    """Submit a user's answer to a question and append it to the answer event log.
+    
+    Uses the `submit_answer` database function when available, so the answer and its
+    event are written in one transaction; falls back to separate writes otherwise.
+    """
     supabase = get_client()
+    answered_at = datetime.utcnow().isoformat()
+    try:
+        supabase.rpc("submit_answer", {
+            "p_user_id": user_id,
+            "p_question_id": question_id,
+            "p_choice_id": choice_id,
+            "p_is_correct": is_correct
+        }).execute()
+        _update_group_score(user_id)
+        _notify_live_boards()
+        return True
+    except Exception:
+        pass
+    
     try:
         # Check if user already answered this question
         existing = supabase.table("user_answers").select("*").eq("user_id", user_id).eq("question_id", question_id).execute()
@@ -313,7 +494,7 @@ def submit_answer(user_id: str, question_id: str, choice_id: str, is_correct: bo
             supabase.table("user_answers").update({
                 "choice_id": choice_id,
                 "is_correct": is_correct,
-                "answered_at": datetime.utcnow().isoformat()
+                "answered_at": answered_at
             }).eq("user_id", user_id).eq("question_id", question_id).execute()
         else:
             # Insert new answer
@@ -322,17 +503,38 @@ def submit_answer(user_id: str, question_id: str, choice_id: str, is_correct: bo
                 "question_id": question_id,
                 "choice_id": choice_id,
                 "is_correct": is_correct,
-                "answered_at": datetime.utcnow().isoformat()
+                "answered_at": answered_at
             }).execute()
-        
-        return True
     except Exception as e:
         st.error(f"Error submitting answer: {e}")
         return False
+    
+    try:
+        record_answer_event(user_id, question_id, choice_id, is_correct, answered_at)
+    except Exception as e:
+        # No answer_events table yet: scores are read from user_answers instead
+        if not is_missing_table_error(e):
+            # Scores served from the log would now disagree with user_answers
+            mark_answer_log_incomplete()
+            st.warning(f"Answer saved, but it could not be added to the answer log: {e}")
+    _update_group_score(user_id)
+    _notify_live_boards()
+    return True
+
+
+def _notify_live_boards():
+    """Push a new answer to any live quiz-night boards right away."""
+    # Imported here because lib.live_quiz imports this module
+    from lib.live_quiz import notify_answer_submitted
+    notify_answer_submitted()
 
 
 def get_user_score(user_id: str):
     """Get user's total score (number of correct answers)."""
+    stream = get_answer_stream()
+    if stream is not None:
+        return stream.user_score(user_id)
+    
     supabase = get_client()
     try:
         result = supabase.table("user_answers").select("is_correct").eq("user_id", user_id).eq("is_correct", True).execute()
@@ -420,245 +622,257 @@ def get_user_answers(user_id: str):
         return []
 
 
-def get_leaderboard(limit: int = 100):
+def _scan_answer_totals(question_ids: list = None, user_id: str = None, supabase=None):
+    """Score, last answer date and number of answers per user, scanned from user_answers."""
+    supabase = supabase or get_client()
+    query = supabase.table("user_answers").select("user_id, is_correct, answered_at")
+    if question_ids is not None:
+        query = query.in_("question_id", question_ids)
+    if user_id is not None:
+        query = query.eq("user_id", user_id)
+    all_answers = query.execute()
+    
+    user_scores = {}
+    user_last_dates = {}
+    user_attempts = {}
+    for answer in all_answers.data:
+        user_id = answer["user_id"]
+        user_attempts[user_id] = user_attempts.get(user_id, 0) + 1
+        if answer["is_correct"]:
+            user_scores[user_id] = user_scores.get(user_id, 0) + 1
+        
+        # Track last answer date
+        answered_at = answer.get("answered_at")
+        if answered_at:
+            if user_id not in user_last_dates or answered_at > user_last_dates[user_id]:
+                user_last_dates[user_id] = answered_at
+    return user_scores, user_last_dates, user_attempts
+
+
+def _answer_totals(quiz_id: str = None):
+    """Score, last answer date and attempts per user (within one quiz if given).
+    
+    Served from the answer event views when the log is available, otherwise
+    scanned from user_answers. Either way attempts is the number of questions answered.
+    
+    Returns:
+        (user_id -> score, user_id -> last answered_at, user_id -> attempts)
+    """
+    return _totals_from(get_client(), get_answer_stream(), quiz_id)
+
+
+def _totals_from(supabase, stream, quiz_id: str = None):
+    """_answer_totals from an explicit client and answer stream (None to scan user_answers)."""
+    if stream is not None:
+        return stream.user_scores(quiz_id), stream.last_answer_dates(quiz_id), stream.attempts(quiz_id)
+    
+    if not quiz_id:
+        return _scan_answer_totals(supabase=supabase)
+    
+    # Get all sections for this quiz
+    sections_result = supabase.table("sections").select("id").eq("quiz_id", quiz_id).execute()
+    section_ids = [s["id"] for s in sections_result.data]
+    if not section_ids:
+        return {}, {}, {}
+    
+    # Get all questions for these sections
+    questions_result = supabase.table("questions").select("id").in_("section_id", section_ids).execute()
+    question_ids = [q["id"] for q in questions_result.data]
+    if not question_ids:
+        return {}, {}, {}
+    return _scan_answer_totals(question_ids, supabase=supabase)
+
+
+def _build_leaderboard(user_scores: dict, user_last_dates: dict, user_attempts: dict, limit: int, ranking: str, supabase=None):
+    """Join scores with profiles and rank them (see lib.ranking for ties and tie-breakers)."""
+    supabase = supabase or get_client()
+    
+    # Get user profiles
+    if user_scores:
+        user_ids = list(user_scores.keys())
+        profiles = supabase.table("profiles").select("id, full_name, email").in_("id", user_ids).execute()
+        profile_map = {p["id"]: p for p in profiles.data}
+    else:
+        profile_map = {}
+    
+    # Build leaderboard
+    leaderboard = []
+    for user_id, score in user_scores.items():
+        profile = profile_map.get(user_id, {})
+        leaderboard.append({
+            "user_id": user_id,
+            "full_name": profile.get("full_name", "Unknown"),
+            "email": profile.get("email", ""),
+            "score": score,
+            "last_answer_date": user_last_dates.get(user_id, ""),
+            "attempts": user_attempts.get(user_id, 0)
+        })
+    
+    return rank_entries(leaderboard, ranking)[:limit]
+
+
+def get_leaderboard(limit: int = 100, ranking: str = DEFAULT_RANKING):
     """Get leaderboard with user scores and ranks."""
-    supabase = get_client()
     try:
-        # Get all users with their correct answer counts
-        # Using a raw query approach - count correct answers per user
-        all_answers = supabase.table("user_answers").select("user_id, is_correct").execute()
-        
-        # Calculate scores
-        user_scores = {}
-        for answer in all_answers.data:
-            user_id = answer["user_id"]
-            if answer["is_correct"]:
-                user_scores[user_id] = user_scores.get(user_id, 0) + 1
-        
-        # Get user profiles
-        if user_scores:
-            user_ids = list(user_scores.keys())
-            profiles = supabase.table("profiles").select("id, full_name, email").in_("id", user_ids).execute()
-            profile_map = {p["id"]: p for p in profiles.data}
-        else:
-            profile_map = {}
-        
-        # Build leaderboard
-        leaderboard = []
-        for user_id, score in user_scores.items():
-            profile = profile_map.get(user_id, {})
-            leaderboard.append({
-                "user_id": user_id,
-                "full_name": profile.get("full_name", "Unknown"),
-                "email": profile.get("email", ""),
-                "score": score
-            })
-        
-        # Sort by score descending
-        leaderboard.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Add ranks
-        for i, entry in enumerate(leaderboard):
-            entry["rank"] = i + 1
-        
-        return leaderboard[:limit]
+        return _build_leaderboard(*_answer_totals(), limit, ranking)
     except Exception as e:
         st.error(f"Error fetching leaderboard: {e}")
         return []
 
 
-def get_user_rank(user_id: str):
-    """Get user's rank on the leaderboard."""
-    leaderboard = get_leaderboard()
-    for entry in leaderboard:
-        if entry["user_id"] == user_id:
-            return entry["rank"]
-    return None
+def get_user_rank(user_id: str, ranking: str = DEFAULT_RANKING):
+    """Get user's rank on the leaderboard (ties share a rank)."""
+    try:
+        user_scores, _, _ = _answer_totals()
+    except Exception as e:
+        st.error(f"Error fetching rank: {e}")
+        return None
+    if not user_scores.get(user_id):
+        return None
+    return rank_of_score(user_scores.values(), user_scores[user_id], ranking)
 
 
-def get_all_scores():
+def get_all_scores(ranking: str = DEFAULT_RANKING):
     """Get all user scores for admin view."""
-    return get_leaderboard(limit=1000)
+    return get_leaderboard(limit=1000, ranking=ranking)
 
 
-def get_group_leaderboard(group_name: str, limit: int = 100):
-    """Get leaderboard for a specific group."""
+# Seconds before the group index is rebuilt (picks up profile changes made elsewhere)
+GROUP_INDEX_TTL_SECONDS = 600
+
+
+@st.cache_resource(ttl=GROUP_INDEX_TTL_SECONDS, show_spinner=False)
+def _load_group_index():
+    """Build the group index from all profiles and current scores. Updated in place afterwards."""
+    supabase = get_client()
+    profiles = supabase.table("profiles").select("id, full_name, email, group").execute()
+    user_scores, user_last_dates, user_attempts = _answer_totals()
+    return GroupIndex(profiles.data, user_scores, user_last_dates, user_attempts)
+
+
+def invalidate_group_index():
+    """Drop the group index so the next group board rebuilds it (e.g. after adding or deleting users)."""
+    _load_group_index.clear()
+
+
+def set_user_group(user_id: str, group_name: str):
+    """Move a user to another group and update the group index."""
     supabase = get_client()
     try:
-        # Get all users in the group with their correct answer counts
-        all_answers = supabase.table("user_answers").select("user_id, is_correct").execute()
-        
-        # Calculate scores
-        user_scores = {}
-        for answer in all_answers.data:
-            user_id = answer["user_id"]
-            if answer["is_correct"]:
-                user_scores[user_id] = user_scores.get(user_id, 0) + 1
-        
-        # Get user profiles for the group
-        if user_scores:
-            user_ids = list(user_scores.keys())
-            profiles = supabase.table("profiles").select("id, full_name, email, group").in_("id", user_ids).eq("group", group_name).execute()
-            profile_map = {p["id"]: p for p in profiles.data}
+        supabase.table("profiles").update({"group": group_name}).eq("id", user_id).execute()
+    except Exception as e:
+        st.error(f"Error updating group: {e}")
+        return False
+    
+    index = _load_group_index()
+    if index.knows(user_id):
+        index.set_group(user_id, group_name)
+    else:
+        invalidate_group_index()
+    return True
+
+
+def _update_group_score(user_id: str):
+    """Re-place a user in their group's board after they answer."""
+    try:
+        # Poll now: the answer was just written
+        stream = get_answer_stream(max_age=0)
+        if stream is not None:
+            score, last_answer_date, attempts = stream.user_totals(user_id)
         else:
-            profile_map = {}
-        
-        # Build leaderboard for the group
-        leaderboard = []
-        for user_id, score in user_scores.items():
-            profile = profile_map.get(user_id)
-            if profile:  # Only include users in this group
-                leaderboard.append({
-                    "user_id": user_id,
-                    "full_name": profile.get("full_name", "Unknown"),
-                    "email": profile.get("email", ""),
-                    "score": score,
-                    "group": profile.get("group", "uncategorised")
-                })
-        
-        # Sort by score descending
-        leaderboard.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Add ranks
-        for i, entry in enumerate(leaderboard):
-            entry["rank"] = i + 1
-        
-        return leaderboard[:limit]
+            user_scores, user_last_dates, user_attempts = _scan_answer_totals(user_id=user_id)
+            score, last_answer_date, attempts = user_scores.get(user_id, 0), user_last_dates.get(user_id), user_attempts.get(user_id, 0)
+        index = _load_group_index()
+        if index.knows(user_id):
+            index.set_score(user_id, score, last_answer_date, attempts)
+        else:
+            # Signed up or approved after the index was built
+            invalidate_group_index()
+    except Exception:
+        # Rebuilt on the next group board read instead
+        invalidate_group_index()
+
+
+def get_group_leaderboard(group_name: str, limit: int = 100, ranking: str = DEFAULT_RANKING):
+    """Get leaderboard for a specific group (served from the group index)."""
+    try:
+        return _load_group_index().leaderboard(group_name, limit, ranking)
     except Exception as e:
         st.error(f"Error fetching group leaderboard: {e}")
         return []
 
 
-def get_user_group_rank(user_id: str, group_name: str):
+def get_user_group_rank(user_id: str, group_name: str, ranking: str = DEFAULT_RANKING):
     """Get user's rank within their group."""
     if not group_name or group_name == "uncategorised":
         return None
-    leaderboard = get_group_leaderboard(group_name)
-    for entry in leaderboard:
-        if entry["user_id"] == user_id:
-            return entry["rank"]
-    return None
+    try:
+        return _load_group_index().rank(user_id, group_name, ranking)
+    except Exception as e:
+        st.error(f"Error fetching group rank: {e}")
+        return None
 
 
-def get_quiz_leaderboard(quiz_id: str, limit: int = 100):
+def get_quiz_leaderboard(quiz_id: str, limit: int = 100, ranking: str = DEFAULT_RANKING):
     """Get leaderboard for a specific quiz with scores and last answer date."""
-    supabase = get_client()
     try:
-        # Get all sections for this quiz
-        sections_result = supabase.table("sections").select("id").eq("quiz_id", quiz_id).execute()
-        section_ids = [s["id"] for s in sections_result.data]
-        
-        if not section_ids:
-            return []
-        
-        # Get all questions for these sections
-        questions_result = supabase.table("questions").select("id").in_("section_id", section_ids).execute()
-        question_ids = [q["id"] for q in questions_result.data]
-        
-        if not question_ids:
-            return []
-        
-        # Get all answers for these questions
-        all_answers = supabase.table("user_answers").select("user_id, is_correct, answered_at").in_("question_id", question_ids).execute()
-        
-        # Calculate scores per user and get last answer date
-        user_scores = {}
-        user_last_dates = {}
-        
-        for answer in all_answers.data:
-            user_id = answer["user_id"]
-            if answer["is_correct"]:
-                user_scores[user_id] = user_scores.get(user_id, 0) + 1
-            
-            # Track last answer date
-            answered_at = answer.get("answered_at")
-            if answered_at:
-                if user_id not in user_last_dates or answered_at > user_last_dates[user_id]:
-                    user_last_dates[user_id] = answered_at
-        
-        # Get user profiles
-        if user_scores:
-            user_ids = list(user_scores.keys())
-            profiles = supabase.table("profiles").select("id, full_name, email").in_("id", user_ids).execute()
-            profile_map = {p["id"]: p for p in profiles.data}
-        else:
-            profile_map = {}
-        
-        # Build leaderboard
-        leaderboard = []
-        for user_id, score in user_scores.items():
-            profile = profile_map.get(user_id, {})
-            leaderboard.append({
-                "user_id": user_id,
-                "full_name": profile.get("full_name", "Unknown"),
-                "email": profile.get("email", ""),
-                "score": score,
-                "last_answer_date": user_last_dates.get(user_id, "")
-            })
-        
-        # Sort by score descending
-        leaderboard.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Add ranks
-        for i, entry in enumerate(leaderboard):
-            entry["rank"] = i + 1
-        
-        return leaderboard[:limit]
+        return query_quiz_leaderboard(get_client(), get_answer_stream(), quiz_id, limit, ranking)
     except Exception as e:
         st.error(f"Error fetching quiz leaderboard: {e}")
         return []
 
 
-def get_leaderboard_with_dates(limit: int = 100):
+def query_quiz_leaderboard(supabase, stream, quiz_id: str, limit: int = 100, ranking: str = DEFAULT_RANKING):
+    """Quiz leaderboard from an explicit client and answer stream (None to scan user_answers).
+    
+    Makes no Streamlit calls and raises on failure, so it can run off the script
+    thread (see lib.live_quiz).
+    """
+    return _build_leaderboard(*_totals_from(supabase, stream, quiz_id), limit, ranking, supabase=supabase)
+
+
+def get_leaderboard_with_dates(limit: int = 100, ranking: str = DEFAULT_RANKING):
     """Get overall leaderboard with last answer dates."""
+    return get_leaderboard(limit, ranking)
+
+
+# Time-windowed leaderboards: label -> number of UTC days, today included
+LEADERBOARD_WINDOWS = {"Tonight": 1, "This Week": 7, "This Month": 30}
+
+
+def _window_days(days: int):
+    """The last `days` UTC dates as YYYY-MM-DD, today first."""
+    today = datetime.utcnow().date()
+    return [(today - timedelta(days=i)).isoformat() for i in range(days)]
+
+
+def get_windowed_leaderboard(days: int, limit: int = 100, ranking: str = DEFAULT_RANKING):
+    """Get the leaderboard of points earned in the last `days` days (see LEADERBOARD_WINDOWS).
+    
+    A point counts on the day of the answer that earned it; re-answering moves it to
+    the new answer's day. Served from the daily buckets of the answer event log, so a
+    weekly board sums 7 buckets; without the log only answers in the window are read.
+    Either way the tie-breakers (last answer date, attempts) only count answers in the window.
+    """
     supabase = get_client()
     try:
-        # Get all answers with dates
-        all_answers = supabase.table("user_answers").select("user_id, is_correct, answered_at").execute()
+        window_days = _window_days(days)
+        stream = get_answer_stream()
+        if stream is not None:
+            return _build_leaderboard(*stream.window_totals(window_days), limit, ranking)
         
-        # Calculate scores and track last answer dates
+        window_answers = supabase.table("user_answers").select("user_id, is_correct, answered_at").gte("answered_at", window_days[-1]).execute()
         user_scores = {}
         user_last_dates = {}
-        
-        for answer in all_answers.data:
+        user_attempts = {}
+        for answer in window_answers.data:
             user_id = answer["user_id"]
+            user_attempts[user_id] = user_attempts.get(user_id, 0) + 1
             if answer["is_correct"]:
                 user_scores[user_id] = user_scores.get(user_id, 0) + 1
-            
-            # Track last answer date
-            answered_at = answer.get("answered_at")
-            if answered_at:
-                if user_id not in user_last_dates or answered_at > user_last_dates[user_id]:
-                    user_last_dates[user_id] = answered_at
-        
-        # Get user profiles
-        if user_scores:
-            user_ids = list(user_scores.keys())
-            profiles = supabase.table("profiles").select("id, full_name, email").in_("id", user_ids).execute()
-            profile_map = {p["id"]: p for p in profiles.data}
-        else:
-            profile_map = {}
-        
-        # Build leaderboard
-        leaderboard = []
-        for user_id, score in user_scores.items():
-            profile = profile_map.get(user_id, {})
-            leaderboard.append({
-                "user_id": user_id,
-                "full_name": profile.get("full_name", "Unknown"),
-                "email": profile.get("email", ""),
-                "score": score,
-                "last_answer_date": user_last_dates.get(user_id, "")
-            })
-        
-        # Sort by score descending
-        leaderboard.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Add ranks
-        for i, entry in enumerate(leaderboard):
-            entry["rank"] = i + 1
-        
-        return leaderboard[:limit]
+            if answer["answered_at"] > user_last_dates.get(user_id, ""):
+                user_last_dates[user_id] = answer["answered_at"]
+        return _build_leaderboard(user_scores, user_last_dates, user_attempts, limit, ranking)
     except Exception as e:
         st.error(f"Error fetching leaderboard: {e}")
         return []
@@ -681,3 +895,75 @@ def get_question_stats():
         st.error(f"Error fetching stats: {e}")
         return {"total_questions": 0, "active_questions": 0, "total_answers": 0}
 
+
+
+# Number of days a user must have answered within to count as an active player
+ACTIVE_PLAYER_WINDOW_DAYS = 7
+# Rows per request when paging through answers (PostgREST caps responses at its max-rows, 1000 by default)
+ANSWER_PAGE_SIZE = 1000
+
+
+def _count_active_players(supabase, active_since: str):
+    """Number of distinct users who answered since `active_since`."""
+    try:
+        # Profiles with an answer in the window (inner join), counted server-side
+        result = supabase.table("profiles").select("id, user_answers!inner(id)", count="exact").gte("user_answers.answered_at", active_since).limit(1).execute()
+        return result.count or 0
+    except Exception:
+        pass
+    
+    # No profiles -> user_answers relationship: page through the window's user ids
+    players = set()
+    start = 0
+    while True:
+        page = supabase.table("user_answers").select("user_id").gte("answered_at", active_since).order("id").range(start, start + ANSWER_PAGE_SIZE - 1).execute().data
+        players.update(a["user_id"] for a in page)
+        if len(page) < ANSWER_PAGE_SIZE:
+            return len(players)
+        start += ANSWER_PAGE_SIZE
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_dashboard_stats():
+    """Get every admin dashboard counter in one round trip (cached for 30 seconds).
+    
+    Uses the `get_dashboard_stats` database function when available and falls back
+    to count queries otherwise. Raises on failure, so an error isn't cached.
+    
+    Returns:
+        Dict with total_questions, active_questions, total_answers, pending_users,
+        answers_today and active_players
+    """
+    supabase = get_client()
+    try:
+        result = supabase.rpc(
+            "get_dashboard_stats",
+            {"p_active_window_days": ACTIVE_PLAYER_WINDOW_DAYS}
+        ).execute()
+        # RPC returns a single JSON object
+        stats = result.data[0] if isinstance(result.data, list) else result.data
+        if stats:
+            return stats
+    except Exception:
+        pass
+    
+    # Fallback if the function doesn't exist: count queries, no answer rows transferred
+    # (unless active players has to page through user ids, see _count_active_players)
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
+    active_since = (now - timedelta(days=ACTIVE_PLAYER_WINDOW_DAYS)).isoformat()
+    
+    total_questions = supabase.table("questions").select("id", count="exact").limit(1).execute()
+    active_questions = supabase.table("questions").select("id", count="exact").eq("is_active", True).limit(1).execute()
+    total_answers = supabase.table("user_answers").select("id", count="exact").limit(1).execute()
+    pending_users = supabase.table("profiles").select("id", count="exact").eq("approved", False).limit(1).execute()
+    answers_today = supabase.table("user_answers").select("id", count="exact").gte("answered_at", today_start).limit(1).execute()
+    
+    return {
+        "total_questions": total_questions.count or 0,
+        "active_questions": active_questions.count or 0,
+        "total_answers": total_answers.count or 0,
+        "pending_users": pending_users.count or 0,
+        "answers_today": answers_today.count or 0,
+        "active_players": _count_active_players(supabase, active_since)
+    }
@@ -0,0 +1,207 @@
+"""
+Quiz file formats - parse a CSV / JSON / YAML upload into a quiz tree and validate it.
+
+No database access, so it can be used (and tested) without a Supabase client;
+lib.quiz_import does the inserting.
+"""
+import csv
+import io
+import json
+
+try:
+    import yaml
+except ImportError:  # YAML uploads are optional
+    yaml = None
+
+# Stored when a question is created without a hint / explanation
+DEFAULT_HINT = "there is no hint for this question"
+DEFAULT_EXPLANATION = "there is no explanation for this question"
+
+MIN_CHOICES = 2
+MAX_CHOICES = 4
+
+# CSV layout: one row per question, sections are grouped by the "section" column
+CSV_COLUMNS = [
+    "section", "question_text",
+    "choice_1", "choice_2", "choice_3", "choice_4",
+    "correct_choice", "hint", "explanation", "is_active", "section_description"
+]
+CSV_REQUIRED_COLUMNS = ["section", "question_text", "choice_1", "choice_2", "correct_choice"]
+
+SUPPORTED_EXTENSIONS = ["csv", "json", "yaml", "yml"]
+
+
+def _parse_bool(value, default=True):
+    """Parse a yes/no style cell, falling back to the default when empty."""
+    if value is None or value == "":
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def _parse_csv(text: str):
+    """Turn CSV rows into a quiz tree. Rows keep their line number for error reporting."""
+    reader = csv.DictReader(io.StringIO(text))
+    headers = [h.strip() for h in (reader.fieldnames or [])]
+    missing = [c for c in CSV_REQUIRED_COLUMNS if c not in headers]
+    if missing:
+        return None, [{"row": "header", "error": f"Missing required column(s): {', '.join(missing)}"}]
+
+    sections = {}
+    for line_no, row in enumerate(reader, start=2):  # line 1 is the header
+        row = {(k or "").strip(): (v or "").strip() for k, v in row.items()}
+        if not any(row.values()):
+            continue
+
+        section_title = row.get("section", "")
+        if section_title not in sections:
+            sections[section_title] = {
+                "title": section_title,
+                "description": row.get("section_description", ""),
+                "questions": [],
+                "_row": f"line {line_no}",
+            }
+
+        choices = [row.get(f"choice_{i}", "") for i in range(1, MAX_CHOICES + 1)]
+        correct = row.get("correct_choice", "")
+        sections[section_title]["questions"].append({
+            "question_text": row.get("question_text", ""),
+            # Blank columns are kept so correct_choice still points at the right one;
+            # validate_quiz_tree drops them and remaps the index
+            "choices": choices,
+            # CSV uses 1-based choice numbers like the Create Quiz form
+            "correct_choice_index": int(correct) - 1 if correct.isdigit() else correct,
+            "_first_choice": 1,
+            "hint": row.get("hint", ""),
+            "explanation": row.get("explanation", ""),
+            "is_active": _parse_bool(row.get("is_active")),
+            "_row": f"line {line_no}",
+        })
+
+    return {"sections": list(sections.values())}, []
+
+
+def parse_quiz_file(filename: str, content: bytes):
+    """Parse an uploaded quiz file into a quiz tree.
+
+    Args:
+        filename: Uploaded file name, used to pick the parser by extension
+        content: Raw file bytes
+
+    Returns:
+        (tree, errors) - tree is None when the file could not be parsed
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return None, [{"row": "file", "error": "File must be UTF-8 encoded."}]
+
+    try:
+        if extension == "csv":
+            return _parse_csv(text)
+        if extension == "json":
+            return json.loads(text), []
+        if extension in ("yaml", "yml"):
+            if yaml is None:
+                return None, [{"row": "file", "error": "YAML support needs PyYAML (pip install pyyaml)."}]
+            return yaml.safe_load(text), []
+    except (ValueError, TypeError) as e:
+        return None, [{"row": "file", "error": f"Could not parse {extension.upper()} file: {e}"}]
+    except Exception as e:
+        # yaml.YAMLError and friends
+        return None, [{"row": "file", "error": f"Could not parse file: {e}"}]
+
+    return None, [{"row": "file", "error": f"Unsupported file type '.{extension}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}"}]
+
+
+def validate_quiz_tree(tree):
+    """Validate a parsed quiz tree and normalise it for insertion.
+
+    Every problem is reported, not just the first, so the whole file can be fixed in one go.
+
+    Returns:
+        (clean_tree, errors) - errors is a list of {"row": location, "error": message}
+    """
+    errors = []
+    if not isinstance(tree, dict):
+        return None, [{"row": "file", "error": "Expected a quiz object with a 'sections' list."}]
+
+    sections_in = tree.get("sections")
+    if not isinstance(sections_in, list) or not sections_in:
+        return None, [{"row": "file", "error": "Quiz must contain at least one section."}]
+
+    clean_sections = []
+    for s_idx, section in enumerate(sections_in):
+        if not isinstance(section, dict):
+            errors.append({"row": f"sections[{s_idx}]", "error": "Section must be an object."})
+            continue
+        section_loc = section.get("_row", f"sections[{s_idx}]")
+        title = str(section.get("title") or "").strip()
+        if not title:
+            errors.append({"row": section_loc, "error": "Section title is required."})
+
+        questions_in = section.get("questions") or []
+        if not questions_in:
+            errors.append({"row": section_loc, "error": f"Section '{title}' has no questions."})
+
+        clean_questions = []
+        for q_idx, question in enumerate(questions_in):
+            if not isinstance(question, dict):
+                errors.append({"row": f"sections[{s_idx}].questions[{q_idx}]", "error": "Question must be an object."})
+                continue
+            loc = question.get("_row", f"sections[{s_idx}].questions[{q_idx}]")
+
+            question_text = str(question.get("question_text") or "").strip()
+            raw_choices = ["" if c is None else str(c).strip() for c in (question.get("choices") or [])]
+            choices = [c for c in raw_choices if c]
+            correct_index = question.get("correct_choice_index")
+            # Numbering the file uses for the correct choice: 1-based in CSV, 0-based in JSON / YAML
+            first_choice = question.get("_first_choice", 0)
+
+            if not question_text:
+                errors.append({"row": loc, "error": "Question text is required."})
+            if len(choices) < MIN_CHOICES:
+                errors.append({"row": loc, "error": f"At least {MIN_CHOICES} choices are required."})
+            elif len(choices) > MAX_CHOICES:
+                errors.append({"row": loc, "error": f"At most {MAX_CHOICES} choices are allowed."})
+            if len(set(c.lower() for c in choices)) != len(choices):
+                errors.append({"row": loc, "error": "Choices must be unique."})
+            if not isinstance(correct_index, int) or isinstance(correct_index, bool) or not 0 <= correct_index < len(raw_choices):
+                errors.append({"row": loc, "error": (
+                    f"Correct choice must be a choice number between {first_choice} "
+                    f"and {len(raw_choices) - 1 + first_choice}."
+                )})
+            elif not raw_choices[correct_index]:
+                errors.append({"row": loc, "error": f"Correct choice {correct_index + first_choice} is empty."})
+            else:
+                # Blank choices are dropped, so point at the same choice in the compacted list
+                correct_index -= raw_choices[:correct_index].count("")
+
+            clean_questions.append({
+                "question_text": question_text,
+                "choices": choices,
+                "correct_choice_index": correct_index,
+                "hint": str(question.get("hint") or "").strip() or DEFAULT_HINT,
+                "explanation": str(question.get("explanation") or "").strip() or DEFAULT_EXPLANATION,
+                "is_active": _parse_bool(question.get("is_active")),
+                "order_index": q_idx + 1,
+            })
+
+        clean_sections.append({
+            "title": title,
+            "description": str(section.get("description") or "").strip(),
+            "order_index": s_idx + 1,
+            "questions": clean_questions,
+        })
+
+    if errors:
+        return None, errors
+
+    return {
+        "title": str(tree.get("title") or "").strip(),
+        "description": str(tree.get("description") or "").strip(),
+        "is_active": _parse_bool(tree.get("is_active")),
+        "sections": clean_sections,
+    }, []
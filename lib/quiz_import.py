@@ -0,0 +1,126 @@
+"""
+Bulk quiz import - insert a quiz tree parsed and validated by lib.quiz_format in a
+handful of batched calls.
+"""
+import streamlit as st
+from lib.supabase_client import get_client
+from lib.quiz import create_quiz, invalidate_quiz_cache
+# Parsing lives in lib.quiz_format; re-exported for the Create Quiz page
+from lib.quiz_format import CSV_COLUMNS, SUPPORTED_EXTENSIONS, parse_quiz_file, validate_quiz_tree
+
+
+def _insert_quiz_batched(quiz_id: str, tree: dict):
+    """Insert sections, questions and choices with one insert call per table."""
+    supabase = get_client()
+
+    section_rows = [
+        {
+            "quiz_id": quiz_id,
+            "title": s["title"],
+            "description": s["description"],
+            "order_index": s["order_index"],
+        }
+        for s in tree["sections"]
+    ]
+    section_result = supabase.table("sections").insert(section_rows).execute()
+    section_ids = [s["id"] for s in section_result.data]
+
+    question_rows = []
+    question_choices = []
+    for section_id, section in zip(section_ids, tree["sections"]):
+        for q in section["questions"]:
+            question_rows.append({
+                "section_id": section_id,
+                "question_text": q["question_text"],
+                "hint": q["hint"],
+                "explanation": q["explanation"],
+                "is_active": q["is_active"],
+                "order_index": q["order_index"],
+            })
+            question_choices.append((q["choices"], q["correct_choice_index"]))
+    question_result = supabase.table("questions").insert(question_rows).execute()
+    question_ids = [q["id"] for q in question_result.data]
+
+    choice_rows = [
+        {
+            "question_id": question_id,
+            "choice_text": choice_text,
+            "is_correct": i == correct_index,
+        }
+        for question_id, (choices, correct_index) in zip(question_ids, question_choices)
+        for i, choice_text in enumerate(choices)
+    ]
+    supabase.table("choices").insert(choice_rows).execute()
+    return len(choice_rows)
+
+
+def _delete_quiz_tree(quiz_id: str):
+    """Best-effort removal of a partially imported quiz and everything under it."""
+    supabase = get_client()
+    sections = supabase.table("sections").select("id").eq("quiz_id", quiz_id).execute()
+    section_ids = [s["id"] for s in sections.data]
+    if section_ids:
+        questions = supabase.table("questions").select("id").in_("section_id", section_ids).execute()
+        question_ids = [q["id"] for q in questions.data]
+        if question_ids:
+            supabase.table("choices").delete().in_("question_id", question_ids).execute()
+            supabase.table("questions").delete().in_("id", question_ids).execute()
+        supabase.table("sections").delete().in_("id", section_ids).execute()
+    supabase.table("quizzes").delete().eq("id", quiz_id).execute()
+
+
+def import_quiz(tree: dict, title: str = None, description: str = None, is_active: bool = None):
+    """Create a whole quiz (sections, questions, choices) from a validated tree.
+
+    Uses the `import_quiz` database function so the import is a single transaction.
+    If the function doesn't exist, falls back to one batched insert per table and
+    removes the new quiz again if any of them fails.
+
+    Args:
+        tree: Output of validate_quiz_tree
+        title / description / is_active: Override the values from the file
+
+    Returns:
+        Dict with quiz_id and the number of sections, questions and choices created
+    """
+    quiz = {
+        "title": title or tree.get("title"),
+        "description": description if description is not None else tree.get("description", ""),
+        "is_active": is_active if is_active is not None else tree.get("is_active", True),
+        "sections": tree["sections"],
+    }
+    if not quiz["title"]:
+        raise ValueError("Quiz title is required.")
+
+    summary = {
+        "sections": len(quiz["sections"]),
+        "questions": sum(len(s["questions"]) for s in quiz["sections"]),
+        "choices": sum(len(q["choices"]) for s in quiz["sections"] for q in s["questions"]),
+    }
+
+    supabase = get_client()
+    try:
+        result = supabase.rpc("import_quiz", {"p_quiz": quiz}).execute()
+        # RPC returns the new quiz UUID directly
+        quiz_id = result.data[0] if isinstance(result.data, list) else result.data
+        if quiz_id:
+            invalidate_quiz_cache()
+            return {"quiz_id": quiz_id, **summary}
+    except Exception:
+        pass
+
+    # Fallback if the function doesn't exist
+    quiz_id = create_quiz(quiz["title"], quiz["description"], quiz["is_active"])
+    try:
+        _insert_quiz_batched(quiz_id, quiz)
+    except Exception as e:
+        # Don't leave a half-imported quiz behind
+        try:
+            _delete_quiz_tree(quiz_id)
+        except Exception:
+            pass
+        st.error(f"Error importing quiz: {e}")
+        raise
+
+    invalidate_quiz_cache()
+    return {"quiz_id": quiz_id, **summary}
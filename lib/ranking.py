@@ -0,0 +1,91 @@
+"""
+Tie-aware ranking for the leaderboards.
+
+Entries are ordered by score (highest first), then by deterministic tie-breakers so
+the order never changes between reruns:
+
+    1. earliest completion - whoever reached their score first (earliest last answer)
+    2. fewer attempts
+    3. user_id
+
+Ranks only look at the score, so tied players share a rank:
+
+    competition ("1224"): the rank after a tie skips the places the tie used
+    dense       ("1223"): the rank after a tie follows on
+"""
+import numpy as np
+
+COMPETITION = "competition"
+DENSE = "dense"
+RANKING_METHODS = (COMPETITION, DENSE)
+DEFAULT_RANKING = COMPETITION
+
+# Sorts after any ISO timestamp, so entries without a completion time go last among ties
+NOT_COMPLETED = "~"
+
+
+def _check_method(method: str):
+    if method not in RANKING_METHODS:
+        raise ValueError(f"Unknown ranking method '{method}'. Use one of: {', '.join(RANKING_METHODS)}")
+
+
+def assign_ranks(sorted_scores, method: str = DEFAULT_RANKING):
+    """
+    Ranks for scores already sorted highest first.
+
+    Returns:
+        numpy array of ranks (1-based), one per score
+    """
+    _check_method(method)
+    scores = np.asarray(sorted_scores)
+    if not len(scores):
+        return np.zeros(0, dtype=np.int64)
+    starts_tie = np.r_[True, scores[1:] != scores[:-1]]
+    if method == DENSE:
+        return np.cumsum(starts_tie)
+    # Each tie takes the position of its first member
+    return np.maximum.accumulate(np.where(starts_tie, np.arange(1, len(scores) + 1), 0))
+
+
+def rank_entries(entries: list, method: str = DEFAULT_RANKING):
+    """
+    Order leaderboard entries and set their "rank", in one sort over compact arrays.
+
+    Args:
+        entries: Dicts with user_id and score, plus optional last_answer_date
+            (completion time) and attempts used as tie-breakers
+        method: "competition" or "dense"
+
+    Returns:
+        The entries, best first, each with "rank" set
+    """
+    _check_method(method)
+    if not entries:
+        return []
+    count = len(entries)
+    scores = np.fromiter((e["score"] for e in entries), dtype=np.int64, count=count)
+    attempts = np.fromiter((e.get("attempts") or 0 for e in entries), dtype=np.int64, count=count)
+    # Strings become integer codes in sort order, so the sort compares ints only
+    _, completed = np.unique([e.get("last_answer_date") or NOT_COMPLETED for e in entries], return_inverse=True)
+    _, user_ids = np.unique([str(e["user_id"]) for e in entries], return_inverse=True)
+
+    # lexsort sorts by the last key first
+    order = np.lexsort((user_ids, attempts, completed, -scores))
+    ranks = assign_ranks(scores[order], method)
+
+    ranked = []
+    for position, rank in zip(order, ranks):
+        entry = entries[position]
+        entry["rank"] = int(rank)
+        ranked.append(entry)
+    return ranked
+
+
+def rank_of_score(scores, score: int, method: str = DEFAULT_RANKING):
+    """The rank a score gets among `scores` (which should include it), without sorting."""
+    _check_method(method)
+    scores = np.asarray(list(scores))
+    higher = scores[scores > score]
+    if method == DENSE:
+        return int(len(np.unique(higher))) + 1
+    return int(len(higher)) + 1
@@ -3,8 +3,8 @@ Admin Dashboard Page
 """
 import streamlit as st
 from lib.auth import get_current_user, get_profile_and_role, require_role
-from lib.quiz import get_question_stats, get_user_score, get_user_rank, get_user_group_rank
-from lib.auth import get_pending_users
+from lib.quiz import get_dashboard_stats, ACTIVE_PLAYER_WINDOW_DAYS, get_user_score, get_user_rank, get_user_group_rank
+from lib.answer_events import get_answer_stream
 
 st.set_page_config(page_title="Dashboard", page_icon="📊", layout="wide")
 
@@ -52,17 +52,36 @@ st.divider()
 
 # Quick stats
 st.subheader("📈 Quick Stats")
-stats = get_question_stats()
-col1, col2, col3, col4 = st.columns(4)
+try:
+    stats = get_dashboard_stats()
+except Exception as e:
+    st.error(f"Error fetching dashboard stats: {e}")
+    stats = {}
+col1, col2, col3 = st.columns(3)
 with col1:
     st.metric("Total Questions", stats.get("total_questions", 0))
 with col2:
     st.metric("Active Questions", stats.get("active_questions", 0))
 with col3:
     st.metric("Total Answers", stats.get("total_answers", 0))
-with col4:
-    pending = len(get_pending_users())
-    st.metric("Pending Users", pending)
+
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Pending Users", stats.get("pending_users", 0))
+with col2:
+    st.metric("Answers Today", stats.get("answers_today", 0))
+with col3:
+    st.metric(f"Active Players ({ACTIVE_PLAYER_WINDOW_DAYS} days)", stats.get("active_players", 0))
+
+# Answer activity from the answer event log
+stream = get_answer_stream()
+if stream is not None:
+    activity = stream.daily_activity()
+    if activity:
+        import pandas as pd
+        st.subheader("🗓️ Answer Activity")
+        activity_df = pd.DataFrame(activity).set_index("day")
+        st.line_chart(activity_df[["answers", "correct", "players"]])
 
 st.divider()
 st.info("Use the sidebar to navigate to different admin functions.")
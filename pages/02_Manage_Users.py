@@ -4,6 +4,7 @@ Manage Users Page - Admin only
 import streamlit as st
 from lib.auth import get_current_user, get_profile_and_role, get_pending_users, approve_user, add_user_directly, delete_user
 from lib.supabase_client import get_client
+from lib.quiz import set_user_group, invalidate_group_index
 
 st.set_page_config(page_title="Manage Users", page_icon="👥", layout="wide")
 
@@ -48,6 +49,7 @@ with st.expander("➕ Add User Directly", expanded=False):
                         user_profile = supabase.table("profiles").select("id").eq("email", new_email).single().execute()
                         if user_profile.data:
                             supabase.table("profiles").update({"group": new_group}).eq("id", user_profile.data["id"]).execute()
+                    invalidate_group_index()
                     st.success(f"User {new_name} ({new_email}) added successfully!")
                     st.rerun()
                 except Exception as e:
@@ -82,6 +84,7 @@ if pending_users:
                         st.rerun()
                     else:
                         if delete_user(u['id']):
+                            invalidate_group_index()
                             st.success(f"✅ User {u.get('full_name', 'N/A')} and all their data deleted!")
                             st.session_state.pop(f"confirm_delete_{u['id']}", None)
                             st.rerun()
@@ -132,6 +135,7 @@ try:
                                 st.rerun()
                             else:
                                 if delete_user(u['id']):
+                                    invalidate_group_index()
                                     st.success(f"✅ User {u.get('full_name', 'N/A')} and all their data deleted!")
                                     st.session_state.pop(confirm_key, None)
                                     st.rerun()
@@ -186,12 +190,9 @@ try:
                     st.write("")  # Spacing
                     st.write("")  # Spacing
                     if st.button("Update Group", key="update_group_btn"):
-                        try:
-                            supabase.table("profiles").update({"group": group_choice}).eq("id", selected_user_data["id"]).execute()
+                        if set_user_group(selected_user_data["id"], group_choice):
                             st.success(f"✅ {selected_user_data.get('full_name')} moved to group: {group_choice}")
                             st.rerun()
-                        except Exception as e:
-                            st.error(f"Error updating group: {e}")
     else:
         st.info("No users found.")
 except Exception as e:
@@ -6,8 +6,9 @@ from lib.auth import get_current_user, get_profile_and_role
 from lib.quiz import (
     create_quiz, get_all_quizzes, create_section, get_sections_by_quiz,
     get_questions_by_section, create_question, DEFAULT_HINT, DEFAULT_EXPLANATION,
-    update_question, update_choice, set_correct_answer
+    apply_question_edits
 )
+from lib.quiz_import import parse_quiz_file, validate_quiz_tree, import_quiz, CSV_COLUMNS, SUPPORTED_EXTENSIONS
 from lib.navigation import render_sidebar_navigation
 
 st.set_page_config(page_title="Create Quiz", page_icon="➕", layout="wide")
@@ -51,6 +52,48 @@ with st.expander("➕ Create New Quiz", expanded=True):
                 except Exception as e:
                     st.error(f"Error creating quiz: {e}")
 
+with st.expander("📥 Bulk Import Quiz (CSV / JSON / YAML)", expanded=False):
+    st.caption(
+        "CSV: one row per question with columns " + ", ".join(f"`{c}`" for c in CSV_COLUMNS)
+        + ". `correct_choice` is the choice number (1-4). "
+        "JSON / YAML: `{title, description, sections: [{title, description, questions: "
+        "[{question_text, choices, correct_choice_index, hint, explanation}]}]}` with a 0-based `correct_choice_index`."
+    )
+    uploaded_file = st.file_uploader("Quiz file", type=SUPPORTED_EXTENSIONS, key="bulk_import_file")
+
+    if uploaded_file is not None:
+        tree, errors = parse_quiz_file(uploaded_file.name, uploaded_file.getvalue())
+        if not errors:
+            tree, errors = validate_quiz_tree(tree)
+
+        if errors:
+            st.error(f"❌ {len(errors)} problem(s) found - nothing was imported.")
+            import pandas as pd
+            st.dataframe(pd.DataFrame(errors).rename(columns={"row": "Row", "error": "Error"}), use_container_width=True, hide_index=True)
+        else:
+            question_count = sum(len(s["questions"]) for s in tree["sections"])
+            st.success(f"✅ {len(tree['sections'])} section(s) and {question_count} question(s) ready to import.")
+
+            with st.form("bulk_import_form"):
+                import_title = st.text_input("Quiz Title *", value=tree.get("title", ""))
+                import_description = st.text_area("Quiz Description (optional)", value=tree.get("description", ""), height=80)
+                import_active = st.checkbox("Active (visible to users)", value=tree.get("is_active", True))
+                import_submitted = st.form_submit_button("📥 Import Quiz")
+
+                if import_submitted:
+                    if not import_title.strip():
+                        st.error("Please enter a quiz title.")
+                    else:
+                        try:
+                            summary = import_quiz(tree, import_title.strip(), import_description, import_active)
+                            st.success(
+                                f"✅ Imported '{import_title}': {summary['sections']} sections, "
+                                f"{summary['questions']} questions, {summary['choices']} choices."
+                            )
+                            st.session_state["selected_quiz_id"] = summary["quiz_id"]
+                        except Exception as e:
+                            st.error(f"Error importing quiz: {e}")
+
 st.divider()
 
 # Step 2: Add Sections
@@ -211,27 +254,24 @@ if all_quizzes:
                         
                         if update_btn:
                             try:
-                                # Update question
-                                update_question(
-                                    question['id'],
-                                    question_text=new_question_text,
-                                    hint=new_hint,
-                                    explanation=new_explanation,
-                                    is_active=new_active,
-                                    order_index=new_order
-                                )
-                                
-                                # Update choices text
-                                for choice_id, new_text in choice_updates.items():
-                                    if new_text.strip():
-                                        update_choice(choice_id, choice_text=new_text)
-                                
-                                # Set correct answer
-                                if new_correct_choice_id:
-                                    set_correct_answer(question['id'], new_correct_choice_id)
+                                # Apply question, choice and answer-key changes in one call
+                                outcome = apply_question_edits(selected_section_id, [{
+                                    "id": question['id'],
+                                    "version": question.get('version'),
+                                    "question_text": new_question_text,
+                                    "hint": new_hint,
+                                    "explanation": new_explanation,
+                                    "is_active": new_active,
+                                    "order_index": new_order,
+                                    "choices": {cid: text for cid, text in choice_updates.items() if text.strip()},
+                                    "correct_choice_id": new_correct_choice_id if choices else None,
+                                }])
                                 
-                                st.success("✅ Question updated successfully!")
-                                st.rerun()
+                                if outcome["conflicts"]:
+                                    st.warning("⚠️ This question was changed by someone else since you opened it. Reload the page and re-apply your edits.")
+                                else:
+                                    st.success("✅ Question updated successfully!")
+                                    st.rerun()
                             except Exception as e:
                                 st.error(f"Error updating question: {e}")
                         
@@ -3,7 +3,7 @@ My Rank Page - Per quiz and overall rankings
 """
 import streamlit as st
 from lib.auth import get_current_user, get_profile_and_role
-from lib.quiz import get_user_score, get_user_rank, get_user_group_rank, get_leaderboard_with_dates, get_quiz_leaderboard, get_active_quizzes, get_all_quizzes
+from lib.quiz import get_user_score, get_user_rank, get_user_group_rank, get_leaderboard_with_dates, get_quiz_leaderboard, get_active_quizzes, get_all_quizzes, get_windowed_leaderboard, LEADERBOARD_WINDOWS
 
 st.set_page_config(page_title="My Rank", page_icon="🏆", layout="wide")
 
@@ -50,8 +50,8 @@ if not all_quizzes:
     st.info("No quizzes available.")
     st.stop()
 
-# Create tabs for each quiz + overall
-tab_names = ["Overall"] + [q['title'] for q in all_quizzes]
+# Create tabs for overall, each time window and each quiz
+tab_names = ["Overall"] + list(LEADERBOARD_WINDOWS) + [q['title'] for q in all_quizzes]
 tabs = st.tabs(tab_names)
 
 # Overall tab
@@ -96,8 +96,40 @@ with tabs[0]:
     else:
         st.info("No scores yet. Be the first to answer questions!")
 
+# Time-window tabs
+for idx, (window_name, window_days) in enumerate(LEADERBOARD_WINDOWS.items(), 1):
+    with tabs[idx]:
+        st.subheader(f"🏆 {window_name} Leaderboard")
+        window_leaderboard = get_windowed_leaderboard(window_days, limit=100)
+        
+        if window_leaderboard:
+            import pandas as pd
+            
+            window_leaderboard_data = []
+            for entry in window_leaderboard:
+                window_leaderboard_data.append({
+                    "Rank": entry["rank"],
+                    "Name": entry["full_name"],
+                    "Score": entry["score"],
+                })
+            
+            df = pd.DataFrame(window_leaderboard_data)
+            
+            # Highlight user's row using pandas Styler
+            def highlight_user_row(row):
+                is_user = row["Name"] == prof.get('full_name', '')
+                styles = [''] * len(row)
+                if is_user:
+                    styles = ['background-color: #9F8000; font-weight: bold'] * len(row)
+                return styles
+            
+            styled_df = df.style.apply(highlight_user_row, axis=1)
+            st.dataframe(styled_df, use_container_width=True, hide_index=True)
+        else:
+            st.info(f"No points scored {window_name.lower()} yet.")
+
 # Per-quiz tabs
-for idx, quiz in enumerate(all_quizzes, 1):
+for idx, quiz in enumerate(all_quizzes, 1 + len(LEADERBOARD_WINDOWS)):
     with tabs[idx]:
         st.subheader(f"🏆 {quiz['title']} Leaderboard")
         quiz_leaderboard = get_quiz_leaderboard(quiz['id'], limit=100)
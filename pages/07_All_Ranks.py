@@ -4,6 +4,7 @@ All Ranks Page - Admin only
 import streamlit as st
 from lib.auth import get_current_user, get_profile_and_role
 from lib.quiz import get_all_scores
+from lib.ranking import COMPETITION, DENSE
 
 st.set_page_config(page_title="All Ranks", page_icon="📈", layout="wide")
 
@@ -25,7 +26,15 @@ if prof.get('role') != 'admin':
 
 st.title("📈 All Ranks")
 
-scores = get_all_scores()
+ranking = st.radio(
+    "Tied players",
+    [COMPETITION, DENSE],
+    format_func=lambda m: {COMPETITION: "Share a rank, next rank skips (1, 2, 2, 4)", DENSE: "Share a rank, next rank follows (1, 2, 2, 3)"}[m],
+    horizontal=True,
+    help="Ties are listed by earliest completion, then fewer attempts"
+)
+
+scores = get_all_scores(ranking=ranking)
 
 if scores:
     import pandas as pd
@@ -36,6 +45,7 @@ if scores:
             "Name": entry["full_name"],
             "Email": entry["email"],
             "Score": entry["score"],
+            "Attempts": entry["attempts"],
         })
 
     df = pd.DataFrame(df_data)
@@ -3,7 +3,7 @@ Manage Feedback Page - Admin only
 """
 import streamlit as st
 from lib.auth import get_current_user, get_profile_and_role, require_role
-from lib.feedback import get_all_feedback, update_feedback_status
+from lib.feedback import get_all_feedback, get_feedback_counts, update_feedback_status, FEEDBACK_STATUSES
 
 st.set_page_config(page_title="Manage Feedback", page_icon="📋", layout="wide")
 
@@ -24,14 +24,10 @@ if prof.get('role') != 'admin':
 
 st.title("📋 Manage Feedback & Submissions")
 
+PAGE_SIZE = 25
+
 # Filter options
 col1, col2 = st.columns([2, 1])
-with col1:
-    status_filter = st.selectbox(
-        "Filter by Status:",
-        options=["All", "pending", "reviewed", "implemented", "rejected"],
-        index=0
-    )
 with col2:
     type_filter = st.selectbox(
         "Filter by Type:",
@@ -39,19 +35,39 @@ with col2:
         index=0
     )
 
-# Get feedback
+# Counts come from count-only queries, so they don't grow with the backlog
+submission_type = None if type_filter == "All" else type_filter
+feedback_counts = get_feedback_counts(submission_type)
+
+with col1:
+    status_filter = st.selectbox(
+        "Filter by Status:",
+        options=["All"] + FEEDBACK_STATUSES,
+        format_func=lambda s: f"{s.title() if s != 'All' else s} ({feedback_counts.get(s, 0)})",
+        index=0
+    )
+
+# Get one page of feedback
 status = None if status_filter == "All" else status_filter
-all_feedback = get_all_feedback(status)
+total_matching = feedback_counts.get(status_filter, 0)
+page_count = max(1, (total_matching + PAGE_SIZE - 1) // PAGE_SIZE)
+page_number = 1
+if page_count > 1:
+    page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+    st.caption(f"Page {page_number} of {page_count}")
 
-# Filter by type if needed
-if type_filter != "All":
-    all_feedback = [f for f in all_feedback if f.get("submission_type") == type_filter]
+all_feedback = get_all_feedback(
+    status,
+    submission_type=submission_type,
+    limit=PAGE_SIZE,
+    offset=(page_number - 1) * PAGE_SIZE
+)
 
 # Display feedback
 if not all_feedback:
     st.info("No feedback found with the selected filters.")
 else:
-    st.metric("Total Submissions", len(all_feedback))
+    st.metric("Total Submissions", total_matching)
     
     # Group by status for better organization
     pending_feedback = [f for f in all_feedback if f.get("status") == "pending"]
@@ -62,23 +78,8 @@ else:
         
         for idx, feedback in enumerate(pending_feedback):
             with st.expander(f"{feedback.get('submission_type', '').title()}: {feedback.get('title', feedback.get('content', 'No title'))[:50]}...", expanded=(idx == 0)):
-                # Get submitter info
+                # Submitter info is attached by get_all_feedback
                 submitted_by = feedback.get("submitted_by", {})
-                if not submitted_by:
-                    # Try to get from user_id
-                    from lib.supabase_client import get_client
-                    supabase = get_client()
-                    try:
-                        user_id = feedback.get("user_id")
-                        if user_id:
-                            profile = supabase.table("profiles").select("full_name, email").eq("id", user_id).single().execute()
-                            if profile.data:
-                                submitted_by = {
-                                    "full_name": profile.data.get("full_name", "Unknown"),
-                                    "email": profile.data.get("email", "")
-                                }
-                    except:
-                        pass
                 
                 col1, col2 = st.columns([2, 1])
                 with col1:
@@ -106,8 +107,8 @@ else:
                     st.write("**Update Status:**")
                     new_status = st.selectbox(
                         "Status",
-                        options=["pending", "reviewed", "implemented", "rejected"],
-                        index=["pending", "reviewed", "implemented", "rejected"].index(feedback.get("status", "pending")),
+                        options=FEEDBACK_STATUSES,
+                        index=FEEDBACK_STATUSES.index(feedback.get("status", "pending")),
                         key=f"status_{feedback['id']}"
                     )
                     notes = st.text_area(
@@ -140,22 +141,8 @@ else:
         
         feedback_data = []
         for item in other_feedback:
-            # Get submitter info
+            # Submitter info is attached by get_all_feedback
             submitted_by = item.get("submitted_by", {})
-            if not submitted_by:
-                from lib.supabase_client import get_client
-                supabase = get_client()
-                try:
-                    user_id = item.get("user_id")
-                    if user_id:
-                        profile = supabase.table("profiles").select("full_name, email").eq("id", user_id).single().execute()
-                        if profile.data:
-                            submitted_by = {
-                                "full_name": profile.data.get("full_name", "Unknown"),
-                                "email": profile.data.get("email", "")
-                            }
-                except:
-                    pass
             
             # Format date
             created_date = ""
@@ -0,0 +1,102 @@
+"""
+Live Quiz Night Page - Push-updated leaderboard for players and the host screen
+"""
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+from lib.auth import get_current_user, get_profile_and_role
+from lib.quiz import get_active_quizzes
+from lib.live_quiz import get_live_leaderboard, apply_deltas, LIVE_REFRESH_SECONDS
+from lib.ranking import rank_entries
+
+st.set_page_config(page_title="Live Quiz Night", page_icon="🎤", layout="wide")
+
+from lib.navigation import render_sidebar_navigation
+render_sidebar_navigation()
+
+# Check authentication
+user, sess = get_current_user()
+if not user:
+    from lib.login_component import show_login_section
+    show_login_section()
+    st.stop()
+
+prof = get_profile_and_role(user.id)
+is_admin = prof.get('role') == 'admin'
+
+st.title("🎤 Live Quiz Night")
+
+quizzes = get_active_quizzes()
+if not quizzes:
+    st.info("No active quizzes.")
+    st.stop()
+
+quiz_titles = {q['id']: q['title'] for q in quizzes}
+quiz_id = st.selectbox("Quiz", list(quiz_titles), format_func=quiz_titles.get, key="live_quiz_id")
+host_screen = is_admin and st.toggle("🖥️ Host screen", help="Large top 10 for the projector")
+
+board = get_live_leaderboard(quiz_id)
+
+# One subscription per session; replaced when the quiz changes
+live_state = st.session_state.get("live_subscription")
+if live_state is None or live_state["quiz_id"] != quiz_id:
+    if live_state:
+        get_live_leaderboard(live_state["quiz_id"]).unsubscribe(live_state["subscription"])
+    st.session_state.live_subscription = {"quiz_id": quiz_id, "subscription": board.subscribe(), "entries": {}}
+
+MEDALS = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_leaderboard():
+    """Apply the deltas pushed since the last tick and redraw the board."""
+    state = st.session_state.live_subscription
+    if state["subscription"].closed:
+        # Dropped after being idle (e.g. a backgrounded tab): start over from a snapshot
+        state["subscription"] = board.subscribe()
+        state["entries"] = {}
+
+    deltas = state["subscription"].drain()
+    state["entries"] = apply_deltas(state["entries"], deltas)
+    just_changed = {user_id for delta in deltas if not delta["reset"] for user_id in delta["entries"]}
+    # Same order as the aggregated board, tie-breakers included. Ranked on copies: the
+    # entries are shared with the board and every other viewer's queue
+    entries = rank_entries([dict(entry) for entry in state["entries"].values()])
+
+    if not entries:
+        st.info("No scores yet. The board updates as answers come in.")
+    elif host_screen:
+        for entry in entries[:10]:
+            place = MEDALS.get(entry["rank"], f"#{entry['rank']}")
+            marker = " 🔥" if entry["user_id"] in just_changed else ""
+            st.markdown(f"## {place} {entry['full_name']} — {entry['score']}{marker}")
+    else:
+        own = next((entry for entry in entries if entry["user_id"] == user.id), None)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Your Rank", f"#{own['rank']}" if own else "Not ranked")
+        with col2:
+            st.metric("Your Score", own["score"] if own else 0)
+
+        df = pd.DataFrame([{
+            "Rank": entry["rank"],
+            "Name": entry["full_name"],
+            "Score": entry["score"],
+            "": "🔥" if entry["user_id"] in just_changed else "",
+        } for entry in entries])
+
+        # Highlight user's row using pandas Styler
+        def highlight_user_row(row):
+            is_user = row["Name"] == prof.get('full_name', '')
+            styles = [''] * len(row)
+            if is_user:
+                styles = ['background-color: #9F8000; font-weight: bold'] * len(row)
+            return styles
+
+        st.dataframe(df.style.apply(highlight_user_row, axis=1), use_container_width=True, hide_index=True)
+
+    updated = datetime.fromtimestamp(board.updated_at).strftime("%H:%M:%S") if board.updated_at else "waiting"
+    st.caption(f"👀 {board.viewers} watching · updated {updated}")
+
+
+live_leaderboard()
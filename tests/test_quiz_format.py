@@ -0,0 +1,39 @@
+from lib.quiz_format import parse_quiz_file, validate_quiz_tree
+
+HEADER = "section,question_text,choice_1,choice_2,choice_3,choice_4,correct_choice\n"
+
+
+def _import_csv(rows):
+    tree, errors = parse_quiz_file("quiz.csv", (HEADER + rows).encode("utf-8"))
+    assert errors == []
+    return validate_quiz_tree(tree)
+
+
+def test_blank_middle_choice_keeps_correct_answer():
+    clean, errors = _import_csv("Round 1,Which letter?,A,,C,,3\n")
+
+    assert errors == []
+    question = clean["sections"][0]["questions"][0]
+    assert question["choices"] == ["A", "C"]
+    assert question["choices"][question["correct_choice_index"]] == "C"
+
+
+def test_correct_choice_pointing_at_blank_is_rejected():
+    clean, errors = _import_csv("Round 1,Which letter?,A,,C,,2\n")
+
+    assert clean is None
+    assert errors == [{"row": "line 2", "error": "Correct choice 2 is empty."}]
+
+
+def test_json_correct_choice_range_is_zero_based():
+    tree = {"sections": [{"title": "Round 1", "questions": [
+        {"question_text": "Which letter?", "choices": ["A", "B", "C"], "correct_choice_index": 3}
+    ]}]}
+
+    clean, errors = validate_quiz_tree(tree)
+
+    assert clean is None
+    assert errors == [{
+        "row": "sections[0].questions[0]",
+        "error": "Correct choice must be a choice number between 0 and 2.",
+    }]
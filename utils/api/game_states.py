@@ -0,0 +1,218 @@
+# utils/api/game_states.py
+"""
+Vectorised game-state engine: the same segments and state durations as
+utils.api.incidents.compute_game_states, for thousands of matches at once.
+
+Inputs are two flat tables:
+
+    goals   - match_id, minute, added, team ("home" / "away")
+              minute/added as in extract_goal_incidents (raw incident time, before
+              compute_game_states shifts second-half goals by the first-half injury time)
+    matches - match_id, injury_time_1, injury_time_2
+              (+ home_team_id, away_team_id for summarize_team_states)
+"""
+import numpy as np
+import pandas as pd
+
+STATES = ("winning", "drawing", "losing")
+
+# Order the reference walks a match in: first-half goals, the half-time marker,
+# second-half goals, then the full-time marker
+_FIRST_HALF_GOAL, _HALF_TIME, _SECOND_HALF_GOAL, _FULL_TIME = 0, 1, 2, 3
+
+
+def _states(goal_diff):
+    return np.select([goal_diff > 0, goal_diff < 0], ["winning", "losing"], "drawing")
+
+
+def _drop_unreached(events, phase):
+    # A half-time/full-time marker only closes a segment if play hadn't already passed it
+    prev_time = events.groupby("match_id", sort=False)["time"].shift(1).fillna(0)
+    return events[(events["phase"] != phase) | (prev_time < events["time"])]
+
+
+def goals_table(match_goals):
+    """
+    Build the goals table from extract_goal_incidents output.
+
+    Args:
+        match_goals (dict): match_id -> (home_goals, away_goals), as returned by extract_goal_incidents.
+
+    Returns:
+        DataFrame: match_id, minute, added, team - home goals before away goals, in incident order.
+    """
+    rows = [
+        {"match_id": match_id, "minute": goal["minute"], "added": goal.get("addedTime") or 0, "team": team}
+        for match_id, (home_goals, away_goals) in match_goals.items()
+        for team, team_goals in (("home", home_goals), ("away", away_goals))
+        for goal in team_goals
+    ]
+    return pd.DataFrame(rows, columns=["match_id", "minute", "added", "team"])
+
+
+def compute_game_states_batch(goals, matches):
+    """
+    Game-state segments for every match in `matches`.
+
+    Mirrors compute_game_states exactly, including zero-length segments between goals
+    scored at the same minute and a half-time segment only when the last first-half
+    goal came before the end of first-half injury time. Goals at the same time are
+    ordered home first, then by their row order in `goals`.
+
+    Args:
+        goals (DataFrame): match_id, minute, added, team.
+        matches (DataFrame): match_id, injury_time_1, injury_time_2.
+
+    Returns:
+        DataFrame: match_id, segment, start, end, duration, home, away, half - one row per segment.
+    """
+    matches = matches[["match_id", "injury_time_1", "injury_time_2"]].drop_duplicates("match_id")
+    match_ids = matches["match_id"].to_numpy()
+    injury_time_1 = matches["injury_time_1"].fillna(0).to_numpy(dtype=float)
+    injury_time_2 = matches["injury_time_2"].fillna(0).to_numpy(dtype=float)
+
+    goals = goals[goals["match_id"].isin(match_ids)]
+    goal_injury_time_1 = pd.Series(injury_time_1, index=match_ids).reindex(goals["match_id"]).to_numpy()
+    minute = goals["minute"].to_numpy(dtype=float)
+    added = goals["added"].fillna(0).to_numpy(dtype=float)
+    first_half = minute <= 45
+    is_home = (goals["team"] == "home").to_numpy()
+
+    goal_events = pd.DataFrame({
+        "match_id": goals["match_id"].to_numpy(),
+        "phase": np.where(first_half, _FIRST_HALF_GOAL, _SECOND_HALF_GOAL),
+        "time": minute + added + np.where(first_half, 0, goal_injury_time_1),
+        "team_order": np.where(is_home, 0, 1),
+        "order": np.arange(len(goals)),
+        "home_goal": is_home.astype(int),
+        "away_goal": (~is_home).astype(int),
+        "half": np.where(first_half, "1st", "2nd"),
+    })
+    markers = [
+        (_HALF_TIME, 45 + injury_time_1, "1st"),
+        (_FULL_TIME, 90 + injury_time_1 + injury_time_2, "2nd"),
+    ]
+    marker_events = [
+        pd.DataFrame({
+            "match_id": match_ids, "phase": phase, "time": time, "team_order": 0, "order": 0,
+            "home_goal": 0, "away_goal": 0, "half": half,
+        })
+        for phase, time, half in markers
+    ]
+
+    events = pd.concat([goal_events, *marker_events], ignore_index=True)
+    events = events.sort_values(["match_id", "phase", "time", "team_order", "order"], kind="mergesort", ignore_index=True)
+    events = _drop_unreached(events, _HALF_TIME)
+    events = _drop_unreached(events, _FULL_TIME).reset_index(drop=True)
+
+    by_match = events.groupby("match_id", sort=False)
+    start = by_match["time"].shift(1).fillna(0).to_numpy()
+    # Score going into each segment: goals so far, excluding the one that ends it
+    goal_diff = (
+        (by_match["home_goal"].cumsum() - events["home_goal"])
+        - (by_match["away_goal"].cumsum() - events["away_goal"])
+    ).to_numpy()
+
+    end = events["time"].to_numpy()
+    return pd.DataFrame({
+        "match_id": events["match_id"].to_numpy(),
+        "segment": by_match.cumcount().to_numpy(),
+        "start": start,
+        "end": end,
+        "duration": end - start,
+        "home": _states(goal_diff),
+        "away": _states(-goal_diff),
+        "half": events["half"].to_numpy(),
+    })
+
+
+def summarize_match_states(segments):
+    """
+    Minutes each side spent in each state, per match (the `summary` of compute_game_states).
+
+    Returns:
+        DataFrame indexed by match_id: home_winning, home_drawing, home_losing, away_winning, ...
+    """
+    sides = []
+    for side in ("home", "away"):
+        totals = (
+            segments.groupby(["match_id", side])["duration"].sum()
+            .unstack(fill_value=0)
+            .reindex(columns=list(STATES), fill_value=0)
+        )
+        sides.append(totals.add_prefix(f"{side}_"))
+    return pd.concat(sides, axis=1).fillna(0)
+
+
+def summarize_team_states(segments, matches):
+    """
+    Season-level time in each state per team.
+
+    Args:
+        segments (DataFrame): Output of compute_game_states_batch.
+        matches (DataFrame): match_id, home_team_id, away_team_id.
+
+    Returns:
+        DataFrame indexed by team_id: matches, winning, drawing, losing (minutes) and *_pct shares.
+    """
+    per_match = summarize_match_states(segments)
+    teams_by_match = matches.drop_duplicates("match_id").set_index("match_id")
+
+    sides = []
+    for side in ("home", "away"):
+        part = per_match[[f"{side}_{state}" for state in STATES]].set_axis(list(STATES), axis=1)
+        part["team_id"] = teams_by_match[f"{side}_team_id"].reindex(part.index).to_numpy()
+        sides.append(part)
+
+    teams = pd.concat(sides).groupby("team_id").agg(
+        matches=("winning", "size"), **{state: (state, "sum") for state in STATES}
+    )
+    total = teams[list(STATES)].sum(axis=1).replace(0, np.nan)
+    for state in STATES:
+        teams[f"{state}_pct"] = (teams[state] / total * 100).fillna(0).round(1)
+    return teams.sort_values("winning_pct", ascending=False)
+
+
+def validate_against_reference(goals, matches, tolerance=1e-9):
+    """
+    Recompute every match with the per-match compute_game_states and compare.
+
+    Returns:
+        list: {"match_id", "reason"} for each match that differs (empty when all agree).
+    """
+    from utils.api.incidents import compute_game_states
+
+    segments = compute_game_states_batch(goals, matches)
+    batch_by_match = dict(tuple(segments.groupby("match_id", sort=False)))
+    goals_by_match = dict(tuple(goals.groupby("match_id", sort=False)))
+    empty_goals = goals.iloc[0:0]
+
+    mismatches = []
+    for match in matches.drop_duplicates("match_id").itertuples(index=False):
+        injury_time_1 = 0 if pd.isna(match.injury_time_1) else match.injury_time_1
+        injury_time_2 = 0 if pd.isna(match.injury_time_2) else match.injury_time_2
+        match_goals = goals_by_match.get(match.match_id, empty_goals)
+
+        # Fresh dicts: the reference shifts second-half minutes in place
+        home_goals, away_goals = [], []
+        for goal in match_goals.itertuples(index=False):
+            added = 0 if pd.isna(goal.added) else goal.added
+            goal_dict = {"minute": goal.minute, "addedTime": added, "half": "1st" if goal.minute <= 45 else "2nd"}
+            (home_goals if goal.team == "home" else away_goals).append(goal_dict)
+
+        expected, _ = compute_game_states(
+            home_goals, away_goals, 90 + injury_time_1 + injury_time_2, injury_time_1, injury_time_2
+        )
+        actual = batch_by_match.get(match.match_id)
+        actual = [] if actual is None else actual.to_dict("records")
+
+        if len(expected) != len(actual):
+            mismatches.append({"match_id": match.match_id, "reason": f"{len(actual)} segments, expected {len(expected)}"})
+            continue
+        for i, (exp, act) in enumerate(zip(expected, actual)):
+            numbers_differ = any(abs(exp[key] - act[key]) > tolerance for key in ("start", "end", "duration"))
+            labels_differ = any(exp[key] != act[key] for key in ("home", "away", "half"))
+            if numbers_differ or labels_differ:
+                mismatches.append({"match_id": match.match_id, "reason": f"segment {i}: {act} != {exp}"})
+                break
+    return mismatches
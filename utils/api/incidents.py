@@ -1,7 +1,11 @@
 import streamlit as st
-from utils.extractors.data_fetcher import fetch_json
+from utils.extractors.data_fetcher import fetch_json, incidents_url
 
-def extract_goal_incidents(base_row):
+def extract_goal_incidents(base_row, incidents=None):
+    """
+    Pull goals and the longest added time per half out of an event's incidents.
+    Pass a prefetched `incidents` payload to skip the fetch (see fetch_incidents_batch).
+    """
     home_team_id = base_row["homeTeam.id"]
     away_team_id = base_row["awayTeam.id"]
     
@@ -15,9 +19,8 @@ def extract_goal_incidents(base_row):
     
     eventsId = base_row["id"]
     
-    incidents_url = f"https://www.sofascore.com/api/v1/event/{eventsId}/incidents"
-    # https://www.sofascore.com/api/v1/event/12436870/incidents
-    incidents = fetch_json(incidents_url)
+    if incidents is None:
+        incidents = fetch_json(incidents_url(eventsId))
     
     home_goals = []
     away_goals = []                       
@@ -0,0 +1,140 @@
+# utils/api/ingest.py
+"""Supabase helpers shared by the add_* ingestion pages and utils/jobs."""
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+# Ids per `in` filter - they travel in the request URL, so keep chunks well under URL length limits
+DEFAULT_ID_CHUNK_SIZE = 200
+
+# Bulk writes: rows per request, requests in flight, and retries before a failing chunk is split
+DEFAULT_WRITE_CHUNK_SIZE = 500
+DEFAULT_WRITE_WORKERS = 4
+DEFAULT_WRITE_RETRIES = 2
+DEFAULT_RETRY_BACKOFF = 0.5  # seconds, doubled per retry
+
+# Postgres error for an upsert whose on_conflict columns have no unique constraint
+MISSING_CONSTRAINT_ERROR = "42P10"
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def filter_existing_ids(client, table, column, candidate_ids, chunk_size=DEFAULT_ID_CHUNK_SIZE):
+    """
+    Return the subset of `candidate_ids` already stored in `table.column`.
+
+    Only the candidates are looked up (`in` filter, chunked), so the cost follows the
+    size of the batch being ingested rather than the number of rows in the table.
+
+    Args:
+        client: Supabase client.
+        table (str): Table name, e.g. "fixtures".
+        column (str): Id column to match, e.g. "fixture_id".
+        candidate_ids (iterable): Ids about to be inserted.
+        chunk_size (int): Ids per request.
+
+    Returns:
+        set: candidate ids that already exist.
+    """
+    candidates = list(dict.fromkeys(i for i in candidate_ids if i is not None))
+    existing = set()
+    for chunk in _chunks(candidates, chunk_size):
+        res = client.table(table).select(column).in_(column, chunk).execute()
+        existing.update(row[column] for row in res.data or [])
+    return existing
+
+
+def _write_rows(client, table, rows, on_conflict, ignore_duplicates, retries, backoff):
+    """One insert/upsert request, retried with exponential backoff. Returns the rows the API echoed back."""
+    for attempt in range(retries + 1):
+        try:
+            if on_conflict:
+                query = client.table(table).upsert(rows, on_conflict=on_conflict, ignore_duplicates=ignore_duplicates)
+            else:
+                query = client.table(table).insert(rows)
+            return query.execute().data or [], attempt + 1
+        except Exception as e:
+            if on_conflict and MISSING_CONSTRAINT_ERROR in str(e):
+                # The unique constraint from the README is missing: write a plain insert, as
+                # before upserts (callers drop already-stored ids with filter_existing_ids first)
+                logger.warning(f"{table}.{on_conflict} has no unique constraint, inserting instead of upserting")
+                data, attempts = _write_rows(client, table, rows, None, ignore_duplicates, retries - attempt, backoff)
+                return data, attempt + 1 + attempts
+            if attempt == retries:
+                raise
+            logger.warning(f"Writing {len(rows)} rows to {table} failed (attempt {attempt + 1}): {e}")
+            time.sleep(backoff * 2 ** attempt)
+
+
+def _write_chunk(client, table, index, rows, on_conflict, ignore_duplicates, retries, backoff):
+    """
+    Write one chunk. If it still fails after its retries, split it in half and write each
+    half on its own, so a single bad or conflicting row only fails itself. The halves get
+    one attempt each - by then the failure is almost certainly in the data, not the network.
+    """
+    report = {"index": index, "size": len(rows), "written": 0, "attempts": 0, "failed_rows": []}
+    pending = [(rows, retries)]
+    while pending:
+        part, part_retries = pending.pop()
+        try:
+            data, attempts = _write_rows(client, table, part, on_conflict, ignore_duplicates, part_retries, backoff)
+            report["written"] += len(data)
+            report["attempts"] += attempts
+        except Exception as e:
+            report["attempts"] += part_retries + 1
+            if len(part) == 1:
+                report["failed_rows"].append({"row": part[0], "error": str(e)})
+            else:
+                middle = len(part) // 2
+                pending.extend([(part[middle:], 0), (part[:middle], 0)])
+    return report
+
+
+def bulk_upsert(client, table, rows, on_conflict=None, ignore_duplicates=False, chunk_size=DEFAULT_WRITE_CHUNK_SIZE,
+                max_workers=DEFAULT_WRITE_WORKERS, retries=DEFAULT_WRITE_RETRIES, backoff=DEFAULT_RETRY_BACKOFF, on_chunk=None):
+    """
+    Write rows in chunks submitted in parallel, with per-chunk retry and error reporting.
+
+    Args:
+        client: Supabase client.
+        table (str): Table name.
+        rows (list): Row dicts to write.
+        on_conflict (str): Conflict column(s) for an upsert, e.g. "fixture_id". None means a plain insert.
+            The columns need a unique constraint (see README); without one rows are inserted.
+        ignore_duplicates (bool): With on_conflict, skip conflicting rows instead of updating them.
+        chunk_size (int): Rows per request.
+        max_workers (int): Chunks in flight at once.
+        retries (int): Extra attempts per request before a failing chunk is split.
+        backoff (float): Base seconds to wait between attempts (doubled each retry).
+        on_chunk (callable): Called as on_chunk(rows, chunk_report) in the calling thread as each chunk finishes.
+
+    Returns:
+        dict: {"rows", "written", "chunks": [per-chunk report], "failed_rows": [{"row", "error"}]}
+    """
+    chunks = list(_chunks(list(rows), chunk_size))
+    report = {"rows": sum(len(c) for c in chunks), "written": 0, "chunks": [], "failed_rows": []}
+    if not chunks:
+        return report
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as executor:
+        futures = {
+            executor.submit(_write_chunk, client, table, index, chunk, on_conflict, ignore_duplicates, retries, backoff): chunk
+            for index, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            chunk_report = future.result()
+            report["chunks"].append(chunk_report)
+            report["written"] += chunk_report["written"]
+            report["failed_rows"].extend(chunk_report["failed_rows"])
+            if on_chunk:
+                on_chunk(futures[future], chunk_report)
+
+    report["chunks"].sort(key=lambda c: c["index"])
+    if report["failed_rows"]:
+        logger.warning(f"{len(report['failed_rows'])} of {report['rows']} rows failed to write to {table}")
+    return report
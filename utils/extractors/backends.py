@@ -0,0 +1,278 @@
+# utils/extractors/backends.py
+import os
+import abc
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.extractors.browser_pool import get_browser_pool
+from utils.extractors.json_cache import endpoint_for
+
+logger = logging.getLogger(__name__)
+
+# Batch fetching: how many requests may be in flight, and the minimum gap between request starts
+DEFAULT_BATCH_CONCURRENCY = 4
+DEFAULT_MIN_REQUEST_INTERVAL = 0.25  # seconds
+
+# How long an endpoint stays on the browser after the plain-HTTP path was blocked for it
+DEFAULT_DEMOTION_SECONDS = 30 * 60
+
+HTTP_TIMEOUT = 15  # seconds
+HTTP_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+}
+BLOCKED_STATUS_CODES = {401, 403, 429}
+
+
+class BlockedError(Exception):
+    """The server refused a plain-HTTP request (bot protection, rate limit or a non-JSON challenge page)."""
+
+
+class FetchBackend(abc.ABC):
+    """Interface for anything that can turn URLs into parsed JSON."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    def fetch(self, url):
+        """Fetch one URL and return its parsed JSON. Raises on failure."""
+
+    @abc.abstractmethod
+    def fetch_many(self, urls, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+        """
+        Fetch several URLs concurrently.
+
+        Returns:
+            (results, timings) - url -> JSON (None on failure) and url -> seconds spent fetching
+        """
+
+
+class _AsyncRateLimiter:
+    """Spaces out request starts by at least `min_interval` seconds (asyncio)."""
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = loop.time() + self.min_interval
+
+
+class _RateLimiter:
+    """Spaces out request starts by at least `min_interval` seconds (threads)."""
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_start = time.monotonic() + self.min_interval
+
+
+async def fetch_json_batch_async(urls, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL, timings=None):
+    """
+    Fetch several URLs concurrently on the shared browser. Must run on the browser pool's loop.
+    If a `timings` dict is passed, it is filled with url -> seconds spent fetching.
+    """
+    pool = get_browser_pool()
+    semaphore = asyncio.Semaphore(max_concurrency)
+    rate_limiter = _AsyncRateLimiter(min_interval)
+
+    async def fetch_one(url):
+        async with semaphore:
+            await rate_limiter.wait()
+            started = time.perf_counter()
+            try:
+                return url, await pool.fetch_json_async(url)
+            except Exception as e:
+                logger.warning(f"Error fetching {url}: {e}")
+                return url, None
+            finally:
+                if timings is not None:
+                    timings[url] = time.perf_counter() - started
+
+    results = await asyncio.gather(*(fetch_one(url) for url in dict.fromkeys(urls)))
+    return dict(results)
+
+
+class BrowserBackend(FetchBackend):
+    """Headless Chromium via the shared BrowserPool. Slow but gets past bot protection."""
+
+    name = "browser"
+
+    def fetch(self, url):
+        return get_browser_pool().fetch_json(url)
+
+    def fetch_many(self, urls, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+        timings = {}
+        results = get_browser_pool().run(fetch_json_batch_async(urls, max_concurrency, min_interval, timings))
+        return results, timings
+
+
+class HttpBackend(FetchBackend):
+    """Plain HTTPS through one pooled keep-alive session (gzip, connection reuse)."""
+
+    name = "http"
+
+    def __init__(self, pool_size=DEFAULT_BATCH_CONCURRENCY * 2, timeout=HTTP_TIMEOUT):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(HTTP_HEADERS)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url):
+        response = self.session.get(url, timeout=self.timeout)
+        if response.status_code in BLOCKED_STATUS_CODES:
+            raise BlockedError(f"{url} returned HTTP {response.status_code}")
+        response.raise_for_status()
+        try:
+            return response.json()
+        except ValueError:
+            # A challenge/interstitial page instead of the API response
+            raise BlockedError(f"{url} did not return JSON")
+
+    def _fetch_many(self, urls, max_concurrency, min_interval):
+        """Like fetch_many, but also returns the URLs that were blocked."""
+        rate_limiter = _RateLimiter(min_interval)
+        results, timings, blocked = {}, {}, []
+
+        def fetch_one(url):
+            rate_limiter.wait()
+            started = time.perf_counter()
+            try:
+                results[url] = self.fetch(url)
+            except BlockedError:
+                blocked.append(url)
+            except Exception as e:
+                logger.warning(f"Error fetching {url}: {e}")
+                results[url] = None
+            finally:
+                timings[url] = time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            list(executor.map(fetch_one, dict.fromkeys(urls)))
+        return results, timings, blocked
+
+    def fetch_many(self, urls, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+        results, timings, blocked = self._fetch_many(urls, max_concurrency, min_interval)
+        for url in blocked:
+            results[url] = None
+        return results, timings
+
+
+class AutoBackend(FetchBackend):
+    """
+    Plain HTTP first, browser as the fallback - chosen per endpoint.
+
+    When the HTTP path is blocked for an endpoint (see json_cache.endpoint_for),
+    that endpoint is demoted to the browser for `demotion_seconds`, then the fast
+    path is tried again. Endpoints listed in `browser_endpoints` always use the browser.
+    """
+
+    name = "auto"
+
+    def __init__(self, http=None, browser=None, demotion_seconds=DEFAULT_DEMOTION_SECONDS, browser_endpoints=()):
+        self.http = http or HttpBackend()
+        self.browser = browser or BrowserBackend()
+        self.demotion_seconds = demotion_seconds
+        self.browser_endpoints = set(browser_endpoints)
+        self._demoted_until = {}  # endpoint -> monotonic time
+        self._lock = threading.Lock()
+
+    def uses_browser(self, url):
+        endpoint = endpoint_for(url)
+        if endpoint in self.browser_endpoints:
+            return True
+        with self._lock:
+            return self._demoted_until.get(endpoint, 0) > time.monotonic()
+
+    def demote(self, url):
+        endpoint = endpoint_for(url)
+        with self._lock:
+            self._demoted_until[endpoint] = time.monotonic() + self.demotion_seconds
+        logger.info(f"Plain HTTP blocked for '{endpoint}' endpoints; using the browser for {self.demotion_seconds}s")
+
+    def demoted_endpoints(self):
+        """Endpoints currently routed to the browser, with seconds left."""
+        now = time.monotonic()
+        with self._lock:
+            return {e: round(until - now) for e, until in self._demoted_until.items() if until > now}
+
+    def fetch(self, url):
+        if not self.uses_browser(url):
+            try:
+                return self.http.fetch(url)
+            except BlockedError:
+                self.demote(url)
+        return self.browser.fetch(url)
+
+    def fetch_many(self, urls, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+        urls = list(dict.fromkeys(urls))
+        browser_urls = [url for url in urls if self.uses_browser(url)]
+        routed_to_browser = set(browser_urls)
+        http_urls = [url for url in urls if url not in routed_to_browser]
+
+        results, timings = {}, {}
+        if http_urls:
+            results, timings, blocked = self.http._fetch_many(http_urls, max_concurrency, min_interval)
+            for url in blocked:
+                self.demote(url)
+            browser_urls += blocked
+        if browser_urls:
+            browser_results, browser_timings = self.browser.fetch_many(browser_urls, max_concurrency, min_interval)
+            results.update(browser_results)
+            # Blocked URLs cost the failed HTTP attempt plus the browser fetch
+            for url, elapsed in browser_timings.items():
+                timings[url] = timings.get(url, 0.0) + elapsed
+        return results, timings
+
+
+FETCH_BACKENDS = {
+    "auto": AutoBackend,
+    "http": HttpBackend,
+    "browser": BrowserBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_fetch_backend():
+    """Return the process-wide fetch backend, chosen by SOFASCORE_FETCH_BACKEND (auto | http | browser)."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = os.environ.get("SOFASCORE_FETCH_BACKEND", "auto")
+            if name not in FETCH_BACKENDS:
+                raise ValueError(f"Unknown fetch backend '{name}'. Use one of: {', '.join(FETCH_BACKENDS)}")
+            _backend = FETCH_BACKENDS[name]()
+        return _backend
+
+
+def set_fetch_backend(backend):
+    """Swap the process-wide fetch backend (any FetchBackend instance)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+        return _backend
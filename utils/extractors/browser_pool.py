@@ -0,0 +1,146 @@
+# utils/extractors/browser_pool.py
+import json
+import time
+import atexit
+import asyncio
+import threading
+
+from playwright.async_api import async_playwright
+
+# Max pages (tabs) open at once, and how long the browser may sit unused before it is closed
+DEFAULT_MAX_PAGES = 4
+DEFAULT_IDLE_TIMEOUT = 300  # seconds
+
+
+class BrowserPool:
+    """
+    One headless Chromium shared across calls and Streamlit reruns.
+
+    Playwright runs on a private event loop in a daemon thread, so sync callers
+    (Streamlit scripts) and async callers can both use it. Pages are reused and
+    capped at `max_pages`; the browser is closed after `idle_timeout` seconds
+    without use and relaunched on the next fetch.
+    """
+
+    def __init__(self, max_pages=DEFAULT_MAX_PAGES, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.max_pages = max_pages
+        self.idle_timeout = idle_timeout
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="browser-pool", daemon=True)
+        self._thread.start()
+
+        # Created lazily on the pool's loop
+        self._lock = None
+        self._semaphore = None
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._idle_pages = []
+        self._active = 0  # fetches in flight (or waiting for a page)
+        self._last_used = time.monotonic()
+        self.launches = 0
+
+    # --- Sync API ---
+
+    def run(self, coro):
+        """Run a coroutine on the pool's loop and wait for its result."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch_json(self, url):
+        return self.run(self.fetch_json_async(url))
+
+    def close(self):
+        if self._loop.is_running():
+            self.run(self._shutdown())
+
+    # --- Async API (must run on the pool's loop, e.g. via run()) ---
+
+    async def fetch_json_async(self, url):
+        page = await self._acquire_page()
+        try:
+            await page.goto(url)
+            pre_tag = await page.query_selector("pre")
+            json_text = await pre_tag.text_content() if pre_tag else "{}"
+        finally:
+            await self._release_page(page)
+        return json.loads(json_text)
+
+    async def _ensure_browser(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_pages)
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=True)
+                self._context = await self._browser.new_context()
+                self._idle_pages = []
+                self.launches += 1
+                self._loop.create_task(self._idle_watchdog())
+
+    async def _acquire_page(self):
+        # Count the fetch before launching so the idle watchdog can't close the browser under us
+        self._active += 1
+        try:
+            await self._ensure_browser()
+            await self._semaphore.acquire()
+        except Exception:
+            self._active -= 1
+            raise
+        try:
+            while self._idle_pages:
+                page = self._idle_pages.pop()
+                if not page.is_closed():
+                    return page
+            return await self._context.new_page()
+        except Exception:
+            self._active -= 1
+            self._semaphore.release()
+            raise
+
+    async def _release_page(self, page):
+        self._active -= 1
+        self._last_used = time.monotonic()
+        if not page.is_closed():
+            self._idle_pages.append(page)
+        self._semaphore.release()
+
+    async def _idle_watchdog(self):
+        browser = self._browser
+        while self._browser is browser and browser is not None:
+            await asyncio.sleep(min(self.idle_timeout, 30))
+            if self._active == 0 and time.monotonic() - self._last_used >= self.idle_timeout:
+                await self._shutdown()
+                return
+
+    async def _shutdown(self):
+        if self._lock is None:
+            return
+        async with self._lock:
+            if self._browser is None:
+                return
+            try:
+                await self._context.close()
+                await self._browser.close()
+            finally:
+                await self._playwright.stop()
+                self._playwright = None
+                self._browser = None
+                self._context = None
+                self._idle_pages = []
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide browser pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
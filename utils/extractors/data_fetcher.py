@@ -1,13 +1,18 @@
 # utils/data_fetcher.py
 import json
-import asyncio
-
-import requests
+import time
 
 import streamlit as st
 
 from playwright.async_api import async_playwright
-# Async Playwright JSON fetcher
+
+from utils.extractors.backends import (
+    get_fetch_backend, fetch_json_batch_async, DEFAULT_BATCH_CONCURRENCY, DEFAULT_MIN_REQUEST_INTERVAL
+)
+from utils.extractors.json_cache import get_json_cache
+from utils.extractors.replay import get_replay_settings
+
+# Async Playwright JSON fetcher (one-off: launches and closes its own browser)
 async def fetch_json_data(url):
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
@@ -18,24 +23,62 @@ async def fetch_json_data(url):
         await browser.close()
         return json.loads(json_text)
 
-# Sync wrapper
+# Sync wrapper - served from the on-disk cache when fresh, otherwise fetched through the configured
+# backend (plain HTTP with the browser as fallback by default, see utils/extractors/backends.py).
+# In record mode every network response is also written to the fixture archive; in replay mode
+# responses come only from the archive (see utils/extractors/replay.py).
 def fetch_json(url):
-    return asyncio.run(fetch_json_data(url))
+    replay = get_replay_settings()
+    if replay.mode == "replay":
+        return replay.replay(url)
+
+    cache = get_json_cache()
+    if replay.mode == "live":
+        payload = cache.get(url)
+        if payload is not None:
+            return payload
+
+    started = time.perf_counter()
+    payload = get_fetch_backend().fetch(url)
+    if replay.mode == "record":
+        replay.archive.record(url, payload, time.perf_counter() - started)
+    cache.put(url, payload)
+    return payload
 
-# import logging
+def fetch_json_batch(urls, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+    """
+    Fetch several URLs concurrently, at most `max_concurrency` at a time and
+    starting no more than one request every `min_interval` seconds.
 
-# logging.basicConfig(level=logging.INFO)
-# logger = logging.getLogger(__name__)
+    Returns:
+        dict: url -> parsed JSON. URLs whose fetch failed are left out, so callers can
+        tell a failed fetch from an empty payload.
+    """
+    if not urls:
+        return {}
+    replay = get_replay_settings()
+    if replay.mode == "replay":
+        return replay.replay_batch(urls, max_concurrency)
 
-# def fetch_json(url):
-#     try:
-#         logger.info(f"Fetching URL: {url}")
-#         response = requests.get(url)
-#         response.raise_for_status()
-#         return response.json()
-#     except Exception as e:
-#         logger.error(f"Error fetching {url}: {e}")
-#         return {}
+    cache = get_json_cache()
+    results = {}
+    if replay.mode == "live":
+        for url in urls:
+            payload = cache.get(url)
+            if payload is not None:
+                results[url] = payload
+
+    missing = [url for url in urls if url not in results]
+    if missing:
+        fetched, timings = get_fetch_backend().fetch_many(missing, max_concurrency, min_interval)
+        for url, payload in fetched.items():
+            if payload is None:
+                continue
+            if replay.mode == "record":
+                replay.archive.record(url, payload, timings.get(url, 0.0))
+            cache.put(url, payload)
+            results[url] = payload
+    return results
 
 def fetch_seasons_json(tournament):
     seasons_url = f"https://api.sofascore.com/api/v1/unique-tournament/{tournament['unique_tournament']}/seasons"
@@ -58,22 +101,49 @@ def fetch_rounds_json(tournament, season):
     # https://www.sofascore.com/api/v1/unique-tournament/17/season/61627/rounds"
     return fetch_json(rounds_url)
 
-def fetch_round_events(tournament, season, round_number):
-    round_events_url = (
+def round_events_url(tournament, season, round_number):
+    # https://www.sofascore.com/api/v1/unique-tournament/17/season/61627/events/round/1
+    return (
         f"https://www.sofascore.com/api/v1/unique-tournament/"
         f"{tournament['unique_tournament']}/season/{season['id']}/events/round/{round_number}"
     )
-    # https://www.sofascore.com/api/v1/unique-tournament/17/season/61627/events/round/1
-    round_response = fetch_json(round_events_url)
+
+def fetch_round_events(tournament, season, round_number):
+    round_response = fetch_json(round_events_url(tournament, season, round_number))
     round_events = round_response.get("events", [])
     return round_events
 
-def fetch_lineups(fixture_id):
-    round_events_url = (
-        f"https://www.sofascore.com/api/v1/event/"
-        f"{fixture_id}/lineups"
-    )
+def fetch_round_events_batch(tournament, season, round_numbers, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+    """
+    Fetch the events of several rounds of a season concurrently. Returns round_number -> events;
+    rounds whose fetch failed are left out.
+    """
+    urls = {round_number: round_events_url(tournament, season, round_number) for round_number in round_numbers}
+    payloads = fetch_json_batch(list(urls.values()), max_concurrency, min_interval)
+    return {round_number: payloads[url].get("events", []) for round_number, url in urls.items() if url in payloads}
+
+def lineups_url(fixture_id):
     # https://www.sofascore.com/api/v1/event/11352546/lineups
-    round_response = fetch_json(round_events_url)
-    round_events = round_response.get("confirmed", [])
-    return round_events
\ No newline at end of file
+    return f"https://www.sofascore.com/api/v1/event/{fixture_id}/lineups"
+
+def fetch_lineups_payload(fixture_id):
+    """Lineups payload of one fixture: {"confirmed", "home": {"players": [...]}, "away": {...}}."""
+    return fetch_json(lineups_url(fixture_id))
+
+def fetch_lineups(fixture_id):
+    """Whether a fixture's lineups are confirmed (see fetch_lineups_payload for the players)."""
+    return fetch_lineups_payload(fixture_id).get("confirmed", [])
+
+def fetch_lineups_batch(fixture_ids, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+    """Fetch the lineups payload of several fixtures concurrently. Returns fixture_id -> payload, failed fetches left out."""
+    payloads = fetch_json_batch([lineups_url(fixture_id) for fixture_id in fixture_ids], max_concurrency, min_interval)
+    return {fixture_id: payloads[lineups_url(fixture_id)] for fixture_id in fixture_ids if lineups_url(fixture_id) in payloads}
+
+def incidents_url(event_id):
+    # https://www.sofascore.com/api/v1/event/12436870/incidents
+    return f"https://www.sofascore.com/api/v1/event/{event_id}/incidents"
+
+def fetch_incidents_batch(event_ids, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+    """Fetch the incidents payload of several events concurrently. Returns event_id -> payload, failed fetches left out."""
+    payloads = fetch_json_batch([incidents_url(event_id) for event_id in event_ids], max_concurrency, min_interval)
+    return {event_id: payloads[incidents_url(event_id)] for event_id in event_ids if incidents_url(event_id) in payloads}
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime
-from utils.extractors.data_fetcher import fetch_json
+from datetime import datetime, timezone
+from utils.extractors.data_fetcher import (
+    fetch_json, fetch_incidents_batch, fetch_lineups_batch, DEFAULT_BATCH_CONCURRENCY, DEFAULT_MIN_REQUEST_INTERVAL
+)
 from utils.api.incidents import extract_goal_incidents, compute_game_states
+from utils.profiling import span
 
 # Extract and reshape data
 def flatten_table_row(row):
@@ -54,7 +57,7 @@ def get_flattened_standings(standing_tables):
     return table_df_formatted
 
 
-def flatten_round_row(row):
+def flatten_round_row(row, incidents=None):
     base = {
         "id": row.get("id"),
         "customId": row.get("customId"),
@@ -85,7 +88,7 @@ def flatten_round_row(row):
         "homeTeam.id": row.get("homeTeam", {}).get("id"),
         "homeTeam.name": row.get("homeTeam", {}).get("name"),
         "homeTeam.slug": row.get("homeTeam", {}).get("slug"),
-        "awayTeam.id": row.get("homeTeam", {}).get("id"),
+        "awayTeam.id": row.get("awayTeam", {}).get("id"),
         "awayTeam.name": row.get("awayTeam", {}).get("name"),
         "awayTeam.slug": row.get("awayTeam", {}).get("slug"),                        
         
@@ -103,38 +106,157 @@ def flatten_round_row(row):
     base["result"] = "Home" if base["homeScore.display"] > base["awayScore.display"] else "Away" if base["homeScore.display"] < base["awayScore.display"] else "Draw"          
     base["kickoff"] = datetime.fromtimestamp(base["startTimestamp"]).strftime("%Y-%m-%d %H:%M")
 
-    base["time.injuryTime1"], base["time.injuryTime2"], base["incidents.home_goals"], base["incidents.away_goals"] = extract_goal_incidents(base)
+    base["time.injuryTime1"], base["time.injuryTime2"], base["incidents.home_goals"], base["incidents.away_goals"] = extract_goal_incidents(base, incidents)
     
     # st.json(base["incidents.home_goals"], expanded=False)
     # st.write(f"base {base['incidents.home_goals']} {base['incidents.away_goals']}")
     
     base["time.totalTime"] = 90 + base["time.injuryTime1"] + base["time.injuryTime2"]
     
-    base["segments"], base["gameStates"] = compute_game_states(
-        base["incidents.home_goals"],
-        base["incidents.away_goals"],
-        base["time.totalTime"],
-        base["time.injuryTime1"],
-        base["time.injuryTime2"]
-    )
+    with span("game states", "compute"):
+        base["segments"], base["gameStates"] = compute_game_states(
+            base["incidents.home_goals"],
+            base["incidents.away_goals"],
+            base["time.totalTime"],
+            base["time.injuryTime1"],
+            base["time.injuryTime2"]
+        )
     
     # Include any other columns you want in the same format:
     # "column_name": row.get("column_name", default_value)
     
     return base
 
-def get_flattened_round_events(round_events):
+def collect_round_fixtures(events, season_id, round_id):
+    """
+    Keep the finished matches of a round (timed and with a winner code), tagged with
+    their season and round so flatten_fixture_row can build the fixtures row.
+    """
+    fixtures = []
+    for e in events:
+        if e.get("time") and e.get("winnerCode") is not None:
+            fixtures.append({**e, "season_id": season_id, "round_id": round_id})
+    return fixtures
+
+def flatten_fixture_row(row):
+    
+    try:
+        kickoff_dt = datetime.fromtimestamp(row["startTimestamp"], tz=timezone.utc)
+    except Exception:
+        kickoff_dt = None
+    
+    return {
+        "fixture_id": row["id"],
+        "fixture_custom_id": row.get("customId"),
+        "home_team_id": row["homeTeam"]["id"],
+        "away_team_id": row["awayTeam"]["id"],
+        "season_id": row["season_id"],
+        "round": row["round_id"],
+        "kickoff_date_time": kickoff_dt.isoformat() if kickoff_dt else None,        
+        "injury_time_1": row.get("time", {}).get("injuryTime1", 0),
+        "injury_time_2": row.get("time", {}).get("injuryTime2", 0),
+        "total_time": 90 + row.get("time", {}).get("injuryTime1", 0) + row.get("time", {}).get("injuryTime2", 0),
+        "home_score": row.get("homeScore", {}).get("current", 0),
+        "away_score": row.get("awayScore", {}).get("current", 0),
+        "result": (
+            "H" if row["homeScore"]["current"] > row["awayScore"]["current"]
+            else "A" if row["homeScore"]["current"] < row["awayScore"]["current"]
+            else "D"
+        )
+    }
+
+# Fixtures whose lineups are fetched per batch while harvesting players
+DEFAULT_LINEUP_BATCH = 40
+
+def flatten_lineup_players(lineups, home_team_id, away_team_id):
+    """
+    Player rows from a lineups payload (starters and substitutes of both sides),
+    tagged with the team they played for in that fixture.
+    """
+    players = []
+    for side, team_id in (("home", home_team_id), ("away", away_team_id)):
+        for entry in lineups.get(side, {}).get("players", []):
+            player = entry.get("player", {})
+            if player.get("id") is None:
+                continue
+            players.append({
+                "player_id": player["id"],
+                "name": player.get("name"),
+                "shortName": player.get("shortName"),
+                "position": player.get("position"),
+                "team_id": team_id,
+            })
+    return players
+
+def harvest_players(fixtures, batch_size=DEFAULT_LINEUP_BATCH, max_concurrency=DEFAULT_BATCH_CONCURRENCY,
+                    min_interval=DEFAULT_MIN_REQUEST_INTERVAL, progress=None):
+    """
+    Collects every player who appeared in the given fixtures' lineups.
+
+    Lineups are fetched concurrently in batches and folded into a player_id -> row map
+    as each batch arrives, so only one batch of payloads is held at a time. Fixtures are
+    processed in kickoff order, so a player who moved clubs keeps their latest team.
+
+    Args:
+        fixtures (list): Fixture rows with fixture_id, home_team_id, away_team_id and kickoff_date_time.
+        batch_size (int): Fixtures whose lineups are fetched per batch.
+        max_concurrency (int): Max lineup fetches in flight at once.
+        min_interval (float): Minimum seconds between fetch starts.
+        progress (callable): Called as progress(done, total) after each batch.
+
+    Returns:
+        list: One row per unique player.
+    """
+    fixtures = sorted(fixtures, key=lambda f: f.get("kickoff_date_time") or "")
+    players = {}
+    for start in range(0, len(fixtures), batch_size):
+        batch = fixtures[start:start + batch_size]
+        lineups_by_fixture = fetch_lineups_batch(
+            [f["fixture_id"] for f in batch], max_concurrency=max_concurrency, min_interval=min_interval
+        )
+        for fixture in batch:
+            lineups = lineups_by_fixture.get(fixture["fixture_id"], {})
+            for player in flatten_lineup_players(lineups, fixture["home_team_id"], fixture["away_team_id"]):
+                players[player["player_id"]] = player
+        if progress:
+            progress(min(start + batch_size, len(fixtures)), len(fixtures))
+    return list(players.values())
+
+def get_flattened_round_events(round_events, max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
     """
     Extracts and flattened the round events data from the provided round events.
     
     Args:
         round_events (list): List of round events containing match data.
+        max_concurrency (int): Max incident fetches in flight at once.
+        min_interval (float): Minimum seconds between incident fetch starts.
         
     Returns:
         list: List of flattened match data dictionaries.
     """
-    flattened_data = [flatten_round_row(row) for row in round_events]
-    return pd.DataFrame(flattened_data)
+    # Fetch every match's incidents concurrently up front instead of one per row
+    with span("incidents", "fetch"):
+        incidents_by_event = fetch_incidents_batch(
+            [row.get("id") for row in round_events],
+            max_concurrency=max_concurrency,
+            min_interval=min_interval,
+        )
+        # A failed fetch is left out rather than read as a goalless match: retry those once
+        failed = [row.get("id") for row in round_events if row.get("id") not in incidents_by_event]
+        if failed:
+            incidents_by_event.update(
+                fetch_incidents_batch(failed, max_concurrency=max_concurrency, min_interval=min_interval)
+            )
+    skipped = [row.get("id") for row in round_events if row.get("id") not in incidents_by_event]
+    if skipped:
+        st.warning(f"Could not fetch incidents for {len(skipped)} match(es), left out: {skipped}")
+    with span("flatten round events", "parse"):
+        flattened_data = [
+            flatten_round_row(row, incidents_by_event[row.get("id")])
+            for row in round_events
+            if row.get("id") in incidents_by_event
+        ]
+        return pd.DataFrame(flattened_data)
     # df = pd.DataFrame(flattened_data)   
     
     # # Reorder columns to put match_label first
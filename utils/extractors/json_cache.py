@@ -0,0 +1,168 @@
+# utils/extractors/json_cache.py
+import os
+import re
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import defaultdict
+
+DEFAULT_CACHE_PATH = os.environ.get("SOFASCORE_CACHE_PATH", ".cache/sofascore.sqlite")
+
+# TTLs in seconds; None means the payload never changes once stored
+IMMUTABLE = None
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+FINISHED_PERIOD_TEXTS = {"FT", "AET", "PEN"}
+
+
+def _incidents_ttl(payload):
+    # A final whistle period incident means the match is over and its incidents are settled
+    finished = any(
+        i.get("incidentType") == "period" and i.get("text") in FINISHED_PERIOD_TEXTS
+        for i in payload.get("incidents", [])
+    )
+    return IMMUTABLE if finished else MINUTE
+
+
+def _round_events_ttl(payload):
+    events = payload.get("events", [])
+    finished = bool(events) and all(e.get("status", {}).get("type") == "finished" for e in events)
+    return IMMUTABLE if finished else MINUTE
+
+
+def _standings_ttl(payload):
+    # A round-robin league is complete once every team has played everyone home and away
+    for table in payload.get("standings", []):
+        rows = table.get("rows", [])
+        if not rows or any(r.get("matches") != 2 * (len(rows) - 1) for r in rows):
+            return HOUR
+    return IMMUTABLE if payload.get("standings") else HOUR
+
+
+def _lineups_ttl(payload):
+    return DAY if payload.get("confirmed") else 10 * MINUTE
+
+
+# (endpoint name, URL pattern, ttl or payload -> ttl). First match wins.
+CACHE_POLICIES = [
+    ("incidents", re.compile(r"/event/\d+/incidents$"), _incidents_ttl),
+    ("lineups", re.compile(r"/event/\d+/lineups$"), _lineups_ttl),
+    ("round_events", re.compile(r"/events/round/\d+$"), _round_events_ttl),
+    ("standings", re.compile(r"/standings/total$"), _standings_ttl),
+    ("rounds", re.compile(r"/rounds$"), HOUR),
+    ("seasons", re.compile(r"/seasons$"), DAY),
+]
+DEFAULT_TTL = 5 * MINUTE
+
+
+def endpoint_for(url):
+    """Name of the cache policy that applies to a URL ("other" if none)."""
+    for name, pattern, _ in CACHE_POLICIES:
+        if pattern.search(url):
+            return name
+    return "other"
+
+
+def ttl_for(url, payload):
+    """Seconds a payload stays fresh, or None if it never expires."""
+    for _, pattern, ttl in CACHE_POLICIES:
+        if pattern.search(url):
+            return ttl(payload) if callable(ttl) else ttl
+    return DEFAULT_TTL
+
+
+class JsonCache:
+    """
+    URL -> JSON cache stored as zlib-compressed blobs in SQLite.
+
+    Freshness is decided per endpoint by CACHE_POLICIES when a payload is stored,
+    so finished matches are kept forever while live data expires quickly.
+    Hit/miss counters are kept per endpoint for the current process.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, body BLOB NOT NULL, fetched_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._conn.commit()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "expired": 0, "stores": 0})
+
+    def get(self, url):
+        """Return the cached payload for a URL, or None if missing or stale."""
+        endpoint = endpoint_for(url)
+        with self._lock:
+            row = self._conn.execute("SELECT body, expires_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self._stats[endpoint]["misses"] += 1
+                return None
+            body, expires_at = row
+            if expires_at is not None and expires_at < time.time():
+                self._stats[endpoint]["misses"] += 1
+                self._stats[endpoint]["expired"] += 1
+                return None
+            self._stats[endpoint]["hits"] += 1
+        return json.loads(zlib.decompress(body))
+
+    def put(self, url, payload):
+        """Store a payload with the TTL its endpoint policy assigns. Empty payloads are not cached."""
+        if not payload:
+            return
+        ttl = ttl_for(url, payload)
+        now = time.time()
+        body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, fetched_at, expires_at) VALUES (?, ?, ?, ?)",
+                (url, body, now, None if ttl is IMMUTABLE else now + ttl),
+            )
+            self._conn.commit()
+            self._stats[endpoint_for(url)]["stores"] += 1
+
+    def purge_expired(self):
+        """Delete stale rows. Returns the number removed."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        """Per-endpoint hit/miss counters plus an overall hit rate."""
+        with self._lock:
+            per_endpoint = {name: dict(counts) for name, counts in self._stats.items()}
+            stored = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses").fetchone()
+        hits = sum(c["hits"] for c in per_endpoint.values())
+        lookups = hits + sum(c["misses"] for c in per_endpoint.values())
+        return {
+            "endpoints": per_endpoint,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": stored[0],
+            "bytes": stored[1],
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_json_cache():
+    """Return the process-wide JSON cache, opening it on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = JsonCache()
+        return _cache
@@ -0,0 +1,140 @@
+# utils/extractors/replay.py
+import os
+import json
+import gzip
+import math
+import time
+import threading
+
+# Fetch modes:
+#   live   - fetch from the network (default)
+#   record - fetch from the network and append every URL -> JSON response to the archive
+#   replay - serve responses from the archive only; no network access
+FETCH_MODES = ("live", "record", "replay")
+
+DEFAULT_ARCHIVE_PATH = "fixtures/sofascore.jsonl.gz"
+
+
+class ReplayMissError(KeyError):
+    """Raised in replay mode when the archive has no response for a URL."""
+
+
+class FixtureArchive:
+    """
+    Gzipped JSON-lines file of recorded responses: {"url", "payload", "elapsed"} per line.
+
+    Recording appends a gzip member per response, so an interrupted run keeps
+    everything captured so far. When a URL is recorded twice the last one wins.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._responses = None  # url -> (payload, elapsed)
+
+    def _load(self):
+        if self._responses is None:
+            self._responses = {}
+            if os.path.exists(self.path):
+                with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._responses[entry["url"]] = (entry["payload"], entry.get("elapsed", 0.0))
+        return self._responses
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._load()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def urls(self):
+        with self._lock:
+            return sorted(self._load())
+
+    def record(self, url, payload, elapsed=0.0):
+        entry = {"url": url, "payload": payload, "elapsed": round(elapsed, 4)}
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self._load()[url] = (payload, entry["elapsed"])
+
+    def lookup(self, url):
+        """Return (payload, recorded_elapsed) for a URL or raise ReplayMissError."""
+        with self._lock:
+            responses = self._load()
+            if url not in responses:
+                raise ReplayMissError(f"No recorded response for {url} in {self.path}")
+            payload, elapsed = responses[url]
+        # Hand out a copy so callers that mutate payloads can't change later replays
+        return json.loads(json.dumps(payload)), elapsed
+
+
+class ReplaySettings:
+    """
+    Fetch mode, archive and simulated latency, read from the environment:
+
+        SOFASCORE_FETCH_MODE       live | record | replay
+        SOFASCORE_FIXTURE_ARCHIVE  archive path (default fixtures/sofascore.jsonl.gz)
+        SOFASCORE_REPLAY_LATENCY   seconds per replayed request, or "recorded" to
+                                   reuse the latency measured while recording
+    """
+
+    def __init__(self, mode=None, archive_path=None, latency=None):
+        mode = mode or os.environ.get("SOFASCORE_FETCH_MODE", "live")
+        if mode not in FETCH_MODES:
+            raise ValueError(f"Unknown fetch mode '{mode}'. Use one of: {', '.join(FETCH_MODES)}")
+        self.mode = mode
+        self.archive = FixtureArchive(archive_path or os.environ.get("SOFASCORE_FIXTURE_ARCHIVE", DEFAULT_ARCHIVE_PATH))
+        latency = latency if latency is not None else os.environ.get("SOFASCORE_REPLAY_LATENCY", "0")
+        self.latency = latency if latency == "recorded" else float(latency)
+
+    def _delay(self, recorded_elapsed):
+        return recorded_elapsed if self.latency == "recorded" else self.latency
+
+    def replay(self, url):
+        payload, elapsed = self.archive.lookup(url)
+        delay = self._delay(elapsed)
+        if delay:
+            time.sleep(delay)
+        return payload
+
+    def replay_batch(self, urls, max_concurrency):
+        """Replay several URLs, sleeping as long as a concurrent fetch of them would take."""
+        results = {}
+        delays = []
+        for url in dict.fromkeys(urls):
+            payload, elapsed = self.archive.lookup(url)
+            results[url] = payload
+            delays.append(self._delay(elapsed))
+        if delays and any(delays):
+            waves = math.ceil(len(delays) / max_concurrency)
+            time.sleep(max(delays) * waves)
+        return results
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_replay_settings():
+    """Return the process-wide fetch mode settings, read from the environment on first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = ReplaySettings()
+        return _settings
+
+
+def configure_replay(mode="live", archive_path=None, latency=None):
+    """Switch fetch mode in-process (e.g. from a benchmark script) instead of via environment variables."""
+    global _settings
+    with _settings_lock:
+        _settings = ReplaySettings(mode, archive_path, latency)
+        return _settings
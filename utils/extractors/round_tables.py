@@ -0,0 +1,203 @@
+# utils/extractors/round_tables.py
+"""
+Normalised, typed tables for flattened round events.
+
+get_flattened_round_events returns one wide row per match with goals and segments
+stored as Python lists in object columns. build_round_tables splits that into:
+
+    matches  - one row per match (ids, teams, scores, injury time, result)
+    goals    - one row per goal (match_id, minute, added, team, ...), the goals
+               table utils.api.game_states expects
+    segments - one row per game-state segment, computed by the vectorised engine
+
+with nullable integer, string and categorical columns, so they can be written to
+Parquet / Arrow and analysed without touching Python objects.
+"""
+import os
+import io
+
+import pandas as pd
+
+from utils.api.game_states import compute_game_states_batch, STATES
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet/Arrow output is optional
+    pa = None
+    pq = None
+
+PARQUET_AVAILABLE = pa is not None
+
+TEAM_SIDES = pd.CategoricalDtype(["home", "away"])
+HALVES = pd.CategoricalDtype(["1st", "2nd"])
+GAME_STATES = pd.CategoricalDtype(list(STATES))
+RESULTS = pd.CategoricalDtype(["Home", "Draw", "Away"])
+
+MATCH_COLUMNS = {
+    "match_id": "Int64",
+    "custom_id": "string",
+    "season_id": "Int64",
+    "season_name": "string",
+    "round": "Int64",
+    "kickoff": "datetime64[ns, UTC]",
+    "home_team_id": "Int64",
+    "home_team": "string",
+    "away_team_id": "Int64",
+    "away_team": "string",
+    "home_score": "Int64",
+    "away_score": "Int64",
+    "result": RESULTS,
+    "winner_code": "Int64",
+    "home_red_cards": "Int64",
+    "away_red_cards": "Int64",
+    "injury_time_1": "Int64",
+    "injury_time_2": "Int64",
+    "total_time": "Int64",
+}
+
+GOAL_COLUMNS = {
+    "match_id": "Int64",
+    "minute": "Int64",
+    "added": "Int64",
+    "team": TEAM_SIDES,
+    "team_id": "Int64",
+    "half": HALVES,
+    "player_id": "Int64",
+    "player": "string",
+    "player_short_name": "string",
+    "own_goal": "boolean",
+    "goal_type": "category",
+}
+
+SEGMENT_COLUMNS = {
+    "match_id": "Int64",
+    "segment": "Int64",
+    "start": "float64",
+    "end": "float64",
+    "duration": "float64",
+    "home": GAME_STATES,
+    "away": GAME_STATES,
+    "half": HALVES,
+}
+
+TABLE_COLUMNS = {"matches": MATCH_COLUMNS, "goals": GOAL_COLUMNS, "segments": SEGMENT_COLUMNS}
+
+
+def _typed(rows, columns):
+    df = pd.DataFrame(rows, columns=list(columns))
+    return df.astype(columns)
+
+
+def _match_row(row):
+    return {
+        "match_id": row["id"],
+        "custom_id": row.get("customId"),
+        "season_id": row.get("season.id"),
+        "season_name": row.get("season.name"),
+        "round": row.get("roundInfo.round"),
+        "kickoff": pd.to_datetime(row.get("startTimestamp"), unit="s", utc=True),
+        "home_team_id": row.get("homeTeam.id"),
+        "home_team": row.get("homeTeam.name"),
+        "away_team_id": row.get("awayTeam.id"),
+        "away_team": row.get("awayTeam.name"),
+        "home_score": row.get("homeScore.display"),
+        "away_score": row.get("awayScore.display"),
+        "result": row.get("result"),
+        "winner_code": row.get("winnerCode"),
+        "home_red_cards": None if pd.isna(row.get("homeRedCards")) else row.get("homeRedCards"),
+        "away_red_cards": None if pd.isna(row.get("awayRedCards")) else row.get("awayRedCards"),
+        "injury_time_1": row.get("time.injuryTime1"),
+        "injury_time_2": row.get("time.injuryTime2"),
+        "total_time": row.get("time.totalTime"),
+    }
+
+
+def _goal_rows(row):
+    for team, team_id, goals in (
+        ("home", row.get("homeTeam.id"), row.get("incidents.home_goals") or []),
+        ("away", row.get("awayTeam.id"), row.get("incidents.away_goals") or []),
+    ):
+        for goal in goals:
+            yield {
+                "match_id": row["id"],
+                # matchMinute is the raw incident minute; "minute" has been shifted by compute_game_states
+                "minute": goal.get("matchMinute"),
+                "added": goal.get("addedTime") or 0,
+                "team": team,
+                "team_id": team_id,
+                "half": goal.get("half"),
+                "player_id": goal.get("playerId"),
+                "player": goal.get("player"),
+                "player_short_name": goal.get("playerShortName"),
+                "own_goal": bool(goal.get("isOwnGoal", False)),
+                "goal_type": goal.get("type"),
+            }
+
+
+def build_round_tables(round_events):
+    """
+    Split flattened round events into typed matches, goals and segments tables.
+
+    Args:
+        round_events (DataFrame or list): Output of get_flattened_round_events (or its rows).
+
+    Returns:
+        dict: {"matches": DataFrame, "goals": DataFrame, "segments": DataFrame}
+    """
+    rows = round_events.to_dict("records") if isinstance(round_events, pd.DataFrame) else list(round_events)
+
+    matches = _typed([_match_row(row) for row in rows], MATCH_COLUMNS)
+    goals = _typed([goal for row in rows for goal in _goal_rows(row)], GOAL_COLUMNS)
+    # The engine works on plain numpy dtypes
+    segments = compute_game_states_batch(
+        goals.astype({"match_id": "int64", "minute": "float64", "added": "float64", "team": "object"}),
+        matches.astype({"match_id": "int64", "injury_time_1": "float64", "injury_time_2": "float64"}),
+    )
+    return {"matches": matches, "goals": goals, "segments": segments.astype(SEGMENT_COLUMNS)}
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet/Arrow output needs pyarrow (pip install pyarrow)")
+
+
+def to_arrow(tables):
+    """Convert the tables to pyarrow Tables (categoricals become dictionary-encoded columns)."""
+    _require_pyarrow()
+    return {name: pa.Table.from_pandas(df, preserve_index=False) for name, df in tables.items()}
+
+
+def to_parquet_bytes(df, compression="zstd"):
+    """One table as Parquet bytes, e.g. for st.download_button."""
+    _require_pyarrow()
+    buffer = io.BytesIO()
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), buffer, compression=compression)
+    return buffer.getvalue()
+
+
+def write_round_tables(tables, directory, compression="zstd"):
+    """
+    Write each table to <directory>/<name>.parquet.
+
+    Returns:
+        dict: table name -> file path.
+    """
+    _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, df in tables.items():
+        paths[name] = os.path.join(directory, f"{name}.parquet")
+        pq.write_table(pa.Table.from_pandas(df, preserve_index=False), paths[name], compression=compression)
+    return paths
+
+
+def read_round_tables(directory):
+    """Read tables written by write_round_tables back with their pandas dtypes."""
+    _require_pyarrow()
+    tables = {}
+    for name, columns in TABLE_COLUMNS.items():
+        path = os.path.join(directory, f"{name}.parquet")
+        if os.path.exists(path):
+            tables[name] = pq.read_table(path).to_pandas().astype(columns)
+    return tables
@@ -0,0 +1,247 @@
+# utils/extractors/standings_history.py
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_HISTORY_PATH = os.environ.get("SOFASCORE_STANDINGS_PATH", ".cache/standings.sqlite")
+
+# Rounds with no finished matches aren't stored; don't refetch them for this long
+EMPTY_ROUND_TTL_SECONDS = 15 * 60
+
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+
+STAT_COLUMNS = ["played", "wins", "draws", "losses", "scores_for", "scores_against", "points"]
+SNAPSHOT_COLUMNS = [
+    "round", "position", "team_id", "team_name", *STAT_COLUMNS, "score_diff", "position_change",
+]
+
+
+def season_key(tournament, season):
+    """Key a season's history by unique tournament and season id."""
+    return f"{tournament['unique_tournament']}:{season['id']}"
+
+
+def finished_results(events):
+    """(match_id, home_id, home_name, away_id, away_name, home_score, away_score) for each finished event."""
+    results = []
+    for e in events:
+        if e.get("status", {}).get("type") != "finished":
+            continue
+        home_score = e.get("homeScore", {}).get("current")
+        away_score = e.get("awayScore", {}).get("current")
+        if home_score is None or away_score is None:
+            continue
+        results.append((
+            e["id"],
+            e["homeTeam"]["id"], e["homeTeam"].get("name"),
+            e["awayTeam"]["id"], e["awayTeam"].get("name"),
+            home_score, away_score,
+        ))
+    return results
+
+
+def _apply_results(table, results):
+    """Add one round's results to a team_id -> stats table (mutates it)."""
+    for _, home_id, home_name, away_id, away_name, home_score, away_score in results:
+        for team_id, team_name, scored, conceded in (
+            (home_id, home_name, home_score, away_score),
+            (away_id, away_name, away_score, home_score),
+        ):
+            row = table.setdefault(team_id, {"team_name": team_name, **{c: 0 for c in STAT_COLUMNS}})
+            row["team_name"] = team_name or row["team_name"]
+            row["played"] += 1
+            row["scores_for"] += scored
+            row["scores_against"] += conceded
+            if scored > conceded:
+                row["wins"] += 1
+                row["points"] += POINTS_FOR_WIN
+            elif scored == conceded:
+                row["draws"] += 1
+                row["points"] += POINTS_FOR_DRAW
+            else:
+                row["losses"] += 1
+
+
+def _rank(table):
+    """Order teams by points, goal difference, goals scored, then name."""
+    return sorted(
+        table.items(),
+        key=lambda item: (
+            -item[1]["points"],
+            -(item[1]["scores_for"] - item[1]["scores_against"]),
+            -item[1]["scores_for"],
+            item[1]["team_name"] or "",
+        ),
+    )
+
+
+class StandingsHistory:
+    """
+    Round-by-round league tables stored in SQLite, built from round results.
+
+    SofaScore's standings endpoint only returns the current table, so each round's
+    finished matches are stored and the table after every round is derived from the
+    previous round's snapshot plus that round's results. Ingesting a round only
+    recomputes the snapshots from that round onwards; nothing is refetched.
+
+    Ties are broken by goal difference, then goals scored, then team name - a
+    simplification of league-specific rules (head-to-head etc.).
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS round_results ("
+            " season TEXT NOT NULL, round INTEGER NOT NULL, match_id INTEGER NOT NULL,"
+            " home_id INTEGER NOT NULL, home_name TEXT, away_id INTEGER NOT NULL, away_name TEXT,"
+            " home_score INTEGER NOT NULL, away_score INTEGER NOT NULL,"
+            " PRIMARY KEY (season, match_id));"
+            "CREATE TABLE IF NOT EXISTS snapshots ("
+            " season TEXT NOT NULL, round INTEGER NOT NULL, team_id INTEGER NOT NULL, team_name TEXT,"
+            " position INTEGER NOT NULL, played INTEGER, wins INTEGER, draws INTEGER, losses INTEGER,"
+            " scores_for INTEGER, scores_against INTEGER, points INTEGER, position_change INTEGER,"
+            " PRIMARY KEY (season, round, team_id));"
+            "CREATE TABLE IF NOT EXISTS empty_rounds ("
+            " season TEXT NOT NULL, round INTEGER NOT NULL, checked_at REAL NOT NULL,"
+            " PRIMARY KEY (season, round));"
+        )
+        self._conn.commit()
+
+    def rounds(self, season):
+        """Round numbers with stored results, in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT round FROM round_results WHERE season = ? ORDER BY round", (season,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def recently_empty_rounds(self, season, ttl=EMPTY_ROUND_TTL_SECONDS):
+        """Rounds fetched within the last `ttl` seconds that had no finished matches yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT round FROM empty_rounds WHERE season = ? AND checked_at >= ?", (season, time.time() - ttl)
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def ingest_round(self, season, round_number, events):
+        """
+        Store a round's finished results and update the snapshots from that round on.
+
+        A fetch with fewer finished matches than already stored (an empty or partial
+        response) leaves the stored round alone. A round with no finished matches is
+        remembered for EMPTY_ROUND_TTL_SECONDS (see recently_empty_rounds).
+
+        Returns:
+            bool: True if the round's results changed (and snapshots were recomputed).
+        """
+        results = sorted(finished_results(events))
+        with self._lock:
+            stored = [tuple(r) for r in self._conn.execute(
+                "SELECT match_id, home_id, home_name, away_id, away_name, home_score, away_score "
+                "FROM round_results WHERE season = ? AND round = ? ORDER BY match_id",
+                (season, round_number),
+            )]
+            if not results and not stored:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO empty_rounds VALUES (?, ?, ?)", (season, round_number, time.time())
+                )
+                self._conn.commit()
+                return False
+            if stored == results or len(results) < len(stored):
+                return False
+
+            self._conn.execute("DELETE FROM empty_rounds WHERE season = ? AND round = ?", (season, round_number))
+            self._conn.execute("DELETE FROM round_results WHERE season = ? AND round = ?", (season, round_number))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO round_results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(season, round_number, *r) for r in results],
+            )
+            self._recompute_from(season, round_number)
+            self._conn.commit()
+        return True
+
+    def _recompute_from(self, season, round_number):
+        """Rebuild snapshots for every stored round >= round_number from the snapshot just before it."""
+        previous = self._conn.execute(
+            "SELECT MAX(round) FROM snapshots WHERE season = ? AND round < ?", (season, round_number)
+        ).fetchone()[0]
+
+        table, positions = {}, {}
+        if previous is not None:
+            for team_id, team_name, position, *stats in self._conn.execute(
+                f"SELECT team_id, team_name, position, {', '.join(STAT_COLUMNS)} "
+                "FROM snapshots WHERE season = ? AND round = ?",
+                (season, previous),
+            ):
+                table[team_id] = {"team_name": team_name, **dict(zip(STAT_COLUMNS, stats))}
+                positions[team_id] = position
+
+        self._conn.execute("DELETE FROM snapshots WHERE season = ? AND round >= ?", (season, round_number))
+        later_rounds = [r[0] for r in self._conn.execute(
+            "SELECT DISTINCT round FROM round_results WHERE season = ? AND round >= ? ORDER BY round",
+            (season, round_number),
+        )]
+        for current in later_rounds:
+            results = self._conn.execute(
+                "SELECT match_id, home_id, home_name, away_id, away_name, home_score, away_score "
+                "FROM round_results WHERE season = ? AND round = ?",
+                (season, current),
+            ).fetchall()
+            _apply_results(table, results)
+
+            rows = []
+            for position, (team_id, stats) in enumerate(_rank(table), start=1):
+                previous_position = positions.get(team_id)
+                change = None if previous_position is None else previous_position - position
+                rows.append((
+                    season, current, team_id, stats["team_name"], position,
+                    *(stats[c] for c in STAT_COLUMNS), change,
+                ))
+                positions[team_id] = position
+            self._conn.executemany(
+                "INSERT INTO snapshots (season, round, team_id, team_name, position, "
+                f"{', '.join(STAT_COLUMNS)}, position_change) VALUES ({', '.join('?' * (6 + len(STAT_COLUMNS)))})",
+                rows,
+            )
+
+    def history(self, season):
+        """
+        Every stored snapshot of a season.
+
+        Returns:
+            DataFrame: round, position, team_id, team_name, played ... points, score_diff, position_change
+        """
+        with self._lock:
+            df = pd.read_sql_query(
+                "SELECT * FROM snapshots WHERE season = ? ORDER BY round, position", self._conn, params=(season,)
+            )
+        df["score_diff"] = df["scores_for"] - df["scores_against"]
+        df["position_change"] = df["position_change"].astype("Int64")
+        return df[SNAPSHOT_COLUMNS]
+
+    def snapshot(self, season, round_number):
+        """The table after a given round, with each team's position change since the previous round."""
+        history = self.history(season)
+        return history[history["round"] == round_number].reset_index(drop=True)
+
+
+_history = None
+_history_lock = threading.Lock()
+
+
+def get_standings_history():
+    """Return the process-wide standings history store, opening it on first use."""
+    global _history
+    with _history_lock:
+        if _history is None:
+            _history = StandingsHistory()
+        return _history
@@ -0,0 +1,221 @@
+# utils/jobs/ingest_fixtures.py
+"""
+Headless, resumable fixture ingestion for a whole season.
+
+    python -m utils.jobs.ingest_fixtures --unique-tournament 17 --season 61627
+
+Fetches the season's rounds, then the events of every round concurrently, keeps the
+finished matches, and upserts the ones not yet stored as `flatten_fixture_row` rows
+in chunks. Progress is checkpointed to a JSON file after every round batch and every
+written chunk, so rerunning the same command after an interruption picks up where
+it stopped.
+
+Supabase credentials come from SUPABASE_URL / SUPABASE_KEY, falling back to the
+[supabase] section of .streamlit/secrets.toml.
+"""
+import os
+import json
+import time
+import logging
+import argparse
+
+from supabase import create_client
+
+from utils.api.ingest import filter_existing_ids, bulk_upsert, DEFAULT_WRITE_WORKERS
+from utils.extractors.data_fetcher import (
+    fetch_rounds_json, fetch_round_events_batch, DEFAULT_BATCH_CONCURRENCY, DEFAULT_MIN_REQUEST_INTERVAL
+)
+from utils.extractors.data_flatten import collect_round_fixtures, flatten_fixture_row
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT_DIR = ".cache/ingest"
+DEFAULT_ROUND_BATCH = 10  # rounds fetched between checkpoints
+DEFAULT_CHUNK_SIZE = 100  # fixtures per upsert request
+
+
+def get_supabase():
+    url = os.environ.get("SUPABASE_URL")
+    key = os.environ.get("SUPABASE_KEY")
+    if not (url and key):
+        import streamlit as st
+        url, key = st.secrets["supabase"]["url"], st.secrets["supabase"]["key"]
+    return create_client(url, key)
+
+
+class Checkpoint:
+    """
+    JSON progress file for one tournament/season run:
+        rounds  - round numbers whose events have been collected
+        pending - fixture_id -> flattened row collected but not yet confirmed written
+        written - fixture ids upserted (or found already stored)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rounds = set()
+        self.pending = {}
+        self.written = set()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            self.rounds = set(state.get("rounds", []))
+            self.pending = {int(k): v for k, v in state.get("pending", {}).items()}
+            self.written = set(state.get("written", []))
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        state = {"rounds": sorted(self.rounds), "pending": self.pending, "written": sorted(self.written)}
+        # Write then rename so a crash mid-write can't corrupt the checkpoint
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def fetch_season_fixtures(tournament, season, checkpoint, round_batch=DEFAULT_ROUND_BATCH,
+                          max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+    """Collect the flattened finished fixtures of every round not yet in the checkpoint."""
+    rounds_json = fetch_rounds_json(tournament, season)
+    round_numbers = [r["round"] for r in rounds_json.get("rounds", [])]
+    if not round_numbers:
+        raise RuntimeError(f"No rounds found for season {season['id']}")
+
+    remaining = [r for r in dict.fromkeys(round_numbers) if r not in checkpoint.rounds]
+    logger.info(f"{len(round_numbers)} rounds, {len(remaining)} still to fetch")
+
+    for start in range(0, len(remaining), round_batch):
+        batch = remaining[start:start + round_batch]
+        events_by_round = fetch_round_events_batch(tournament, season, batch, max_concurrency, min_interval)
+        for round_number in batch:
+            events = events_by_round.get(round_number, [])
+            if not events:
+                # Leave it out of the checkpoint so the next run retries it
+                logger.warning(f"No events for round {round_number}")
+                continue
+            for fixture in collect_round_fixtures(events, season["id"], round_number):
+                if fixture["id"] not in checkpoint.written:
+                    checkpoint.pending[fixture["id"]] = flatten_fixture_row(fixture)
+            checkpoint.rounds.add(round_number)
+        checkpoint.save()
+        logger.info(f"Fetched rounds {batch[0]}-{batch[-1]} ({len(checkpoint.pending)} fixtures pending)")
+
+
+def write_pending_fixtures(client, checkpoint, chunk_size=DEFAULT_CHUNK_SIZE, max_workers=DEFAULT_WRITE_WORKERS):
+    """
+    Upsert pending fixtures that aren't stored yet, checkpointing as each chunk lands.
+    Rows that fail stay pending, so the next run retries them.
+
+    Returns:
+        dict: bulk_upsert report.
+    """
+    existing_ids = filter_existing_ids(client, "fixtures", "fixture_id", checkpoint.pending)
+    for fixture_id in [f for f in checkpoint.pending if f in existing_ids]:
+        checkpoint.pending.pop(fixture_id)
+        checkpoint.written.add(fixture_id)
+    checkpoint.save()
+
+    rows = list(checkpoint.pending.values())
+    done = 0
+
+    def on_chunk(chunk, chunk_report):
+        nonlocal done
+        failed_ids = {f["row"]["fixture_id"] for f in chunk_report["failed_rows"]}
+        for row in chunk:
+            if row["fixture_id"] not in failed_ids:
+                checkpoint.pending.pop(row["fixture_id"])
+                checkpoint.written.add(row["fixture_id"])
+        checkpoint.save()
+        done += len(chunk)
+        logger.info(f"Upserted {done}/{len(rows)} fixtures")
+
+    return bulk_upsert(
+        client, "fixtures", rows, on_conflict="fixture_id", ignore_duplicates=True,
+        chunk_size=chunk_size, max_workers=max_workers, on_chunk=on_chunk,
+    )
+
+
+def run(unique_tournament, season_id, checkpoint_path=None, fresh=False, round_batch=DEFAULT_ROUND_BATCH,
+        chunk_size=DEFAULT_CHUNK_SIZE, write_workers=DEFAULT_WRITE_WORKERS,
+        max_concurrency=DEFAULT_BATCH_CONCURRENCY, min_interval=DEFAULT_MIN_REQUEST_INTERVAL):
+    """
+    Ingest every finished fixture of a season.
+
+    Args:
+        unique_tournament (int): SofaScore unique tournament id (e.g. 17 for the Premier League).
+        season_id (int): SofaScore season id.
+        checkpoint_path (str): Progress file; defaults to one per tournament/season under .cache/ingest.
+        fresh (bool): Ignore any existing checkpoint and start over.
+
+    Returns:
+        dict: counts of fixtures written, already stored and failed, plus elapsed seconds.
+    """
+    started = time.perf_counter()
+    checkpoint_path = checkpoint_path or os.path.join(
+        DEFAULT_CHECKPOINT_DIR, f"fixtures_{unique_tournament}_{season_id}.json"
+    )
+    checkpoint = Checkpoint(checkpoint_path)
+    if fresh:
+        checkpoint.clear()
+        checkpoint = Checkpoint(checkpoint_path)
+    elif checkpoint.rounds:
+        logger.info(f"Resuming from {checkpoint_path}: {len(checkpoint.rounds)} rounds done, {len(checkpoint.written)} fixtures written")
+
+    tournament = {"unique_tournament": unique_tournament}
+    season = {"id": season_id}
+    fetch_season_fixtures(tournament, season, checkpoint, round_batch, max_concurrency, min_interval)
+
+    client = get_supabase()
+    report = write_pending_fixtures(client, checkpoint, chunk_size, write_workers)
+
+    summary = {
+        "written": report["written"],
+        "already_stored": len(checkpoint.written) - report["written"],
+        "failed": len(report["failed_rows"]),
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+    logger.info(f"Done: {summary}")
+    if report["failed_rows"]:
+        for failure in report["failed_rows"]:
+            logger.error(f"Fixture {failure['row']['fixture_id']} failed: {failure['error']}")
+        logger.error(f"Checkpoint kept at {checkpoint_path}; rerun to retry the failed fixtures")
+    else:
+        checkpoint.clear()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest every finished fixture of a SofaScore season into Supabase.")
+    parser.add_argument("--unique-tournament", type=int, required=True, help="SofaScore unique tournament id (17 = Premier League)")
+    parser.add_argument("--season", type=int, required=True, help="SofaScore season id")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: .cache/ingest/fixtures_<tournament>_<season>.json)")
+    parser.add_argument("--fresh", action="store_true", help="Ignore an existing checkpoint and start over")
+    parser.add_argument("--round-batch", type=int, default=DEFAULT_ROUND_BATCH, help="Rounds fetched between checkpoints")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Fixtures per upsert request")
+    parser.add_argument("--write-workers", type=int, default=DEFAULT_WRITE_WORKERS, help="Upsert chunks in flight at once")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY, help="Round fetches in flight at once")
+    parser.add_argument("--min-interval", type=float, default=DEFAULT_MIN_REQUEST_INTERVAL, help="Minimum seconds between request starts")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    run(
+        args.unique_tournament,
+        args.season,
+        checkpoint_path=args.checkpoint,
+        fresh=args.fresh,
+        round_batch=args.round_batch,
+        chunk_size=args.chunk_size,
+        write_workers=args.write_workers,
+        max_concurrency=args.concurrency,
+        min_interval=args.min_interval,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -140,3 +140,22 @@ def add_common_page_elements():
     return sidebar_container
 
 
+
+
+def show_bulk_report(report, noun):
+    """
+    Shows the outcome of utils.api.ingest.bulk_upsert: a success line, plus the rows
+    that failed (with their errors) if any.
+
+    Returns:
+        bool: True if every row was written.
+    """
+    if report["written"]:
+        st.success(f"🎉 {report['written']} {noun} written to Supabase")
+    if report["failed_rows"]:
+        st.error(f"❌ {len(report['failed_rows'])} of {report['rows']} {noun} failed")
+        st.dataframe([{**f["row"], "error": f["error"]} for f in report["failed_rows"]])
+        return False
+    if not report["written"]:
+        st.info(f"No new {noun} written (already stored).")
+    return True
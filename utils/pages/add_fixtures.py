@@ -1,10 +1,10 @@
 import streamlit as st
 import pandas as pd
 from supabase import create_client
-from utils.extractors.data_fetcher import fetch_rounds_json, fetch_round_events
-from utils.page_components import add_common_page_elements
-
-from datetime import datetime, timezone
+from utils.api.ingest import filter_existing_ids, bulk_upsert
+from utils.extractors.data_fetcher import fetch_rounds_json, fetch_round_events_batch
+from utils.extractors.data_flatten import collect_round_fixtures, flatten_fixture_row
+from utils.page_components import add_common_page_elements, show_bulk_report
 
 # Supabase client
 supabase = create_client(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"])
@@ -24,39 +24,11 @@ def get_seasons(tournament_id):
     res = supabase.table("seasons").select("id, season_id, name, year").eq("tournament_id", tournament_id).execute()
     return res.data or []
 
-def get_existing_fixtures():
-    res = supabase.table("fixtures").select("fixture_id").execute()
-    return {f["fixture_id"] for f in res.data} if res.data else set()
+def get_existing_fixtures(fixture_ids):
+    return filter_existing_ids(supabase, "fixtures", "fixture_id", fixture_ids)
 
 def insert_fixtures(fixtures):
-    return supabase.table("fixtures").insert(fixtures).execute()
-
-def flatten_fixture_row(row):
-    
-    try:
-        kickoff_dt = datetime.fromtimestamp(row["startTimestamp"], tz=timezone.utc)
-    except Exception:
-        kickoff_dt = None
-    
-    return {
-        "fixture_id": row["id"],
-        "fixture_custom_id": row.get("customId"),
-        "home_team_id": row["homeTeam"]["id"],
-        "away_team_id": row["awayTeam"]["id"],
-        "season_id": row["season_id"],
-        "round": row["round_id"],
-        "kickoff_date_time": kickoff_dt.isoformat() if kickoff_dt else None,        
-        "injury_time_1": row.get("time", {}).get("injuryTime1", 0),
-        "injury_time_2": row.get("time", {}).get("injuryTime2", 0),
-        "total_time": 90 + row.get("time", {}).get("injuryTime1", 0) + row.get("time", {}).get("injuryTime2", 0),
-        "home_score": row.get("homeScore", {}).get("current", 0),
-        "away_score": row.get("awayScore", {}).get("current", 0),
-        "result": (
-            "H" if row["homeScore"]["current"] > row["awayScore"]["current"]
-            else "A" if row["homeScore"]["current"] < row["awayScore"]["current"]
-            else "D"
-        )
-    }
+    return bulk_upsert(supabase, "fixtures", fixtures, on_conflict="fixture_id", ignore_duplicates=True)
 
 # --- UI Flow ---
 
@@ -140,29 +112,19 @@ if "rounds_fetched" in st.session_state and st.button("Fetch Fixtures for All Ro
     rounds_df = st.session_state["rounds_fetched"]
     all_fixtures = []
 
-    for _, round_row in rounds_df.iterrows():
-        round_id = round_row["round"]
-        season_id = round_row["season_id"]
-
-        # Prepare season and round dicts
-        season_obj = {"id": season_id}
-        round_events_json = fetch_round_events(tournament, season_obj, round_id)
+    # Fetch every round's events concurrently, then keep the finished matches
+    for season_id, season_rounds in rounds_df.groupby("season_id"):
+        season_id = int(season_id)  # plain int so the rows stay JSON-serialisable
+        round_ids = season_rounds["round"].tolist()
+        events_by_round = fetch_round_events_batch(tournament, {"id": season_id}, round_ids)
 
-        events = round_events_json if isinstance(round_events_json, list) else round_events_json.get("events", [])
-        if not events:
-            st.info(f"No events for round ID {round_id}")
-            continue
+        for round_id in round_ids:
+            events = events_by_round.get(round_id, [])
+            if not events:
+                st.info(f"No events for round ID {round_id}")
+                continue
+            all_fixtures.extend(collect_round_fixtures(events, season_id, round_id))
 
-        for e in events:
-            # Just capture everything for now
-            if e.get("time"):
-                fixture = {**e, "season_id": season_id, "round_id": round_id} 
-                if fixture.get("winnerCode") is None:
-                    continue
-                else:
-                    all_fixtures.append(fixture)
-
-        
     if all_fixtures:
         st.subheader(f"📝 {len(all_fixtures)} Fixtures Fetched")
         st.dataframe(pd.DataFrame(all_fixtures))
@@ -174,9 +136,9 @@ if "rounds_fetched" in st.session_state and st.button("Fetch Fixtures for All Ro
     
     
     st.subheader("Already Added Fixtures")
-    existing_ids = get_existing_fixtures()
+    existing_ids = get_existing_fixtures([f["id"] for f in all_fixtures])
     
-    st.write(f"Existing IDs: {len(existing_ids)}")
+    st.write(f"Already stored: {len(existing_ids)} of {len(all_fixtures)}")
     
     already_added = [f for f in all_fixtures if f["id"] in existing_ids]
     not_added = [f for f in all_fixtures if f["id"] not in existing_ids]
@@ -223,11 +185,8 @@ if "rounds_new" in st.session_state: # and st.button("➕ Add Fixtures to Supaba
     st.dataframe(pd.DataFrame(insert_rows))
     if insert_rows:
         if st.button("➕ Add Fixtures to Supabase"):
-            result = insert_fixtures(insert_rows)
-            if hasattr(result, "data"):
-                st.success(f"🎉 {len(result.data)} fixtures inserted into Supabase")
-            else:
-                st.error("❌ Fixture insert failed")
+            report = insert_fixtures(insert_rows)
+            show_bulk_report(report, "fixtures")
     else:
         st.info("No new fixtures to insert.")
                 
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 from supabase import create_client
-from utils.extractors.data_fetcher import fetch_lineups
-from utils.page_components import add_common_page_elements
+from utils.api.ingest import filter_existing_ids, bulk_upsert
+from utils.extractors.data_flatten import harvest_players
+from utils.page_components import add_common_page_elements, show_bulk_report
 
 # Supabase client
 supabase = create_client(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"])
@@ -27,12 +28,11 @@ def get_fixtures(season_id):
     res = supabase.table("fixtures").select("id, fixture_id, home_team_id, away_team_id, round, kickoff_date_time").eq("season_id", season_id).execute()
     return res.data or []
 
-def get_existing_players():
-    res = supabase.table("players").select("player_id").execute()
-    return {p["player_id"] for p in res.data} if res.data else set()
+def get_existing_players(player_ids):
+    return filter_existing_ids(supabase, "players", "player_id", player_ids)
 
 def insert_players(players):
-    return supabase.table("players").insert(players).execute()
+    return bulk_upsert(supabase, "players", players, on_conflict="player_id", ignore_duplicates=True)
 
 # --- UI Flow ---
 
@@ -85,4 +85,45 @@ if st.button("Fetch Fixtures"):
         st.dataframe(df[columns])
     else:
         st.info("No fixtures found for the selected season.")
-    
\ No newline at end of file
+
+# Harvest players from every fixture's lineups
+if st.button("Harvest Players from Season Lineups"):
+    fixtures = get_fixtures(season_map[selected_season_name]["id"])
+    if not fixtures:
+        st.warning("No fixtures found for the selected season. Add fixtures first.")
+        st.stop()
+
+    progress_bar = st.progress(0.0, text="Fetching lineups...")
+    harvested = harvest_players(
+        fixtures,
+        progress=lambda done, total: progress_bar.progress(done / total, text=f"Lineups fetched for {done}/{total} fixtures"),
+    )
+    progress_bar.empty()
+
+    if not harvested:
+        st.warning("No players found in the lineups.")
+        st.stop()
+
+    # Check only the harvested ids against Supabase
+    existing_ids = get_existing_players([p["player_id"] for p in harvested])
+    st.session_state["players_already"] = [p for p in harvested if p["player_id"] in existing_ids]
+    st.session_state["players_new"] = [p for p in harvested if p["player_id"] not in existing_ids]
+    st.session_state["players_fetched"] = True
+
+# Display results
+if st.session_state.get("players_fetched"):
+    st.subheader(f"✅ Players Already in Supabase ({len(st.session_state['players_already'])})")
+    if st.session_state["players_already"]:
+        st.dataframe(pd.DataFrame(st.session_state["players_already"]))
+    else:
+        st.info("None yet.")
+
+    st.subheader(f"🆕 Players to Add ({len(st.session_state['players_new'])})")
+    if st.session_state["players_new"]:
+        st.dataframe(pd.DataFrame(st.session_state["players_new"]))
+        if st.button("➕ Add New Players to Supabase"):
+            report = insert_players(st.session_state["players_new"])
+            if show_bulk_report(report, "players"):
+                st.session_state["players_fetched"] = False  # reset view
+    else:
+        st.success("All players already added.")
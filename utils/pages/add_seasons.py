@@ -2,10 +2,12 @@ import streamlit as st
 from supabase import create_client
 import pandas as pd
 
+from utils.api.ingest import bulk_upsert
 from utils.extractors.data_fetcher import fetch_seasons_json
 
 from utils.page_components import (
     add_common_page_elements,
+    show_bulk_report,
 )
 
 # def show():
@@ -51,7 +53,7 @@ def insert_new_seasons(tournament_id, unique_tournament_id, seasons):
         }
         for s in seasons
     ]
-    return supabase.table("seasons").insert(rows).execute()
+    return bulk_upsert(supabase, "seasons", rows, on_conflict="season_id", ignore_duplicates=True)
 
 # UI
 st.title("📅 Add Seasons from API")
@@ -123,17 +125,13 @@ if st.session_state.get("fetched"):
     if new_seasons:
         st.dataframe(pd.DataFrame(new_seasons))
         if st.button("➕ Add New Seasons to Supabase"):
-            insert_response = insert_new_seasons(tournament["id"], tournament["unique_tournament"], new_seasons)
+            report = insert_new_seasons(tournament["id"], tournament["unique_tournament"], new_seasons)
 
-            if hasattr(insert_response, "data"):
-                st.success(f"🎉 Added {len(new_seasons)} new seasons")
-                st.write(insert_response.data)
+            if show_bulk_report(report, "seasons"):
                 # Optional: clear or refresh
                 del st.session_state["fetched"]
                 del st.session_state["new_seasons"]
                 del st.session_state["already_added"]
-            else:
-                st.error("Something went wrong inserting new seasons.")
     else:
         st.success("All seasons already added ✅")
 
@@ -1,8 +1,9 @@
 import streamlit as st
 import pandas as pd
 from supabase import create_client
+from utils.api.ingest import filter_existing_ids, bulk_upsert
 from utils.extractors.data_fetcher import fetch_standing_json
-from utils.page_components import add_common_page_elements
+from utils.page_components import add_common_page_elements, show_bulk_report
 
 # Supabase client
 supabase = create_client(st.secrets["supabase"]["url"], st.secrets["supabase"]["key"])
@@ -22,12 +23,11 @@ def get_seasons(tournament_id):
     res = supabase.table("seasons").select("id, season_id, name, year").eq("tournament_id", tournament_id).execute()
     return res.data or []
 
-def get_existing_teams():
-    res = supabase.table("teams").select("team_id").execute()
-    return {t["team_id"] for t in res.data} if res.data else set()
+def get_existing_teams(team_ids):
+    return filter_existing_ids(supabase, "teams", "team_id", team_ids)
 
 def insert_teams(teams):
-    return supabase.table("teams").insert(teams).execute()
+    return bulk_upsert(supabase, "teams", teams, on_conflict="team_id", ignore_duplicates=True)
 
 def fetch_teams_from_standings(standings_json):
     rows = standings_json.get("standings", [])
@@ -105,7 +105,7 @@ if st.button("Fetch Teams from SofaScore Standings"):
     unique_teams = {team["team_id"]: team for team in all_api_teams}.values()
 
     # Check against existing team_ids
-    existing_ids = get_existing_teams()
+    existing_ids = get_existing_teams([t["team_id"] for t in unique_teams])
     already_added = [t for t in unique_teams if t["team_id"] in existing_ids]
     not_added = [t for t in unique_teams if t["team_id"] not in existing_ids]
 
@@ -127,12 +127,9 @@ if st.session_state.get("teams_fetched"):
     if st.session_state["teams_new"]:
         st.dataframe(pd.DataFrame(st.session_state["teams_new"]))
         if st.button("➕ Add New Teams to Supabase"):
-            result = insert_teams(st.session_state["teams_new"])
-            if hasattr(result, "data"):
-                st.success(f"{len(result.data)} teams inserted")
+            report = insert_teams(st.session_state["teams_new"])
+            if show_bulk_report(report, "teams"):
                 st.session_state["teams_fetched"] = False  # reset view
-            else:
-                st.error("Insert failed.")
     else:
         st.success("All teams already added.")
  
\ No newline at end of file
@@ -11,11 +11,15 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 
-from utils.extractors.data_fetcher import fetch_json, fetch_seasons_json, fetch_standing_json, fetch_rounds_json, fetch_round_events
+from utils.extractors.data_fetcher import fetch_json, fetch_seasons_json, fetch_standing_json, fetch_rounds_json, fetch_round_events, fetch_round_events_batch
+from utils.extractors.standings_history import get_standings_history, season_key
+from utils.extractors.json_cache import get_json_cache
 from utils.api.tournaments import TOURNAMENTS
 from utils.extractors.data_flatten import get_flattened_standings, get_flattened_round_events
+from utils.extractors.round_tables import build_round_tables, to_parquet_bytes, PARQUET_AVAILABLE
 from utils.renders.text_renders import render_goal_list
-from utils.renders.graph_renders import render_game_state_gantt
+from utils.renders.graph_renders import render_game_state_gantt, render_round_game_states, plot_position_history
+from utils.profiling import PipelineProfiler, span
 
 from utils.page_components import (
     add_common_page_elements,
@@ -38,8 +42,13 @@ selected_tournament = next(t for t in TOURNAMENTS if t["name"] == selected_tourn
 # st.text(selected_tournament)
 # Fetch seasons
 # seasons_url = f"https://api.sofascore.com/api/v1/tournament/{selected_tournament['id']}/seasons"
+
+# Time each pipeline stage of this run (cProfile too when enabled in the sidebar panel).
+# Stopped in the finally below, so st.stop() and reruns don't leave cProfile running
+profiler = PipelineProfiler(use_cprofile=st.session_state.get("profile_with_cprofile", False)).start()
 try:
-    seasons_response = fetch_seasons_json(selected_tournament)
+    with span("seasons", "fetch"):
+        seasons_response = fetch_seasons_json(selected_tournament)
     seasons_data = seasons_response.get("seasons", [])
     if not seasons_data:
         st.warning("No seasons found")
@@ -53,7 +62,8 @@ try:
         selected_index = st.selectbox("Select a Season", range(len(season_names)), format_func=lambda i: season_names[i], index=1)
         selected_season = seasons_data[selected_index]
         
-        standings_response = fetch_standing_json(selected_tournament, selected_season)
+        with span("standings", "fetch"):
+            standings_response = fetch_standing_json(selected_tournament, selected_season)
         standing_tables = standings_response.get("standings", [])
         if not standing_tables:
             st.warning("No standings found")
@@ -62,10 +72,13 @@ try:
         if standing_tables:
         
             st.subheader("League Standings (Flattened Data)")
-            table_df_formatted = get_flattened_standings(standing_tables)
-            st.dataframe(table_df_formatted)
+            with span("flatten standings", "parse"):
+                table_df_formatted = get_flattened_standings(standing_tables)
+            with span("standings table", "render"):
+                st.dataframe(table_df_formatted)
             
-            rounds_data = fetch_rounds_json(selected_tournament, selected_season)
+            with span("rounds", "fetch"):
+                rounds_data = fetch_rounds_json(selected_tournament, selected_season)
             
             if "currentRound" in rounds_data and "rounds" in rounds_data:
                 current_round = rounds_data["currentRound"].get("round", 0)
@@ -73,35 +86,70 @@ try:
 
                 selected_round = st.selectbox("Select a Round", available_rounds, index=5)
 
+                with st.expander("📈 Standings History"):
+                    history_store = get_standings_history()
+                    history_key = season_key(selected_tournament, selected_season)
+                    stored_rounds = set(history_store.rounds(history_key))
+                    # The current round may still change, so it is always refreshed
+                    skip_rounds = stored_rounds | history_store.recently_empty_rounds(history_key)
+                    rounds_to_ingest = [r for r in available_rounds if r not in skip_rounds or r == current_round]
+                    st.caption(f"{len(stored_rounds)} of {len(available_rounds)} rounds stored locally")
+
+                    if st.button(f"🔄 Update history ({len(rounds_to_ingest)} rounds to fetch)", key="update_standings_history"):
+                        with span("history rounds", "fetch"):
+                            events_by_round = fetch_round_events_batch(selected_tournament, selected_season, rounds_to_ingest)
+                        with span("standings history", "compute"):
+                            # Rounds whose fetch failed are left out of events_by_round and retried next time
+                            changed = [r for r, events in events_by_round.items() if history_store.ingest_round(history_key, r, events)]
+                        st.success(f"Updated {len(changed)} rounds")
+
+                    standings_history = history_store.history(history_key)
+                    if standings_history.empty:
+                        st.info("No rounds stored yet for this season.")
+                    else:
+                        with span("position history chart", "render"):
+                            st.plotly_chart(plot_position_history(standings_history), use_container_width=True)
+                        snapshot_round = selected_round if selected_round in set(standings_history["round"]) else standings_history["round"].max()
+                        st.markdown(f"**Table after round {snapshot_round}**")
+                        st.dataframe(
+                            history_store.snapshot(history_key, snapshot_round),
+                            hide_index=True,
+                            column_config={
+                                "position_change": st.column_config.NumberColumn("Δ Pos", format="%+d"),
+                            },
+                        )
+
                 st.subheader("Selected Round")
                 st.write(f"Selected Round: {selected_round}")
                 
-                round_events = fetch_round_events(selected_tournament, selected_season, selected_round)
+                with span("round events", "fetch"):
+                    round_events = fetch_round_events(selected_tournament, selected_season, selected_round)
                 if round_events:
                     
                     filtered_round_events = get_flattened_round_events(round_events)
                     
-                    st.subheader("Flattened Round Events Data")
-                    st.dataframe(filtered_round_events,
-                                    column_config={
-                                        "incidents.home_goals": st.column_config.JsonColumn(
-                                            "Home Goal Incidents",
-                                                help="JSON strings or objects",
-                                                width="large",
-                                        ),
-                                        "incidents.away_goals": st.column_config.JsonColumn(
-                                            "Away Goals Incidents",
-                                                help="JSON strings or objects",
-                                                width="large",
-                                        ),
-                                        "gameStates": st.column_config.JsonColumn(
-                                            "Game States",
-                                                help="JSON strings or objects",
-                                                width="large",
-                                        ),                                       
-                                    }
+                    with span("round tables", "compute"):
+                        round_tables = build_round_tables(filtered_round_events)
+
+                    st.subheader("Round Events Data")
+                    matches_tab, goals_tab, segments_tab = st.tabs(["Matches", "Goals", "Game State Segments"])
+                    for tab, name in ((matches_tab, "matches"), (goals_tab, "goals"), (segments_tab, "segments")):
+                        with tab:
+                            st.dataframe(round_tables[name], hide_index=True)
+                            if PARQUET_AVAILABLE:
+                                st.download_button(
+                                    f"⬇️ Download {name}.parquet",
+                                    data=to_parquet_bytes(round_tables[name]),
+                                    file_name=f"round_{selected_round}_{name}.parquet",
+                                    mime="application/vnd.apache.parquet",
+                                    key=f"download_{name}",
                                 )
-                                       
+
+                    st.subheader("Round Game States")
+                    grid_columns = st.segmented_control("Charts per row", [1, 2, 3], default=2, key="round_grid_columns") or 2
+                    with span("round game states", "render"):
+                        render_round_game_states(filtered_round_events, columns=grid_columns)
+
                     st.subheader("Selected Fixture")
                     selected_fixture_label = st.selectbox("Select a fixture", filtered_round_events["match_label"], index=1)
                     selected_fixture = filtered_round_events[filtered_round_events["match_label"] == selected_fixture_label].iloc[0]
@@ -153,17 +201,19 @@ try:
                     st.json(selected_fixture["segments"], expanded=False)
                     st.json(selected_fixture["gameStates"], expanded=False)
                     
-                    render_game_state_gantt(
-                        selected_fixture["homeTeam.name"],
-                        selected_fixture["awayTeam.name"],
-                        selected_fixture["match_label"],
-                        selected_fixture["time.totalTime"],
-                        selected_fixture["time.injuryTime1"],
-                        selected_fixture["time.injuryTime2"],
-                        selected_fixture["incidents.home_goals"],
-                        selected_fixture["incidents.away_goals"],
-                        selected_fixture["segments"]
-                    )
+                    with span("fixture game states", "render"):
+                        render_game_state_gantt(
+                            selected_fixture["homeTeam.name"],
+                            selected_fixture["awayTeam.name"],
+                            selected_fixture["match_label"],
+                            selected_fixture["time.totalTime"],
+                            selected_fixture["time.injuryTime1"],
+                            selected_fixture["time.injuryTime2"],
+                            selected_fixture["incidents.home_goals"],
+                            selected_fixture["incidents.away_goals"],
+                            selected_fixture["segments"],
+                            fixture_id=selected_fixture["id"],
+                        )
                     # st.plotly_chart(fig, use_container_width=True)
                     
                 else:
@@ -176,4 +226,32 @@ try:
     else:
         st.warning("No seasons found.")
 except Exception as e:
-    st.error(f"Failed to fetch data: {e}")
\ No newline at end of file
+    st.error(f"Failed to fetch data: {e}")
+finally:
+    profiler.stop()
+
+# Fetch cache metrics
+with st.sidebar.expander("📦 Fetch Cache"):
+    cache_stats = get_json_cache().stats()
+    st.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}", help=f"{cache_stats['hits']} of {cache_stats['lookups']} lookups served from cache")
+    st.caption(f"{cache_stats['entries']} payloads stored ({cache_stats['bytes'] / 1024:.0f} KB)")
+    if cache_stats["endpoints"]:
+        st.dataframe(pd.DataFrame(cache_stats["endpoints"]).T)
+
+# Pipeline timing
+with st.sidebar.expander("⏱️ Pipeline Profile"):
+    stage_totals = profiler.stage_totals()
+    st.metric("Run Time", f"{profiler.total_seconds:.2f}s")
+    st.bar_chart(pd.Series(stage_totals, name="seconds"), horizontal=True)
+    st.dataframe(
+        pd.DataFrame(profiler.span_summary()),
+        hide_index=True,
+        column_config={
+            "seconds": st.column_config.NumberColumn("Total (s)", format="%.3f"),
+            "self_seconds": st.column_config.NumberColumn("Self (s)", format="%.3f"),
+        },
+    )
+    st.toggle("cProfile next run", key="profile_with_cprofile", help="Profile every function call on the next rerun (slower)")
+    if profiler.has_cprofile:
+        st.code(profiler.cprofile_text(limit=25), language="text")
+        st.download_button("⬇️ Download .prof", data=profiler.cprofile_dump(), file_name="scrapping.prof", key="download_profile")
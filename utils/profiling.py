@@ -0,0 +1,119 @@
+# utils/profiling.py
+import time
+import marshal
+import pstats
+import cProfile
+import threading
+from io import StringIO
+from contextlib import contextmanager
+
+# Pipeline stages a span can be attributed to
+STAGES = ("fetch", "parse", "compute", "render")
+
+# The profiler of the script run on this thread (Streamlit runs each session's script on its own thread)
+_active = threading.local()
+
+
+class PipelineProfiler:
+    """
+    Timing spans for one run of a page's pipeline, optionally with a cProfile of the whole run.
+
+    Spans nest; each span's self time excludes its child spans, so per-stage totals
+    add up to the instrumented time without double counting (e.g. game-state compute
+    inside a flatten/parse span).
+    """
+
+    def __init__(self, use_cprofile=False):
+        self.spans = []
+        self.total_seconds = 0.0
+        self._stack = []
+        self._started = None
+        self._profile = cProfile.Profile() if use_cprofile else None
+
+    def start(self):
+        _active.profiler = self
+        self._started = time.perf_counter()
+        if self._profile:
+            self._profile.enable()
+        return self
+
+    def stop(self):
+        if self._profile:
+            self._profile.disable()
+        if self._started is not None:
+            self.total_seconds = time.perf_counter() - self._started
+        if getattr(_active, "profiler", None) is self:
+            _active.profiler = None
+
+    @contextmanager
+    def span(self, name, stage):
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage '{stage}'. Use one of: {', '.join(STAGES)}")
+        frame = {"name": name, "stage": stage, "depth": len(self._stack), "children": 0.0}
+        self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stack.pop()
+            if self._stack:
+                self._stack[-1]["children"] += elapsed
+            self.spans.append({
+                "name": name,
+                "stage": stage,
+                "depth": frame["depth"],
+                "seconds": elapsed,
+                "self_seconds": elapsed - frame["children"],
+            })
+
+    def stage_totals(self):
+        """Self time per stage, plus time outside any span as "other"."""
+        totals = {stage: 0.0 for stage in STAGES}
+        for span_row in self.spans:
+            totals[span_row["stage"]] += span_row["self_seconds"]
+        totals["other"] = max(self.total_seconds - sum(totals.values()), 0.0)
+        return totals
+
+    def span_summary(self):
+        """Spans aggregated by (stage, name): calls, total and self seconds, slowest first."""
+        summary = {}
+        for span_row in self.spans:
+            row = summary.setdefault(
+                (span_row["stage"], span_row["name"]),
+                {"stage": span_row["stage"], "name": span_row["name"], "calls": 0, "seconds": 0.0, "self_seconds": 0.0},
+            )
+            row["calls"] += 1
+            row["seconds"] += span_row["seconds"]
+            row["self_seconds"] += span_row["self_seconds"]
+        return sorted(summary.values(), key=lambda r: r["self_seconds"], reverse=True)
+
+    @property
+    def has_cprofile(self):
+        return self._profile is not None
+
+    def cprofile_text(self, limit=30, sort="cumulative"):
+        """Top functions of the cProfile run, as pstats prints them."""
+        if not self._profile:
+            return ""
+        out = StringIO()
+        pstats.Stats(self._profile, stream=out).strip_dirs().sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def cprofile_dump(self):
+        """The cProfile run as .prof bytes (loadable with pstats, snakeviz, etc.)."""
+        if not self._profile:
+            return b""
+        self._profile.create_stats()
+        return marshal.dumps(self._profile.stats)
+
+
+@contextmanager
+def span(name, stage):
+    """Time a block under the current thread's active profiler; a no-op when none is running."""
+    profiler = getattr(_active, "profiler", None)
+    if profiler is None:
+        yield
+        return
+    with profiler.span(name, stage):
+        yield
@@ -0,0 +1,84 @@
+# utils/renders/benchmark_gantt.py
+"""
+Compare the Gantt rendering modes of plot_game_state_gantt_split.
+
+    python -m utils.renders.benchmark_gantt [--repeats 20]
+
+For synthetic matches with an increasing number of goals, builds the figure in
+each mode and reports the median build time, the serialised figure size (what
+Streamlit ships to the browser) and the number of traces/shapes.
+"""
+import time
+import random
+import argparse
+import statistics
+
+from utils.api.incidents import compute_game_states
+from utils.renders.graph_renders import plot_game_state_gantt_split, GANTT_MODES
+
+GOAL_COUNTS = (2, 6, 12, 24)
+
+
+def synthetic_match(goal_count, seed=0):
+    """Segments and goal events for a match with `goal_count` goals spread over both halves."""
+    rng = random.Random(seed)
+    injury_time_1, injury_time_2 = 3, 6
+    home_goals, away_goals = [], []
+    for i in range(goal_count):
+        minute = rng.randint(1, 90)
+        goal = {
+            "matchMinute": minute,
+            "minute": minute,
+            "half": "1st" if minute <= 45 else "2nd",
+            "addedTime": 0,
+            "playerShortName": f"Player {i}",
+            "isOwnGoal": False,
+        }
+        (home_goals if rng.random() < 0.5 else away_goals).append(goal)
+
+    total_time = 90 + injury_time_1 + injury_time_2
+    segments, _ = compute_game_states(home_goals, away_goals, total_time, injury_time_1, injury_time_2)
+    for g in home_goals:
+        g["team"] = "home"
+    for g in away_goals:
+        g["team"] = "away"
+    return segments, home_goals + away_goals, injury_time_1, injury_time_2
+
+
+def benchmark(repeats=20):
+    rows = []
+    for goal_count in GOAL_COUNTS:
+        segments, goals, injury_time_1, injury_time_2 = synthetic_match(goal_count, seed=goal_count)
+        for mode in GANTT_MODES:
+            timings = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                fig = plot_game_state_gantt_split(segments, goals, "Home FC", "Away FC", injury_time_1, injury_time_2, mode=mode)
+                timings.append(time.perf_counter() - started)
+            rows.append({
+                "goals": goal_count,
+                "segments": len(segments),
+                "mode": mode,
+                "build_ms": statistics.median(timings) * 1000,
+                "json_kb": len(fig.to_json()) / 1024,
+                "traces": len(fig.data),
+                "shapes": len(fig.layout.shapes),
+            })
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Gantt rendering modes.")
+    parser.add_argument("--repeats", type=int, default=20, help="Builds per mode and goal count")
+    args = parser.parse_args(argv)
+
+    print(f"{'goals':>5} {'segments':>8} {'mode':>12} {'build ms':>9} {'json KB':>8} {'traces':>6} {'shapes':>6}")
+    for row in benchmark(args.repeats):
+        print(
+            f"{row['goals']:>5} {row['segments']:>8} {row['mode']:>12} {row['build_ms']:>9.1f} "
+            f"{row['json_kb']:>8.1f} {row['traces']:>6} {row['shapes']:>6}"
+        )
+
+
+if __name__ == "__main__":
+    main()
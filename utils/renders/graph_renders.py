@@ -1,3 +1,6 @@
+import json
+import hashlib
+
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
@@ -5,13 +8,19 @@ import plotly.graph_objects as go
 
 from utils.api.incidents import compute_game_states
 
+# Gantt rendering modes:
+#   batched     - one bar trace per state and all goal lines/labels added in a single layout update
+#   per_segment - one bar trace per segment and one add_vline per goal (original behaviour)
+GANTT_MODES = ("batched", "per_segment")
+
+STATE_COLORS = {
+    "winning": "green",
+    "drawing": "blue",
+    "losing": "red"
+}
+
 def prepare_gantt_data(segments, team_name, team_type, injury_time_1):
     halftime_boundary = 45 + injury_time_1
-    colors = {
-        "winning": "green",
-        "drawing": "blue",
-        "losing": "red"
-    }
 
     data = []
     for seg in segments:
@@ -25,52 +34,68 @@ def prepare_gantt_data(segments, team_name, team_type, injury_time_1):
             "End": end,
             "Duration": end - start,
             "State": state,
-            "Color": colors[state],
+            "Color": STATE_COLORS[state],
             "Half": seg["half"],
         })
 
     return data
 
 
-def plot_game_state_gantt_split(segments, goal_events, home_team_name, away_team_name, injury_time_1, injury_time_2):
-    # Prepare data
-    home_data = prepare_gantt_data(segments, home_team_name, "home", injury_time_1)
-    away_data = prepare_gantt_data(segments, away_team_name, "away", injury_time_1)
-    df = pd.DataFrame(home_data + away_data)
+def _goal_markers(goal_events):
+    """Position, colour and label of each goal's vertical line, staggering labels of nearby goals."""
+    markers = []
+    # Track number of annotations per minute to stagger them
+    annotation_tracker = []
+    prev_goal_team = ""
 
-    # Add row label for y-axis (e.g., "Brentford - 1st Half")
-    df["Row"] = df["Team"] + " - " + df["Half"] + " Half"
-    # Add invisible spacer rows to create padding
-    spacers = pd.DataFrame([
-        {
-            "Team": "Spacer",
-            "Row": "Home Scorers",
-            "Start": 0,
-            "End": 0.1,
-            "Duration": 0.1,
-            "State": "padding",
-            "Half": "spacer"
-        },
-        {
-            "Team": "Spacer",
-            "Row": "Away Scorers",
-            "Start": 0,
-            "End": 0.1,
-            "Duration": 0.1,
-            "State": "padding",
-            "Half": "spacer"
-        }
-    ])
+    for g in goal_events:
+        minute = g["minute"] + (g.get("addedTime") or 0)
+        team = g["team"]
+        player = g.get("playerShortName", g.get("player", "Unknown"))
+        is_own_goal = g.get("isOwnGoal", False)
+        text_matchMinute = f"{g['matchMinute']}'"
+        if g.get('addedTime', 0) > 0:
+            text_matchMinute += f"+ {g['addedTime']}"
+        text = f"{player} {'(OG)' if is_own_goal else ''} - {text_matchMinute}"
 
-    df = pd.concat([spacers, df], ignore_index=True)
-    
-    fig = go.Figure()
-    color_map = {
-        "winning": "green",
-        "drawing": "blue",
-        "losing": "red"
-    }
+        # Count previous goals within ±10 minutes for staggering
+        nearby_count = sum(1 for m in annotation_tracker if abs(m - minute) <= 10)
+        annotation_tracker.append(minute)
+
+        # Positioning
+        is_home = team == "home"
+        base_y = 0.95 if is_home else 0.1
+        y_offset = (0.07 * nearby_count) if (prev_goal_team == g['team']) else 0
+        y_pos = base_y + y_offset if is_home else (base_y - y_offset)
+
+        markers.append({
+            "minute": minute,
+            "color": "goldenrod" if is_home else "silver",
+            "text": text,
+            "y": y_pos,
+        })
+        prev_goal_team = g["team"]
+
+    return markers
 
+
+def _goal_annotation(marker):
+    return dict(
+        text=marker["text"],
+        yref="paper",
+        y=marker["y"],
+        xanchor="center",
+        yanchor="middle",
+        showarrow=False,
+        font_size=10,
+        borderpad=1,
+        bgcolor="#1E1E2F",
+        opacity=1,
+    )
+
+
+def _add_segment_traces(fig, df):
+    """One go.Bar per segment."""
     # Track which states have been added to avoid duplicate legend entries
     added_legend = set()
 
@@ -93,7 +118,7 @@ def plot_game_state_gantt_split(segments, goal_events, home_team_name, away_team
             y=[row["Row"]],
             base=row["Start"],
             orientation="h",
-            marker=dict(color=color_map[row["State"]]),
+            marker=dict(color=STATE_COLORS[row["State"]]),
             name=row["State"].capitalize(),
             hovertemplate=(
                 f"<b>{row['Team']}</b><br>"
@@ -105,6 +130,83 @@ def plot_game_state_gantt_split(segments, goal_events, home_team_name, away_team
         ))
         added_legend.add(row["State"])
 
+
+def _add_state_traces(fig, df):
+    """One go.Bar per state, with the segments as arrays of base/x/y."""
+    padding = df[df["State"] == "padding"]
+    fig.add_trace(go.Bar(
+        x=padding["Duration"],
+        y=padding["Row"],
+        base=padding["Start"],
+        orientation="h",
+        marker=dict(color="rgba(0,0,0,0)"),  # transparent
+        showlegend=False,
+        hoverinfo="skip",
+        opacity=0.0
+    ))
+
+    for state, color in STATE_COLORS.items():
+        state_df = df[df["State"] == state]
+        if state_df.empty:
+            continue
+        fig.add_trace(go.Bar(
+            x=state_df["Duration"],
+            y=state_df["Row"],
+            base=state_df["Start"],
+            orientation="h",
+            marker=dict(color=color),
+            name=state.capitalize(),
+            customdata=state_df[["Team", "Start", "End"]].to_numpy(),
+            hovertemplate=(
+                "<b>%{customdata[0]}</b><br>"
+                f"{state.capitalize()}<br>"
+                "%{customdata[1]} → %{customdata[2]} min<br>"
+                "<extra></extra>"
+            ),
+        ))
+
+
+def plot_game_state_gantt_split(segments, goal_events, home_team_name, away_team_name, injury_time_1, injury_time_2, mode="batched"):
+    if mode not in GANTT_MODES:
+        raise ValueError(f"Unknown Gantt mode '{mode}'. Use one of: {', '.join(GANTT_MODES)}")
+
+    # Prepare data
+    home_data = prepare_gantt_data(segments, home_team_name, "home", injury_time_1)
+    away_data = prepare_gantt_data(segments, away_team_name, "away", injury_time_1)
+    df = pd.DataFrame(home_data + away_data)
+
+    # Add row label for y-axis (e.g., "Brentford - 1st Half")
+    df["Row"] = df["Team"] + " - " + df["Half"] + " Half"
+    # Add invisible spacer rows to create padding
+    spacers = pd.DataFrame([
+        {
+            "Team": "Spacer",
+            "Row": "Home Scorers",
+            "Start": 0,
+            "End": 0.1,
+            "Duration": 0.1,
+            "State": "padding",
+            "Half": "spacer"
+        },
+        {
+            "Team": "Spacer",
+            "Row": "Away Scorers",
+            "Start": 0,
+            "End": 0.1,
+            "Duration": 0.1,
+            "State": "padding",
+            "Half": "spacer"
+        }
+    ])
+
+    df = pd.concat([spacers, df], ignore_index=True)
+    
+    fig = go.Figure()
+    if mode == "batched":
+        _add_state_traces(fig, df)
+    else:
+        _add_segment_traces(fig, df)
+
     # Set x-axis range
     x_max = 90 + injury_time_2 + 7
     fig.update_layout(
@@ -128,83 +230,161 @@ def plot_game_state_gantt_split(segments, goal_events, home_team_name, away_team
         legend_title="Game State",
     )
 
-    # Track number of annotations per minute to stagger them
-    annotation_tracker = []
-    prev_goal_half = "1st"
-    prev_goal_team = ""
-    
-    for g in goal_events:
-        minute = g["minute"] + (g.get("addedTime") or 0)
-        team = g["team"]
-        player = g.get("playerShortName", g.get("player", "Unknown"))
-        is_own_goal = g.get("isOwnGoal", False)
-        text_matchMinute = f"{g['matchMinute']}'"
-        if g.get('addedTime', 0) > 0:
-            text_matchMinute += f"+ {g['addedTime']}"
-        text = f"{player} {'(OG)' if is_own_goal else ''} - {text_matchMinute}"
+    markers = _goal_markers(goal_events)
+    if mode == "batched":
+        # Same lines and labels add_vline would create, added in one layout update
+        fig.update_layout(
+            shapes=[
+                dict(type="line", xref="x", yref="y domain", x0=m["minute"], x1=m["minute"], y0=0, y1=1,
+                     line=dict(color=m["color"], dash="dot"))
+                for m in markers
+            ],
+            annotations=[dict(_goal_annotation(m), x=m["minute"], xref="x", yref="y domain") for m in markers],
+        )
+    else:
+        for m in markers:
+            fig.add_vline(
+                x=m["minute"],
+                line=dict(color=m["color"], dash="dot"),
+                annotation=_goal_annotation(m),
+            )
 
-        # Count previous goals within ±15 minutes for staggering
-        nearby_count = 0
-        nearby_count = sum(1 for m in annotation_tracker if abs(m - minute) <= 10)
-        annotation_tracker.append(minute)
+    return fig
+
+def _gantt_payload(home_team_name, away_team_name, injury_time_1, injury_time_2, home_goals, away_goals, segments):
+    """Arguments for plot_game_state_gantt_split, without mutating the caller's goal dicts."""
+    return {
+        "segments": list(segments),
+        "goal_events": [{**g, "team": "home"} for g in home_goals] + [{**g, "team": "away"} for g in away_goals],
+        "home_team_name": home_team_name,
+        "away_team_name": away_team_name,
+        "injury_time_1": injury_time_1,
+        "injury_time_2": injury_time_2,
+    }
 
-       # Positioning
-        is_home = team == "home"
-        base_y = 0.95 if is_home else 0.1
-        y_offset = (0.07 * nearby_count) if (prev_goal_team == g['team']) else 0
-        y_pos = base_y + y_offset if is_home else (base_y - y_offset)
-        
-        
-        # Clamp y to keep within visible range
-        # y_pos = min(max(y_pos, 0.01), 0.99)
-
-        # Reverse yanchor so arrow points **away from the plot**
-        # y_anchor = "bottom" if is_home else "top"
-        # x_anchor = "right" if ((nearby_count < 1) and (g['half'] == prev_goal_half)) else "left"
-        x_anchor = "center"
-        y_anchor = "middle"
-
-        vline_color = "goldenrod" if g["team"] == "home" else "silver"
-        
-        fig.add_vline(
-            x=minute,
-            line=dict(color=vline_color, dash="dot"),
-            annotation=dict(
-                text=text,
-                yref="paper",
-                y=y_pos,
-                xanchor=x_anchor,
-                yanchor=y_anchor,  
-                showarrow=False,
-                font_size=10,
-                borderpad=1,
-                bgcolor="#1E1E2F",
-                opacity=1,
-            ),
-        )
-        prev_goal_half = g.get("half", "1st")
-        prev_goal_team = g["team"]
 
+def _payload_hash(payload):
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def _cached_gantt_figure(fixture_id, payload_hash, mode, compact, _payload):
+    """
+    Build a Gantt figure once per (fixture_id, payload hash).
+    The payload itself is not hashed by Streamlit (leading underscore); payload_hash stands in for it.
+    """
+    fig = plot_game_state_gantt_split(**_payload, mode=mode)
+    if compact:
+        fig.update_layout(
+            title=None,
+            xaxis_title=None,
+            height=260,
+            showlegend=False,
+            margin=dict(l=10, r=10, t=10, b=10),
+        )
     return fig
 
-def render_game_state_gantt(home_team_name, away_team_name, match_label, total_time, injury_time_1, injury_time_2, home_goals, away_goals, segments):
-    for g in home_goals:
-        g["team"] = "home"
-    for g in away_goals:
-        g["team"] = "away"
 
-    all_goals = home_goals + away_goals    
+def get_game_state_figure(fixture_id, home_team_name, away_team_name, injury_time_1, injury_time_2, home_goals, away_goals, segments, mode="batched", compact=False):
+    """Cached Gantt figure for a fixture; rebuilt only when its segments/goals/teams change."""
+    payload = _gantt_payload(home_team_name, away_team_name, injury_time_1, injury_time_2, home_goals, away_goals, segments)
+    return _cached_gantt_figure(fixture_id, _payload_hash(payload), mode, compact, payload)
 
-    fig = plot_game_state_gantt_split(
-        segments,
-        all_goals,
+
+def render_game_state_gantt(home_team_name, away_team_name, match_label, total_time, injury_time_1, injury_time_2, home_goals, away_goals, segments, mode="batched", fixture_id=None):
+    fig = get_game_state_figure(
+        fixture_id,
         home_team_name,
         away_team_name,
         injury_time_1,
-        injury_time_2
+        injury_time_2,
+        home_goals,
+        away_goals,
+        segments,
+        mode=mode,
     )
 
     st.subheader("Game State Timeline")
     st.markdown(f"**Match:** {match_label} &nbsp; • &nbsp; **Total Time:** {total_time} min")
     st.plotly_chart(fig, use_container_width=True)
 
+
+def render_round_game_states(round_events, columns=2, mode="batched"):
+    """
+    Small-multiples grid of game-state timelines, one per fixture of a round.
+
+    Args:
+        round_events (DataFrame): Output of get_flattened_round_events.
+        columns (int): Charts per row.
+        mode (str): Gantt rendering mode (see GANTT_MODES).
+    """
+    if round_events.empty:
+        st.info("No fixtures in this round.")
+        return
+
+    st.markdown(
+        " ".join(f":{color}[■] {state.capitalize()}" for state, color in STATE_COLORS.items())
+        + " &nbsp; • &nbsp; ┊ goals (gold = home, silver = away)"
+    )
+
+    fixtures = round_events.to_dict("records")
+    for start in range(0, len(fixtures), columns):
+        for column, fixture in zip(st.columns(columns), fixtures[start:start + columns]):
+            with column:
+                st.markdown(
+                    f"**{fixture['homeTeam.name']} {fixture['homeScore.display']} - "
+                    f"{fixture['awayScore.display']} {fixture['awayTeam.name']}**"
+                )
+                fig = get_game_state_figure(
+                    fixture["id"],
+                    fixture["homeTeam.name"],
+                    fixture["awayTeam.name"],
+                    fixture["time.injuryTime1"],
+                    fixture["time.injuryTime2"],
+                    fixture["incidents.home_goals"],
+                    fixture["incidents.away_goals"],
+                    fixture["segments"],
+                    mode=mode,
+                    compact=True,
+                )
+                st.plotly_chart(fig, use_container_width=True, key=f"round_gantt_{fixture['id']}")
+
+
+def plot_position_history(history, highlight_team_ids=None):
+    """
+    League position after each round, one line per team (1st at the top).
+
+    Args:
+        history (DataFrame): StandingsHistory.history output.
+        highlight_team_ids (iterable): Teams drawn at full opacity; others are faded. All teams if None.
+    """
+    highlight = set(highlight_team_ids) if highlight_team_ids else None
+    team_count = history["team_id"].nunique()
+
+    fig = go.Figure()
+    for team_id, team_history in history.groupby("team_id", sort=False):
+        team_name = team_history["team_name"].iloc[-1]
+        faded = highlight is not None and team_id not in highlight
+        fig.add_trace(go.Scatter(
+            x=team_history["round"],
+            y=team_history["position"],
+            mode="lines+markers",
+            name=team_name,
+            opacity=0.2 if faded else 1.0,
+            customdata=team_history[["points", "position_change"]].to_numpy(),
+            hovertemplate=(
+                f"<b>{team_name}</b><br>"
+                "Round %{x}: %{y}<br>"
+                "%{customdata[0]} pts<br>"
+                "<extra></extra>"
+            ),
+        ))
+
+    fig.update_layout(
+        title="League Position by Round",
+        xaxis=dict(title="Round", dtick=1),
+        yaxis=dict(title="Position", autorange="reversed", dtick=1, range=[team_count + 0.5, 0.5]),
+        height=550,
+        legend_title="Team",
+    )
+    return fig